@@ -0,0 +1,8 @@
+from dashboard.catalog import build_catalog
+
+
+if __name__ == "__main__":
+    fn_gen = "./data/renewables_with_load.parquet"
+    fn_cap = "./data/renewables_capacity.parquet"
+    dir_catalog = build_catalog(fn_gen, fn_cap)
+    print(f"Catalog written to {dir_catalog}")
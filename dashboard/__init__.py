@@ -1,2 +1,21 @@
-from .dashboard_model_results import dashboard_model
-from .dashboard import profile_dashboard
+from importlib import import_module
+
+# public objects and the module defining them. Modules are imported on first
+# access such that streamlit and plotly are only loaded if a page is rendered
+_LAZY_IMPORTS = {
+    "dashboard_model": "dashboard_model_results",
+    "profile_dashboard": "dashboard",
+}
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{_LAZY_IMPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+
+def get_residual_load(
+    df: pd.DataFrame, shares: pd.DataFrame, total_demand: float = 0
+) -> np.ndarray:
+    """Get hourly residual load, i.e., demand minus generation, for many share
+    settings at once. Generation of each technology is scaled to meet its demand
+    share on an annual basis as in normalize_generation.
+
+    Args:
+        df: Dataframe with observed demand and generation data
+        shares: one row per setting with the shares of each technology in annual
+            demand as columns. "Baseload" is a technology with constant profile
+        total_demand: Total demand over the whole time horizon to normalize demand
+            If zero, no demand scaling
+
+    Returns:
+        residual load with dimension (hours, settings)
+    """
+    if total_demand == 0:
+        total_demand = df["Demand"].sum()
+    n_hours = len(df)
+    profiles = np.column_stack(
+        [
+            (
+                np.full(n_hours, 1 / n_hours)
+                if tech == "Baseload"
+                else df[tech].fillna(0).to_numpy() / df[tech].sum()
+            )
+            for tech in shares.columns
+        ]
+    )
+    demand = df["Demand"].to_numpy() / df["Demand"].sum() * total_demand
+    supply = profiles @ (shares.to_numpy(dtype=float).T * total_demand)
+    return demand[:, np.newaxis] - supply
+
+
+def get_duration_curve(residual: np.ndarray) -> np.ndarray:
+    """Get residual load duration curves, i.e., residual load sorted in
+    descending order
+
+    Args:
+        residual: residual load with dimension (hours, settings)
+    """
+    return -np.sort(-residual, axis=0)
+
+
+def get_window_deficit(residual: np.ndarray, window: int) -> np.ndarray:
+    """Get maximum cumulative residual load over rolling windows of given length,
+    i.e., the largest energy deficit over any window
+
+    Args:
+        residual: residual load with dimension (hours, settings)
+        window: length of window in hours
+
+    Returns:
+        maximum deficit by setting
+    """
+    cumulative = np.concatenate(
+        [np.zeros((1, residual.shape[1])), np.cumsum(residual, axis=0)]
+    )
+    window = min(window, residual.shape[0])
+    return np.maximum((cumulative[window:] - cumulative[:-window]).max(axis=0), 0)
+
+
+def get_physical_storage_size(residual: np.ndarray) -> np.ndarray:
+    """Get size of a physical storage required for zero energy-not-served, i.e.,
+    a lossless storage without power limit that serves demand only by releasing
+    energy. The storage has to cover the largest cumulative residual load over
+    any interval of the (cyclic) time horizon. If demand exceeds generation
+    over the whole horizon, no storage size avoids energy-not-served and the
+    size is infinite. This is an estimate and not a bound for the storage of
+    model.gms, where the storage level also enters the energy balance.
+
+    Args:
+        residual: residual load with dimension (hours, settings)
+
+    Returns:
+        storage size by setting
+    """
+    # intervals wrapping around the end of the horizon are covered by doubling
+    # the horizon. Intervals longer than the horizon never exceed shorter ones
+    # as long as total residual load is not positive
+    cumulative = np.concatenate(
+        [
+            np.zeros((1, residual.shape[1])),
+            np.cumsum(np.concatenate([residual, residual]), axis=0),
+        ]
+    )
+    size = (cumulative - np.minimum.accumulate(cumulative, axis=0)).max(axis=0)
+    return np.where(residual.sum(axis=0) > 0, np.inf, size)
+
+
+def get_residual_statistics(
+    df: pd.DataFrame,
+    shares: pd.DataFrame,
+    total_demand: float = 0,
+    windows: list[int] = [24, 168],
+) -> pd.DataFrame:
+    """Get residual load statistics for many share settings
+
+    Args:
+        df: Dataframe with observed demand and generation data
+        shares: one row per setting with the shares of each technology in annual
+            demand as columns, see get_residual_load
+        total_demand: Total demand over the whole time horizon to normalize demand
+            If zero, no demand scaling
+        windows: window lengths in hours for the maximum deficit
+
+    Returns:
+        frame with one row per setting
+    """
+    residual = get_residual_load(df, shares, total_demand=total_demand)
+    stats = shares.assign(
+        PeakResidual=residual.max(axis=0),
+        ExcessDemand=np.maximum(residual, 0).sum(axis=0),
+        ExcessSupply=np.maximum(-residual, 0).sum(axis=0),
+        HoursDeficit=(residual > 0).sum(axis=0),
+        PhysicalStorageSize=get_physical_storage_size(residual),
+    )
+    for w in windows:
+        stats[f"MaxDeficit{w}h"] = get_window_deficit(residual, w)
+    return stats
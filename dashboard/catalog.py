@@ -0,0 +1,236 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import Callable
+import pandas as pd
+import streamlit as st
+
+# columns of the generation file identifying a data set
+CATALOG_KEYS = ["country", "year"]
+
+
+def prepare_generation(df: pd.DataFrame) -> pd.DataFrame:
+    """Capitalize column names of hourly generation and add total wind
+
+    Args:
+        df: hourly generation and demand with dateTime as index
+    """
+    df.columns = [c[:1].capitalize() + c[1:] for c in df.columns]
+    df["Wind"] = df["WindOffshore"].fillna(0) + df["WindOnshore"].fillna(0)
+    return df
+
+
+def get_annual_statistics(df: pd.DataFrame, df_cap: pd.DataFrame) -> pd.DataFrame:
+    """Get capacity, annual generation, full-load hours and demand share
+
+    Args:
+        df: hourly generation and demand, see prepare_generation
+        df_cap: capacity by technology of the country and year
+    """
+    # if not data provide an empty frame
+    if len(df_cap) == 0 or df_cap is None:
+        return pd.DataFrame(
+            columns=[
+                "Wind",
+                "Solar",
+                "AnnualGeneration",
+                "Demand",
+                "DemandShare",
+                "Fullload Hours",
+            ],
+            index=[
+                "Capacity",
+            ],
+        )
+    df_cap = (
+        df_cap.rename(columns={c: c[:1].capitalize() + c[1:] for c in df_cap.columns})
+        .assign(
+            Wind=lambda df: df["WindOffshore"].fillna(0) + df["WindOnshore"].fillna(0)
+        )
+        .set_axis(["Capacity"])
+    )
+    df_cap = pd.concat([df_cap, df.sum().to_frame("AnnualGeneration").T]).T.assign(
+        **{"Fullload Hours": lambda df: df["AnnualGeneration"] / df["Capacity"]}
+    )
+    df_cap["DemandShare"] = (
+        100 * df_cap["AnnualGeneration"] / df_cap.loc["Demand", "AnnualGeneration"]
+    )
+    return df_cap
+
+
+def get_fingerprint(*fns: str) -> str:
+    """Get fingerprint of files based on their path, size and modification time
+
+    Args:
+        fns: names of the files
+    """
+    digest = hashlib.sha256()
+    for fn in fns:
+        stat = os.stat(fn)
+        digest.update(f"{os.path.abspath(fn)}|{stat.st_size}|{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+def write_atomic(fn: str, write: Callable[[str], None]):
+    """Write a file to a temporary file in the same directory that replaces the
+    file once complete, such that readers never see a partial file
+
+    Args:
+        fn: name of the file
+        write: function writing the content to the file name it is passed
+    """
+    fd, fn_tmp = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(fn)),
+        prefix=f".{os.path.basename(fn)}.",
+        suffix=".tmp",
+    )
+    os.close(fd)
+    try:
+        write(fn_tmp)
+        os.replace(fn_tmp, fn)
+    except BaseException:
+        os.remove(fn_tmp)
+        raise
+
+
+def get_catalog_dir(fn_gen: str) -> str:
+    """Get default directory of the catalog next to the generation file
+
+    Args:
+        fn_gen: name of parquet file with generation data
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(fn_gen)), "catalog")
+
+
+def build_catalog(fn_gen: str, fn_cap: str, dir_catalog: str | None = None) -> str:
+    """Precompute annual statistics and normalized hourly profiles for every
+    country and year in the generation file. The catalog consists of the files
+    profiles.parquet, totals.parquet, stats.parquet, and fingerprint.json
+    holding the fingerprint of the source files.
+
+    Args:
+        fn_gen: name of parquet file with generation data
+        fn_cap: name of parquet file with capacity
+        dir_catalog: directory of the catalog. If empty, a folder "catalog" next
+            to the generation file is used
+
+    Returns:
+        directory of the catalog
+    """
+    dir_catalog = get_catalog_dir(fn_gen) if dir_catalog is None else dir_catalog
+    os.makedirs(dir_catalog, exist_ok=True)
+    fingerprint = get_fingerprint(fn_gen, fn_cap)
+
+    df_gen = pd.read_parquet(fn_gen)
+    df_cap_all = pd.read_parquet(fn_cap).set_index(CATALOG_KEYS)
+    lst_profiles, lst_totals, lst_stats = [], [], []
+    for (country, year), df in df_gen.groupby(
+        [df_gen["country"], df_gen["dateTime"].dt.year.rename("year")]
+    ):
+        df = prepare_generation(df.drop("country", axis=1).set_index("dateTime"))
+        total = df.sum()
+        df_cap = (
+            df_cap_all.loc[[(country, year)]]
+            if (country, year) in df_cap_all.index
+            else df_cap_all.iloc[:0]
+        ).reset_index(drop=True)
+        keys = {"country": country, "year": year}
+        # profiles of technologies without generation are kept as they are
+        lst_profiles.append(
+            df.div(total.where(total != 0, 1)).reset_index().assign(**keys)
+        )
+        lst_totals.append(total.to_frame().T.assign(**keys))
+        lst_stats.append(
+            get_annual_statistics(df, df_cap)
+            .astype(float)
+            .rename_axis("tech")
+            .reset_index()
+            .assign(**keys)
+        )
+    # the fingerprint is written last such that an interrupted build is redone
+    for name, lst_df in [
+        ("profiles", lst_profiles),
+        ("totals", lst_totals),
+        ("stats", lst_stats),
+    ]:
+        df = pd.concat(lst_df)
+        write_atomic(
+            os.path.join(dir_catalog, f"{name}.parquet"),
+            lambda fn: df.to_parquet(fn, index=False),
+        )
+
+    def write_fingerprint(fn: str):
+        with open(fn, "w") as f:
+            json.dump({"fingerprint": fingerprint}, f)
+
+    write_atomic(os.path.join(dir_catalog, "fingerprint.json"), write_fingerprint)
+    return dir_catalog
+
+
+def read_fingerprint(dir_catalog: str) -> str | None:
+    """Get fingerprint of the source files the catalog was built from
+
+    Args:
+        dir_catalog: directory of the catalog
+    """
+    try:
+        with open(os.path.join(dir_catalog, "fingerprint.json")) as f:
+            return json.load(f)["fingerprint"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+@st.cache_resource(max_entries=1)
+def _load_catalog(
+    dir_catalog: str, fingerprint: str, fn_gen: str, fn_cap: str
+) -> dict[tuple[str, int], tuple[pd.DataFrame, pd.DataFrame]]:
+    """Load catalog and rebuild it if it does not match the fingerprint of the
+    source files. Cached by fingerprint such that changed source files are
+    picked up.
+
+    Args:
+        dir_catalog: directory of the catalog
+        fingerprint: fingerprint of the source files, see get_fingerprint
+        fn_gen: name of parquet file with generation data
+        fn_cap: name of parquet file with capacity
+    """
+    if read_fingerprint(dir_catalog) != fingerprint:
+        build_catalog(fn_gen, fn_cap, dir_catalog)
+    df_profiles = pd.read_parquet(os.path.join(dir_catalog, "profiles.parquet"))
+    df_totals = pd.read_parquet(os.path.join(dir_catalog, "totals.parquet"))
+    df_stats = pd.read_parquet(os.path.join(dir_catalog, "stats.parquet"))
+
+    totals = df_totals.set_index(CATALOG_KEYS)
+    stats = {
+        key: df.drop(CATALOG_KEYS, axis=1).set_index("tech").rename_axis(None)
+        for key, df in df_stats.groupby(CATALOG_KEYS)
+    }
+    catalog = {}
+    for key, df in df_profiles.groupby(CATALOG_KEYS):
+        df = df.drop(CATALOG_KEYS, axis=1).set_index("dateTime")
+        catalog[key] = (df * totals.loc[key, df.columns], stats[key])
+    return catalog
+
+
+def load_catalog(
+    fn_gen: str, fn_cap: str, dir_catalog: str | None = None
+) -> dict[tuple[str, int], tuple[pd.DataFrame, pd.DataFrame]]:
+    """Get catalog with hourly generation and annual statistics by country and
+    year. The catalog is built if it does not exist or if the source files
+    changed.
+
+    Args:
+        fn_gen: name of parquet file with generation data
+        fn_cap: name of parquet file with capacity
+        dir_catalog: directory of the catalog. If empty, a folder "catalog" next
+            to the generation file is used
+
+    Returns:
+        dictionary mapping (country, year) to hourly generation and annual
+        statistics as returned by get_generation
+    """
+    dir_catalog = get_catalog_dir(fn_gen) if dir_catalog is None else dir_catalog
+    return _load_catalog(
+        dir_catalog, get_fingerprint(fn_gen, fn_cap), fn_gen, fn_cap
+    )
@@ -3,11 +3,25 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from .data import get_generation, normalize_generation, get_storage_stats
+from .analytics import get_physical_storage_size, get_residual_load
+
+
+@st.cache_resource
+def get_countries(fn_cap: str) -> list[str]:
+    """Get sorted list of countries in the capacity file. The list is loaded
+    once per process.
+
+    Args:
+        fn_cap: name of file with capacity data
+    """
+    return list(
+        pd.read_parquet(fn_cap, columns=["country"])["country"].sort_values().unique()
+    )
 
 
 def sidebar(
     fn_gen: str, fn_cap: str, years: list[int] = range(2015, 2024)
-) -> dict[str, Any]:
+) -> tuple[pd.DataFrame, pd.DataFrame, dict[str, Any]]:
     """Create streamlit sidebar
 
     Args:
@@ -16,12 +30,11 @@ def sidebar(
         years: year to include in select field
 
     Returns:
-        dictionary with the following key:
-            country, year, total_demand, sh_wind, sh_solar, sh_base
+        hourly generation and demand with storage statistics; aggregated storage
+        statistics; dictionary with the following keys:
+            country, year, total_demand, shares
     """
-    all_countries = list(
-        pd.read_parquet(fn_cap, columns=["country"])["country"].sort_values().unique()
-    )
+    all_countries = get_countries(fn_cap)
 
     with st.sidebar:
         col1, col2 = st.columns(2)
@@ -86,6 +99,15 @@ def sidebar(
             total_demand=total_demand,
         )
         df_storage, df_storage_stats = get_storage_stats(df_norm)
+        storage_size = get_physical_storage_size(
+            get_residual_load(
+                df_gen,
+                pd.DataFrame(
+                    [{"Wind": sh_wind, "Solar": sh_solar, "Baseload": sh_base}]
+                ),
+                total_demand=total_demand,
+            )
+        )[0]
         df_cap_ = (df_norm.sum() / (df_annual["Fullload Hours"] + 0.0000001))[
             ["Wind", "Solar"]
         ] / 1000
@@ -93,6 +115,14 @@ def sidebar(
             f"""Implied capacity [GW]:          
 - Wind {round(df_cap_["Wind"],2)}
 - Solar {round(df_cap_["Solar"],2)}
+
+Physical storage for zero energy-not-served [GWh]: {round(storage_size / 1000, 1)}
             """
         )
-        return df_storage, df_storage_stats
+        settings = {
+            "country": country,
+            "year": year,
+            "total_demand": total_demand,
+            "shares": {"Wind": sh_wind, "Solar": sh_solar, "Baseload": sh_base},
+        }
+        return df_storage, df_storage_stats, settings
@@ -0,0 +1,183 @@
+from dataclasses import dataclass, replace
+import numpy as np
+import pandas as pd
+
+# measures of the annual results stored in the cube
+CUBE_MEASURES = [
+    "nuclear",
+    "renewable",
+    "netStorage",
+    "demand",
+    "energyNotServed",
+    "curtailNuclear",
+    "curtailRenewable",
+    "curtailNuclearPercent",
+    "curtailRenewablePercent",
+]
+# measures given as share, which do not change with the demand level
+CUBE_SHARES = ["curtailNuclearPercent", "curtailRenewablePercent"]
+# order of unit costs used for the cost components
+COST_ORDER = ["cost_res", "cost_nuc", "cost_sto", "cost_ens"]
+
+
+@dataclass(frozen=True)
+class ResultsCube:
+    """Annual results as dense arrays over the scenario grid. All arrays have
+    the dimension (storage, renewable, generation, curtailment order). Scenarios
+    not contained in the results are NaN.
+
+    Attributes:
+        share_storage: storage sizes as share of total demand
+        share_renewable: shares of renewable in total generation
+        share_generation: total generation as multiples of demand
+        curtail_res_first: curtailment orders, i.e., whether renewables are
+            curtailed first
+        measures: maps name of the measure to its array
+        cost_components: quantities multiplied with the unit costs in the order
+            of COST_ORDER, i.e., installed renewable, installed nuclear, storage
+            size, and energy-not-served. Dimension (cost, storage, renewable,
+            generation, curtailment order)
+    """
+
+    share_storage: np.ndarray
+    share_renewable: np.ndarray
+    share_generation: np.ndarray
+    curtail_res_first: np.ndarray
+    measures: dict[str, np.ndarray]
+    cost_components: np.ndarray
+
+    def get_position(
+        self, share_generation: float, curtail_res_first: bool = True
+    ) -> tuple[int, int]:
+        """Get position of generation share and curtailment order in the cube
+
+        Args:
+            share_generation: total generation as multiple of demand
+            curtail_res_first: indicator whether renewable are curtailed first
+        """
+        pos_gen = np.flatnonzero(np.isclose(self.share_generation, share_generation))
+        pos_cur = np.flatnonzero(self.curtail_res_first == curtail_res_first)
+        if len(pos_gen) == 0 or len(pos_cur) == 0:
+            raise KeyError(
+                f"No results for generation share {share_generation} and "
+                f"curtailment order {curtail_res_first}"
+            )
+        return pos_gen[0], pos_cur[0]
+
+    def rescale(self, total_demand: float) -> "ResultsCube":
+        """Get cube with results of each scenario rescaled to the given total
+        demand. The model is linear in demand, generation, and storage size, so
+        all measures but shares and all cost components are proportional to
+        demand, see get_total_results
+
+        Args:
+            total_demand: total demand of each scenario after rescaling
+        """
+        factor = total_demand / self.measures["demand"]
+        return replace(
+            self,
+            measures={
+                m: v if m in CUBE_SHARES else v * factor
+                for m, v in self.measures.items()
+            },
+            cost_components=self.cost_components * factor,
+        )
+
+    def get_cost(
+        self,
+        cost_res: float,
+        cost_nuc: float,
+        cost_sto: float,
+        cost_ens: float,
+    ) -> np.ndarray:
+        """Get cost for all scenarios as linear combination of the cost components
+
+        Args:
+            cost_res: cost to install renewable generation [Euro/MWh]
+            cost_nuc: cost to install nuclear generation [Euro/MWh]
+            cost_sto: cost to install storage facility [Euro/MWh]
+            cost_ens: cost of energy not served [Euro/MWh]
+        """
+        return np.tensordot(
+            np.array([cost_res, cost_nuc, cost_sto, cost_ens]),
+            self.cost_components,
+            axes=1,
+        )
+
+    def get_surface(
+        self,
+        variable: str,
+        share_generation: float,
+        curtail_res_first: bool = True,
+        **unit_cost: float,
+    ) -> pd.DataFrame:
+        """Get values of variable for given generation share and curtailment order
+        with storage sizes as index and renewable shares as columns
+
+        Args:
+            variable: measure to get or "cost"
+            share_generation: total generation as multiple of demand
+            curtail_res_first: indicator whether renewable are curtailed first
+            unit_cost: unit costs used if variable is "cost", see get_cost
+        """
+        pos_gen, pos_cur = self.get_position(share_generation, curtail_res_first)
+        if variable == "cost":
+            values = np.tensordot(
+                np.array([unit_cost[c] for c in COST_ORDER]),
+                self.cost_components[:, :, :, pos_gen, pos_cur],
+                axes=1,
+            )
+        else:
+            values = self.measures[variable][:, :, pos_gen, pos_cur]
+        return pd.DataFrame(
+            values,
+            index=pd.Index(self.share_storage, name="share_storage"),
+            columns=pd.Index(self.share_renewable, name="share_renewable"),
+        )
+
+
+def build_results_cube(df_annual: pd.DataFrame) -> ResultsCube:
+    """Index annual results into dense arrays over the scenario grid
+
+    Args:
+        df_annual: results aggregated over the whole time horizon
+    """
+    axes = {
+        c: np.sort(df_annual[c].unique())
+        for c in [
+            "share_storage",
+            "share_renewable",
+            "share_generation",
+            "curtailRenewableFirst",
+        ]
+    }
+    shape = tuple(len(v) for v in axes.values())
+    # position of each row in the cube
+    positions = tuple(
+        np.searchsorted(axis, df_annual[c].to_numpy()) for c, axis in axes.items()
+    )
+    measures = {}
+    for m in CUBE_MEASURES:
+        values = np.full(shape, np.nan)
+        values[positions] = df_annual[m].to_numpy(dtype=float)
+        measures[m] = values
+
+    storage_size = (
+        measures["demand"] * axes["share_storage"][:, np.newaxis, np.newaxis, np.newaxis]
+    )
+    cost_components = np.stack(
+        [
+            measures["renewable"] + measures["curtailRenewable"],
+            measures["nuclear"] + measures["curtailNuclear"],
+            storage_size,
+            measures["energyNotServed"],
+        ]
+    )
+    return ResultsCube(
+        share_storage=axes["share_storage"],
+        share_renewable=axes["share_renewable"],
+        share_generation=axes["share_generation"],
+        curtail_res_first=axes["curtailRenewableFirst"],
+        measures=measures,
+        cost_components=cost_components,
+    )
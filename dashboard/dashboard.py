@@ -1,7 +1,24 @@
+from typing import Any
 import streamlit as st
+import pandas as pd
 from .data import get_profiles
-from .graphs import plot_profile, plot_daily_generation
-from .components import sidebar
+from .graphs import plot_profile, plot_daily_generation, plot_weather_years
+from .components import get_countries, sidebar
+from .streaming import get_weather_years
+from .warmup import YEARS, start_warmup
+
+# order of technologies and colors in the graphs
+TECH_ORDER = ["Baseload", "Wind", "Solar"]
+COLORS = {"Demand": "Red", "Wind": "Green", "Solar": "Orange", "Baseload": "Black"}
+# profiles shown in the profile tab, see get_profiles
+PROFILES = [
+    "Hourly: Year",
+    "Monthly",
+    "Hourly: Winter",
+    "Hourly: Spring",
+    "Hourly: Summer",
+    "Hourly: Autumn",
+]
 
 
 def make_grid(cols: int, rows: int):
@@ -19,78 +36,189 @@ def make_grid(cols: int, rows: int):
     return grid
 
 
-def profile_dashboard(fn_gen: str, fn_cap: str):
+def profile_dashboard(fn_gen: str, fn_cap: str, warm_cache: bool = False):
     """Run the dashboard based on profiles
 
     Args:
         fn_gen: path to file with generation data
         fn_cap: path to file with capacity data
+        warm_cache: if true, the caches for all countries and years are filled
+            in the background once per server process. The warm up competes
+            with the first requests, run warm_cache.py before starting the
+            server instead
     """
     # settings for contents and graphs
-    tech_order = ["Baseload", "Wind", "Solar"]
-    colors = {"Demand": "Red", "Wind": "Green", "Solar": "Orange", "Baseload": "Black"}
+    tech_order = TECH_ORDER
+    colors = COLORS
 
     # layout settings
     st.set_page_config(
         page_title="Baseload Paper",
         layout="wide",
     )
+    if warm_cache:
+        start_warmup(fn_gen=fn_gen, fn_cap=fn_cap)
 
     # sidebar
-    df_hourly, df_stats = sidebar(fn_gen=fn_gen, fn_cap=fn_cap)
+    df_hourly, df_stats, settings = sidebar(fn_gen=fn_gen, fn_cap=fn_cap)
 
     # create the different tabs
-    tabDaily, tabProfile = st.tabs(["Daily Generation", "Profiles"])
+    tabDaily, tabProfile, tabWeather = st.tabs(
+        ["Daily Generation", "Profiles", "Weather Years"]
+    )
 
     # Tab with daily generation
     with tabDaily:
-        st.markdown("""## Daily Generation and Demand""")
-        st.markdown("""**Overview Imbalances**""")
-        st.dataframe(df_stats.T)
-        col1, col2 = st.columns([1, 3])
-        with col2:
-            percent_daily_demand = st.toggle("Show as percent of daily demand")
-        with col1:
-            days = st.slider("Numbers of days for aggregation", 1, 10, 1)
-        fig = plot_daily_generation(
-            df_hourly,
-            days=days,
-            percent_daily_demand=percent_daily_demand,
-            colors=colors,
-            tech_order=tech_order,
+        daily_generation_tab(
+            df_hourly, df_stats, colors=colors, tech_order=tech_order
         )
-        st.plotly_chart(fig, use_container_width=True)
 
     # tab with average profiles
     with tabProfile:
-        if st.toggle("Show hourly profiles"):
-            profiles = get_profiles(df_hourly)
-            all_profiles = [
-                "Hourly: Year",
-                "Monthly",
-                "Hourly: Winter",
-                "Hourly: Spring",
-                "Hourly: Summer",
-                "Hourly: Autumn",
-            ]
-            profile_order = (
-                tech_order
-                if st.toggle(
-                    "Stack profiles",
-                    value=True,
-                    help="If activated graphs shows the sum of hourly mean production over all technologies, i.e., technologies are stacked one on the next one.",
-                )
-                else None
+        profile_tab(df_hourly, colors=colors, tech_order=tech_order)
+
+    # tab comparing weather years
+    with tabWeather:
+        weather_year_tab(fn_gen=fn_gen, fn_cap=fn_cap, settings=settings)
+
+
+@st.fragment
+def daily_generation_tab(
+    df_hourly: pd.DataFrame,
+    df_stats: pd.DataFrame,
+    colors: dict[str, str],
+    tech_order: list[str],
+):
+    """Tab with daily generation. Changing the widgets of the tab only reruns
+    the tab.
+
+    Args:
+        df_hourly: hourly generation and demand
+        df_stats: aggregated storage statistics
+        colors: colors of items in plot
+        tech_order: order of technologies in plot
+    """
+    st.markdown("""## Daily Generation and Demand""")
+    st.markdown("""**Overview Imbalances**""")
+    st.dataframe(df_stats.T)
+    col1, col2 = st.columns([1, 3])
+    with col2:
+        percent_daily_demand = st.toggle("Show as percent of daily demand")
+    with col1:
+        days = st.slider("Numbers of days for aggregation", 1, 10, 1)
+    fig = plot_daily_generation(
+        df_hourly,
+        days=days,
+        percent_daily_demand=percent_daily_demand,
+        colors=colors,
+        tech_order=tech_order,
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+
+@st.fragment
+def profile_tab(df_hourly: pd.DataFrame, colors: dict[str, str], tech_order: list[str]):
+    """Tab with average profiles. Changing the widgets of the tab only reruns
+    the tab.
+
+    Args:
+        df_hourly: hourly generation and demand
+        colors: colors of items in plot
+        tech_order: order of technologies for stacking
+    """
+    if st.toggle("Show hourly profiles"):
+        profiles = get_profiles(df_hourly)
+        all_profiles = PROFILES
+        profile_order = (
+            tech_order
+            if st.toggle(
+                "Stack profiles",
+                value=True,
+                help="If activated graphs shows the sum of hourly mean production over all technologies, i.e., technologies are stacked one on the next one.",
+            )
+            else None
+        )
+        if profile_order is not None:
+            st.markdown(f"Order of technologies: {'-'.join(profile_order)}")
+        cells = [x for xs in make_grid(3, 2) for x in xs]
+        for i, profile in enumerate(all_profiles):
+            fig = plot_profile(
+                profiles[profile],
+                colors=colors,
+                title=profile,
+                tech_order=profile_order,
             )
-            if profile_order is not None:
-                st.markdown(f"Order of technologies: {'-'.join(profile_order)}")
-            cells = [x for xs in make_grid(3, 2) for x in xs]
-            for i, profile in enumerate(all_profiles):
-                fig = plot_profile(
-                    profiles[profile],
-                    colors=colors,
-                    title=profile,
-                    tech_order=profile_order,
-                )
-                with cells[i]:
-                    st.plotly_chart(fig, use_container_width=True)
+            with cells[i]:
+                st.plotly_chart(fig, use_container_width=True)
+
+
+@st.fragment
+def weather_year_tab(fn_gen: str, fn_cap: str, settings: dict[str, Any]):
+    """Tab comparing several countries and weather years with the demand shares
+    of the sidebar. Data are streamed from the generation file and only the
+    aggregates are kept.
+
+    Args:
+        fn_gen: path to file with generation data
+        fn_cap: path to file with capacity data
+        settings: settings of the sidebar, see sidebar
+    """
+    st.markdown("""## Comparison of Weather Years""")
+    all_countries = get_countries(fn_cap)
+    col1, col2 = st.columns(2)
+    with col1:
+        countries = st.multiselect(
+            "Countries", all_countries, default=[settings["country"]]
+        )
+    with col2:
+        first, last = st.slider(
+            "Years", min(YEARS), max(YEARS), (min(YEARS), max(YEARS))
+        )
+    if len(countries) == 0:
+        st.markdown("Select at least one country.")
+        return
+    res = get_weather_years(
+        fn_gen,
+        countries,
+        list(range(first, last + 1)),
+        shares=settings["shares"],
+        total_demand=settings["total_demand"],
+    )
+    if res["stats"] is None:
+        st.markdown("No data for the selected countries and years.")
+        return
+
+    st.markdown("""**Overview Imbalances**""")
+    st.dataframe(res["stats"].unstack("variable"))
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        variable = st.selectbox("Variable", list(res["daily"].columns))
+    with col2:
+        profile = st.selectbox(
+            "Profile",
+            ["Daily"] + PROFILES,
+        )
+    with col3:
+        days = st.slider("Numbers of days for aggregation", 1, 30, 7)
+    if profile == "Daily":
+        df = res["daily"][variable]
+        dates = df.index.get_level_values("date")
+        df_plot = df.groupby(
+            [
+                df.index.get_level_values("country"),
+                df.index.get_level_values("year"),
+                ((dates.dayofyear - 1) // days * days + 1).rename("Day of Year"),
+            ]
+        ).sum()
+    else:
+        df_plot = (
+            res["profiles"]
+            .xs(profile, level="profile")[variable]
+            .rename_axis(index={"period": "Month" if profile == "Monthly" else "Hour"})
+        )
+    df_plot = df_plot.unstack(["country", "year"])
+    df_plot.columns = [f"{country} {year}" for country, year in df_plot.columns]
+    st.plotly_chart(
+        plot_weather_years(df_plot, title=f"{variable} - {profile}"),
+        use_container_width=True,
+    )
@@ -1,13 +1,50 @@
+from datetime import timedelta
+import pyarrow.compute as pc
 import streamlit as st
-from .data import get_total_results, download_data
-from .graphs import get_plot_variable, plot_heatmap
+from .cube import ResultsCube
+from .data import (
+    RESULT_MEASURES,
+    get_total_results,
+    get_results_cube,
+    get_surrogate_error,
+    download_data,
+)
+from .drilldown import (
+    DRILLDOWN_COLUMNS,
+    get_window,
+    load_scenario,
+    prefetch_neighbours,
+)
+from .graphs import get_plot_variable, plot_heatmap, plot_hourly_results
+from .optimize import get_cost_optimum
+from .surrogate import (
+    SURROGATE_AXES,
+    SURROGATE_METHODS,
+    get_refinement_candidates,
+    get_surrogate_surface,
+    get_surrogate_values,
+)
+from .warmup import start_warmup
 import os
 
+# variables selectable for the heatmap
+HEATMAP_VARIABLES = [
+    "cost",
+    "energyNotServed",
+    "curtailRenewablePercent",
+    "curtailNuclearPercent",
+    "curtailRenewable",
+    "curtailNuclear",
+]
 
-def dashboard_model(fn_results: str = None):
+
+def dashboard_model(fn_results: str = None, warm_cache: bool = False):
     """Run the dashboard
     Args:
         fn_results: path to file with results
+        warm_cache: if true, the caches are filled in the background once per
+            server process. The warm up competes with the first requests, run
+            warm_cache.py before starting the server instead
     """
     # st.set_page_config(layout="wide")
     st.title("Simulations for the Baseload Paper")
@@ -46,46 +83,270 @@ def dashboard_model(fn_results: str = None):
             step=1.0,
             format="%.1f",
         )
+        total_demand = st.number_input(
+            "Total demand [MWh]",
+            min_value=0.0,
+            value=0.0,
+            help="Rescales the results to the given total demand. The model is linear in demand, generation, and storage size, so no new simulation is needed. Use 0 to show the results as stored.",
+        )
+        total_demand = total_demand or None
         st.divider()
         st.subheader("Update the local input file")
         url = st.text_input("URL of input file")
+        checksum = st.text_input(
+            "Checksum of input file",
+            help="SHA-256 hex digest used to verify the download. Leave empty to skip the verification.",
+        )
         if st.button("Update input file"):
             success = False
             if url != "" and url is not None:
-                success = download_data(url, fn_out=fn_results)
+                success = download_data(
+                    url, fn_out=fn_results, checksum=checksum or None
+                )
                 if success:
                     st.write("Updated input file")
 
     if os.path.isfile(fn_results):
-        df_annual = get_total_results(fn_results)
+        if warm_cache:
+            start_warmup(fn_results=fn_results)
+        df_annual = get_total_results(fn_results, total_demand)
         st.subheader(f"Total demand: {df_annual['demand'].unique()[0]} MWh")
         share_generation = st.select_slider(
             "Generation as multiple of demand",
             df_annual["share_generation"].round(3).unique(),
             help="Multiplier used to determine the amount of potential generation as multiple of demand. A value of 1 means that total potential generation equals total demand over the whole time horizon.",
         )
-        variable = st.selectbox(
-            "Variable to plot",
-            (
-                "cost",
-                "energyNotServed",
-                "curtailRenewablePercent",
-                "curtailNuclearPercent",
-                "curtailRenewable",
-                "curtailNuclear",
-            ),
-        )
-        df_cost = get_plot_variable(
-            df_annual=df_annual,
+        variable = st.selectbox("Variable to plot", HEATMAP_VARIABLES)
+        cube = get_results_cube(fn_results)
+        if total_demand is not None:
+            cube = cube.rescale(total_demand)
+        unit_cost = dict(
             cost_res=cost_res,
             cost_nuc=cost_nuc,
             cost_sto=cost_sto,
             cost_ens=cost_ens,
+        )
+        df_cost = get_plot_variable(
+            cube=cube,
             share_generation=share_generation,
             curtail_res_first=curtail_res_first,
+            **unit_cost,
+        )
+        fig = plot_heatmap(
+            df_plot=cube.get_surface(
+                variable, share_generation, curtail_res_first, **unit_cost
+            ),
+            variable=variable,
         )
-        fig = plot_heatmap(df_plot=df_cost, variable=variable)
         st.plotly_chart(fig, use_container_width=True)
         st.dataframe(df_cost.style.format("{:.4}"), use_container_width=True)
+        st.subheader("Cost-optimal scenarios")
+        st.dataframe(
+            get_cost_optimum(cube, **unit_cost).style.format(
+                "{:.4}",
+                subset=["share_storage", "share_renewable", "cost", "energyNotServed"],
+            ),
+            use_container_width=True,
+        )
+        surrogate_explorer(
+            fn_results, cube, variable, curtail_res_first, unit_cost, total_demand
+        )
+        hourly_drilldown(
+            fn_results, cube, share_generation, curtail_res_first, total_demand
+        )
     else:
         st.write("No input data found. Upload new data.")
+
+
+@st.fragment
+def hourly_drilldown(
+    fn_results: str,
+    cube: ResultsCube,
+    share_generation: float,
+    curtail_res_first: bool = True,
+    total_demand: float | None = None,
+):
+    """Panel with hourly results of a single scenario. Only the selected
+    scenario is loaded and only the visible window is plotted. Neighbouring
+    scenarios are loaded in the background. Changing the widgets of the panel
+    only reruns the panel.
+
+    Args:
+        fn_results: path to file with results
+        cube: results aggregated over the whole time horizon indexed as cube
+        share_generation: total generation as multiple of demand
+        curtail_res_first: indicator whether renewable are curtailed first
+        total_demand: If provided, results are rescaled to the given total
+            demand, see get_total_results
+    """
+    st.subheader("Hourly results")
+    # use the share as stored in the results instead of the rounded one
+    share_generation = cube.share_generation[
+        cube.get_position(share_generation, curtail_res_first)[0]
+    ]
+    col1, col2 = st.columns(2)
+    with col1:
+        share_storage = st.select_slider(
+            "Storage size as share of demand",
+            cube.share_storage,
+            format_func=lambda x: f"{x:.4g}",
+        )
+    with col2:
+        share_renewable = st.select_slider(
+            "Share of renewable in generation",
+            cube.share_renewable,
+            format_func=lambda x: f"{x:.4g}",
+        )
+    scenario = dict(
+        share_generation=share_generation,
+        share_storage=share_storage,
+        share_renewable=share_renewable,
+        curtail_res_first=curtail_res_first,
+    )
+    tbl = load_scenario(fn_results, columns=DRILLDOWN_COLUMNS, **scenario)
+    if tbl.num_rows == 0:
+        st.write("No hourly results for the selected scenario.")
+        return
+    prefetch_neighbours(fn_results, cube, columns=DRILLDOWN_COLUMNS, **scenario)
+
+    # time window
+    first, last = tbl["date"][0].as_py(), tbl["date"][-1].as_py()
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        days = st.number_input("Days shown", 1, 366, 14)
+    window = timedelta(days=days) - timedelta(hours=1)
+    start = first
+    if last - window > first:
+        with col2:
+            start = st.slider(
+                "Start of window",
+                min_value=first,
+                max_value=last - window,
+                value=first,
+                step=timedelta(hours=1),
+                format="YYYY-MM-DD HH:mm",
+            )
+    df = get_window(tbl, start, start + window)
+    if total_demand is not None:
+        cols = [c for c in RESULT_MEASURES + ["storageLevel"] if c in df.columns]
+        df[cols] *= total_demand / pc.sum(tbl["demand"]).as_py()
+    st.plotly_chart(plot_hourly_results(df), use_container_width=True)
+
+
+@st.fragment
+def surrogate_explorer(
+    fn_results: str,
+    cube: ResultsCube,
+    variable: str,
+    curtail_res_first: bool,
+    unit_cost: dict[str, float],
+    total_demand: float | None = None,
+):
+    """Panel with results between the solved scenarios interpolated from the
+    annual results, see get_surrogate_surface. Changing the widgets of the
+    panel only reruns the panel.
+
+    Args:
+        fn_results: path to file with results
+        cube: results aggregated over the whole time horizon indexed as cube
+        variable: variable shown in the heatmap
+        curtail_res_first: indicator whether renewable are curtailed first
+        unit_cost: unit costs used for the cost, see ResultsCube.get_cost
+        total_demand: If provided, results are rescaled to the given total
+            demand, see get_total_results
+    """
+    st.subheader("Between the solved scenarios")
+    method = st.radio(
+        "Interpolation",
+        list(SURROGATE_METHODS),
+        horizontal=True,
+        help="Both methods are monotone between solved scenarios. pchip uses monotone cubic splines along axes with at least four solved points.",
+    )
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        share_generation = st.slider(
+            "Generation as multiple of demand",
+            min_value=float(cube.share_generation[0]),
+            max_value=float(cube.share_generation[-1]),
+            value=float(cube.share_generation[0]),
+            step=0.001,
+            format="%.3f",
+            key="surrogate_generation",
+        )
+    with col2:
+        share_renewable = st.slider(
+            "Renewable share [%]",
+            min_value=float(cube.share_renewable[0] * 100),
+            max_value=float(cube.share_renewable[-1] * 100),
+            value=float(cube.share_renewable[len(cube.share_renewable) // 2] * 100),
+            step=0.1,
+            format="%.1f",
+        )
+    with col3:
+        share_storage = st.slider(
+            "Storage size [% of total demand]",
+            min_value=float(cube.share_storage[0] * 100),
+            max_value=float(cube.share_storage[-1] * 100),
+            value=float(cube.share_storage[len(cube.share_storage) // 2] * 100),
+            step=float(cube.share_storage[-1] * 100 / 1000) or None,
+            format="%.5f",
+        )
+    values = get_surrogate_values(
+        cube,
+        HEATMAP_VARIABLES,
+        share_generation,
+        share_renewable / 100,
+        share_storage / 100,
+        curtail_res_first=curtail_res_first,
+        method=method,
+        **unit_cost,
+    )
+    st.dataframe(values.to_frame("value").T.style.format("{:.4}"))
+    fig = plot_heatmap(
+        get_surrogate_surface(
+            cube,
+            variable,
+            share_generation,
+            curtail_res_first,
+            method=method,
+            **unit_cost,
+        ),
+        variable=variable,
+        grid_ticks=False,
+    )
+    fig.add_scatter(
+        x=[share_renewable],
+        y=[share_storage],
+        mode="markers",
+        marker=dict(color="white", symbol="x", size=10),
+        name="Selected",
+        showlegend=False,
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    tolerance = st.number_input(
+        f"Acceptable interpolation error of {variable}",
+        min_value=0.0,
+        value=float(abs(values[variable]) * 0.01) if values.notna()[variable] else 1.0,
+        format="%.4g",
+        help="Scenarios next to solved ones whose hold-out error exceeds the tolerance are proposed for new solves.",
+    )
+    df_refine = get_refinement_candidates(
+        cube,
+        variable,
+        tolerance,
+        curtail_res_first,
+        method=method,
+        error=get_surrogate_error(
+            fn_results, variable, curtail_res_first, method, unit_cost, total_demand
+        ),
+        **unit_cost,
+    )
+    if len(df_refine) == 0:
+        st.write("The surrogate is within the tolerance everywhere.")
+    else:
+        st.write(f"{len(df_refine)} scenarios proposed to refine the surrogate")
+        st.dataframe(
+            df_refine.style.format("{:.4g}", subset=SURROGATE_AXES + ["error"]),
+            use_container_width=True,
+        )
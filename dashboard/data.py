@@ -1,44 +1,245 @@
+import functools
+import hashlib
+import numpy as np
 import pandas as pd
-import requests
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as fs
+import pyarrow.parquet as pq
 import os
 import streamlit as st
+from .cube import ResultsCube, build_results_cube
+from .catalog import (
+    load_catalog,
+    prepare_generation,
+    get_annual_statistics,
+    get_fingerprint,
+    write_atomic,
+)
 
+# columns of the results file aggregated over all periods
+RESULT_MEASURES = [
+    "nuclear",
+    "renewable",
+    "netStorage",
+    "demand",
+    "energyNotServed",
+    "curtailNuclear",
+    "curtailRenewable",
+]
+# columns identifying a scenario
+RESULT_KEYS = ["share_storage", "share_generation", "share_renewable"]
+# tolerance used to match shares of a scenario in the results file
+SHARE_TOLERANCE = 1e-8
 
-def download_data(url, fn_out):
+
+def get_checksum(fn: str, algorithm: str = "sha256", chunk_size: int = 2**20) -> str:
+    """Get hex digest of a file
+
+    Args:
+        fn: name of the file
+        algorithm: hash algorithm supported by hashlib
+        chunk_size: number of bytes read at once
+    """
+    digest = hashlib.new(algorithm)
+    with open(fn, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def download_data(
+    url: str,
+    fn_out: str,
+    checksum: str | None = None,
+    algorithm: str = "sha256",
+    chunk_size: int = 2**20,
+    timeout: float = 60,
+) -> bool:
     """Download a new data set from url and store it to
-    the data directors
+    the data directors. The file is downloaded to a temporary file next to the
+    output file that is renamed once the download is complete and verified. An
+    interrupted download is resumed if the server supports range requests and
+    sent an ETag or Last-Modified header, which is passed as If-Range such that
+    a changed file is downloaded again from the start. A partial file the
+    server reports as complete is only used if its size and checksum match.
+    Cached results are keyed on the fingerprint of the file, see
+    get_fingerprint, such that the replaced file is read again while cached
+    results of other files are kept.
 
     Args:
         url: url of file to download
         fn_out: Output file name
+        checksum: expected hex digest of the file. If empty, no verification
+        algorithm: hash algorithm used for the checksum
+        chunk_size: number of bytes written at once
+        timeout: timeout for connecting and reading [s]
     """
+    # only needed for updates of the data
+    import requests
+
     # get the dropbox file
     url_ = url.strip()
-    headers = {"user-agent": "Wget/1.16 (linux-gnu)"}  # <-- the key is here!
-    response = requests.get(url_, stream=True, headers=headers)
-    response.raise_for_status()
-
-    # delete local file if exist
-    try:
-        os.remove(fn_out)
-    except OSError:
-        pass
+    checksum = None if checksum is None else checksum.strip().lower()
+    fn_part = f"{fn_out}.part"
+    # ETag or Last-Modified of the file the partial download belongs to
+    fn_validator = f"{fn_part}.validator"
+    verified = False
+    for attempt in range(2):
+        headers = {"user-agent": "Wget/1.16 (linux-gnu)"}  # <-- the key is here!
+        # resume an earlier download of the same file
+        pos = os.path.getsize(fn_part) if os.path.isfile(fn_part) else 0
+        if pos > 0 and os.path.isfile(fn_validator):
+            with open(fn_validator) as f:
+                headers["Range"] = f"bytes={pos}-"
+                headers["If-Range"] = f.read().strip()
+        with requests.get(
+            url_, stream=True, headers=headers, timeout=timeout
+        ) as response:
+            if response.status_code == 416 and "Range" in headers:
+                # the partial file may already hold the whole file
+                size = response.headers.get("Content-Range", "").rpartition("/")[2]
+                verified = (
+                    size == str(pos)
+                    and checksum is not None
+                    and get_checksum(fn_part, algorithm=algorithm) == checksum
+                )
+                if verified:
+                    break
+                # start again from an empty file
+                os.remove(fn_part)
+                continue
+            response.raise_for_status()
+            if response.status_code == 206:
+                mode = "ab"
+            else:
+                # server ignoring the range request or the file changed since
+                mode = "wb"
+                validator = response.headers.get("ETag", "")
+                # weak ETags cannot be used in If-Range
+                if not validator or validator.startswith("W/"):
+                    validator = response.headers.get("Last-Modified", "")
+                if validator:
+                    with open(fn_validator, "w") as f:
+                        f.write(validator)
+                elif os.path.isfile(fn_validator):
+                    os.remove(fn_validator)
+            with open(fn_part, mode) as f:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    f.write(chunk)
+        break
 
-    # write file to disk
-    with open(fn_out, "wb") as f:
-        for chunk in response.iter_content(chunk_size=1024):
-            if chunk:
-                f.write(chunk)
+    # verify and replace the existing file
+    if checksum is not None and not verified:
+        checksum_part = get_checksum(fn_part, algorithm=algorithm)
+        if checksum_part != checksum:
+            os.remove(fn_part)
+            raise ValueError(
+                f"Checksum of downloaded file {checksum_part} does not match {checksum}"
+            )
+    os.replace(fn_part, fn_out)
+    if os.path.isfile(fn_validator):
+        os.remove(fn_validator)
     return True
 
 
-@st.cache_data
+def curtail_res_first_expression() -> ds.Expression:
+    """Expression indicating whether renewables are curtailed before nuclear"""
+    return ds.field("costCurtailRenewable") <= ds.field("costCurtailNuclear")
+
+
+def get_results_dataset(fn_results: str) -> ds.Dataset:
+    """Open the results file as dataset. Parquet files are read as usual while
+    Arrow IPC files (.arrow, .feather) are memory mapped, i.e., scans read the
+    file through the page cache without copying it.
+
+    Args:
+        fn_results: name of file with hourly results
+    """
+    if os.path.splitext(fn_results)[1] in (".arrow", ".feather"):
+        return ds.dataset(
+            fn_results, format="ipc", filesystem=fs.LocalFileSystem(use_mmap=True)
+        )
+    return ds.dataset(fn_results, format="parquet")
+
+
+def scan_results(
+    fn_results: str,
+    columns: list[str] | None = None,
+    share_generation: float | None = None,
+    share_storage: float | None = None,
+    share_renewable: float | None = None,
+    curtail_res_first: bool | None = None,
+) -> pa.Table:
+    """Lazily scan the results file. Only the requested columns are read and all
+    filters are pushed down into the scan. The indicator curtailRenewableFirst
+    is added as computed column.
+
+    Args:
+        fn_results: name of file with hourly results, see get_results_dataset
+        columns: columns to read. If empty, all columns are read
+        share_generation: total generation as multiple of demand
+        share_storage: storage size as share of total demand
+        share_renewable: share of renewable in total generation
+        curtail_res_first: indicator whether renewable are curtailed first
+
+    Returns:
+        arrow table with selected columns and curtailRenewableFirst
+    """
+    dataset = get_results_dataset(fn_results)
+    if columns is None:
+        columns = dataset.schema.names
+    projection = {c: ds.field(c) for c in columns}
+    projection["curtailRenewableFirst"] = curtail_res_first_expression()
+
+    # combine all filters into a single predicate. Shares match up to the
+    # rounding applied in get_total_results
+    predicate = None
+    filters = [
+        (ds.field(col) >= val - SHARE_TOLERANCE)
+        & (ds.field(col) <= val + SHARE_TOLERANCE)
+        for col, val in zip(
+            RESULT_KEYS, [share_storage, share_generation, share_renewable]
+        )
+        if val is not None
+    ]
+    if curtail_res_first is not None:
+        filters.append(curtail_res_first_expression() == curtail_res_first)
+    for f in filters:
+        predicate = f if predicate is None else predicate & f
+    return dataset.to_table(columns=projection, filter=predicate)
+
+
+@st.cache_data(max_entries=64)
+def _get_hourly_results(
+    fn_results: str,
+    fingerprint: str,
+    share_generation: float,
+    share_storage: float,
+    share_renewable: float,
+    curtail_res_first=True,
+    columns: list[str] | None = None,
+) -> pd.DataFrame:
+    """Get hourly results cached by fingerprint of the results file, see
+    get_hourly_results
+    """
+    return scan_results(
+        fn_results,
+        columns=columns,
+        share_generation=share_generation,
+        share_storage=share_storage,
+        share_renewable=share_renewable,
+        curtail_res_first=curtail_res_first,
+    ).to_pandas()
+
+
 def get_hourly_results(
     fn_results: str,
     share_generation: float,
     share_storage: float,
     share_renewable: float,
     curtail_res_first=True,
+    columns: list[str] | None = None,
 ) -> pd.DataFrame:
     """
     Get hourly results
@@ -47,58 +248,196 @@ def get_hourly_results(
         fn_results: name of file with hourly results
         share_generation: total generation as multiple of demand
         curtail_res_first: indicator whether renewable are curtailed fir
+        columns: columns to read. If empty, all columns are read
     """
-    df = pd.read_parquet(
+    return _get_hourly_results(
         fn_results,
-        filters=[
-            (f"share_generation", "==", share_generation),
-            (f"share_storage", "==", share_storage),
-            (f"share_renewable", "==", share_renewable),
-        ],
-    ).assign(
-        curtailRenewableFirst=lambda df: df["costCurtailRenewable"]
-        <= df["costCurtailNuclear"],
+        get_fingerprint(fn_results),
+        share_generation,
+        share_storage,
+        share_renewable,
+        curtail_res_first,
+        columns,
     )
-    return df[df["curtailRenewableFirst"] == curtail_res_first]
 
 
-@st.cache_data
-def get_total_results(fn_results: str) -> pd.DataFrame:
-    """Get results aggregate over all periods
+@functools.lru_cache(maxsize=32)
+def _get_scenario_table(
+    fn_results: str,
+    fingerprint: str,
+    share_generation: float,
+    share_storage: float,
+    share_renewable: float,
+    curtail_res_first: bool = True,
+    columns: tuple[str, ...] | None = None,
+) -> pa.Table:
+    """Get hourly results of a single scenario cached by fingerprint of the
+    results file, see get_scenario_table
+    """
+    if columns is not None:
+        names = get_results_dataset(fn_results).schema.names
+        columns = [c for c in columns if c in names]
+    return scan_results(
+        fn_results,
+        columns=columns,
+        share_generation=share_generation,
+        share_storage=share_storage,
+        share_renewable=share_renewable,
+        curtail_res_first=curtail_res_first,
+    ).sort_by("date")
+
+
+def get_scenario_table(
+    fn_results: str,
+    share_generation: float,
+    share_storage: float,
+    share_renewable: float,
+    curtail_res_first: bool = True,
+    columns: tuple[str, ...] | None = None,
+) -> pa.Table:
+    """Get hourly results of a single scenario sorted by date. Tables are kept in
+    a least-recently-used cache shared by all sessions such that scenarios
+    loaded in the background are available immediately.
 
     Args:
         fn_results: name of file with hourly results
+        share_generation: total generation as multiple of demand
+        share_storage: storage size as share of total demand
+        share_renewable: share of renewable in total generation
+        curtail_res_first: indicator whether renewable are curtailed first
+        columns: columns to read. Columns not in the file are skipped. If
+            empty, all columns are read
     """
-    # settings for aggregation
-    cols = [
-        "nuclear",
-        "renewable",
-        "netStorage",
-        "demand",
-        "energyNotServed",
-        "curtailNuclear",
-        "curtailRenewable",
-    ]
-    idx = [
-        "share_storage",
-        "share_generation",
-        "share_renewable",
-        "curtailRenewableFirst",
-    ]
-    # get results, add indicator which technology is dispatched first, and aggregate
-    df_annual = (
-        pd.read_parquet(fn_results)
-        .assign(
-            curtailRenewableFirst=lambda df: df["costCurtailRenewable"]
-            <= df["costCurtailNuclear"],
+    return _get_scenario_table(
+        fn_results,
+        get_fingerprint(fn_results),
+        share_generation,
+        share_storage,
+        share_renewable,
+        curtail_res_first,
+        columns,
+    )
+
+
+@st.cache_resource
+def get_connection(fn_results: str):
+    """Get database connection with sql views over the results file, see
+    query.connect. The connection is shared between sessions.
+
+    Args:
+        fn_results: name of file with hourly results
+    """
+    from .query import connect
+
+    return connect(fn_results)
+
+
+def query_results(
+    fn_results: str, sql: str, params: list | dict | None = None
+) -> pd.DataFrame:
+    """Run sql query against the views over the results file, e.g.,
+    "SELECT * FROM scenario_cost(?, ?, ?, ?) WHERE energyNotServed = 0"
+
+    Args:
+        fn_results: name of file with hourly results
+        sql: query using the views and macros of query.connect
+        params: parameters of a prepared statement
+    """
+    # each query uses its own cursor such that sessions can query in parallel
+    return get_connection(fn_results).cursor().execute(sql, params).df()
+
+
+def aggregate_results(fn_results: str, engine: str = "arrow") -> pa.Table:
+    """Aggregate results over all periods. Only key and measure columns
+    are read from the results file.
+
+    Args:
+        fn_results: name of file with hourly results
+        engine: "arrow" to aggregate with a pyarrow scan or "duckdb" to use the
+            sql view annual_totals, which aggregates out of core
+    """
+    if engine == "duckdb":
+        con = get_connection(fn_results).cursor()
+        return con.sql("FROM annual_totals").fetch_arrow_table()
+    idx = RESULT_KEYS + ["curtailRenewableFirst"]
+    tbl = (
+        scan_results(fn_results, columns=RESULT_KEYS + RESULT_MEASURES)
+        .group_by(idx)
+        .aggregate([(c, "sum") for c in RESULT_MEASURES])
+    )
+    return (
+        tbl.rename_columns(
+            [c.removesuffix("_sum") for c in tbl.column_names]
         )
-        .groupby(idx, as_index=False)[cols]
-        .sum()
+        .select(idx + RESULT_MEASURES)
+        .sort_by([(c, "ascending") for c in idx])
     )
+
+
+def get_annual_results_file(fn_results: str) -> str:
+    """Get name of the file storing the results aggregated over all periods
+
+    Args:
+        fn_results: name of file with hourly results
+    """
+    return f"{os.path.splitext(fn_results)[0]}_annual.parquet"
+
+
+def load_annual_results(fn_results: str, engine: str = "arrow") -> pa.Table:
+    """Get results aggregated over all periods. The aggregate is stored next to
+    the results file together with the fingerprint of the results file and is
+    only recomputed if the results file changed.
+
+    Args:
+        fn_results: name of file with hourly results
+        engine: engine used for the aggregation, see aggregate_results
+    """
+    fn_annual = get_annual_results_file(fn_results)
+    fingerprint = get_fingerprint(fn_results).encode()
+    if os.path.isfile(fn_annual):
+        tbl = pq.read_table(fn_annual)
+        if (tbl.schema.metadata or {}).get(b"fingerprint") == fingerprint:
+            return tbl
+    tbl = aggregate_results(fn_results, engine=engine)
+    tbl = tbl.replace_schema_metadata({b"fingerprint": fingerprint})
+    try:
+        write_atomic(fn_annual, lambda fn: pq.write_table(tbl, fn))
+    except OSError:
+        # the dashboard also works with read-only data directories
+        pass
+    return tbl
+
+
+def get_total_results(
+    fn_results: str, total_demand: float | None = None
+) -> pd.DataFrame:
+    """Get results aggregate over all periods
+
+    Args:
+        fn_results: name of file with hourly results
+        total_demand: If provided, results of each scenario are rescaled to
+            the given total demand. The model is linear in demand, generation,
+            and storage size, so results of any demand level are exact
+            multiples of each other
+    """
+    return _get_total_results(fn_results, get_fingerprint(fn_results), total_demand)
+
+
+@st.cache_data(max_entries=16)
+def _get_total_results(
+    fn_results: str, fingerprint: str, total_demand: float | None = None
+) -> pd.DataFrame:
+    """Get results aggregate over all periods cached by fingerprint of the
+    results file, see get_total_results
+    """
+    # get aggregated results with indicator which technology is dispatched first
+    df_annual = load_annual_results(fn_results).to_pandas()
+    if total_demand is not None:
+        factor = total_demand / df_annual["demand"]
+        df_annual[RESULT_MEASURES] = df_annual[RESULT_MEASURES].mul(factor, axis=0)
     # to some rounding in the index columns to avoid mismatches due to
     # precision caused by parquet file inputs
-    to_round = ["share_storage", "share_generation", "share_renewable"]
-    df_annual.loc[:, to_round] = df_annual.loc[:, to_round].round(8)
+    df_annual.loc[:, RESULT_KEYS] = df_annual.loc[:, RESULT_KEYS].round(8)
 
     # curtailment in percent of total generation
     df_annual = df_annual.assign(
@@ -112,6 +451,78 @@ def get_total_results(fn_results: str) -> pd.DataFrame:
     return df_annual.fillna(0)
 
 
+def get_results_cube(fn_results: str) -> ResultsCube:
+    """Get results aggregated over all periods indexed as dense cube. The cube
+    is shared between sessions and is not copied on access. It holds the
+    results as stored, use ResultsCube.rescale to change the demand level.
+
+    Args:
+        fn_results: name of file with hourly results
+    """
+    return _get_results_cube(fn_results, get_fingerprint(fn_results))
+
+
+@st.cache_resource(max_entries=16)
+def _get_results_cube(fn_results: str, fingerprint: str) -> ResultsCube:
+    """Get results cube cached by fingerprint of the results file, see
+    get_results_cube
+    """
+    return build_results_cube(get_total_results(fn_results))
+
+
+def get_surrogate_error(
+    fn_results: str,
+    variable: str,
+    curtail_res_first: bool,
+    method: str,
+    unit_cost: dict[str, float],
+    total_demand: float | None = None,
+) -> np.ndarray:
+    """Get hold-out error of the surrogate, see surrogate.get_holdout_error.
+    Cached as every grid slice is interpolated once per axis.
+
+    Args:
+        fn_results: name of file with hourly results
+        variable: measure of the cube or "cost"
+        curtail_res_first: indicator whether renewable are curtailed first
+        method: interpolation method, see surrogate.SURROGATE_METHODS
+        unit_cost: unit costs used if variable is "cost", see ResultsCube.get_cost
+        total_demand: If provided, results are rescaled to the given total
+            demand, see get_total_results
+    """
+    return _get_surrogate_error(
+        fn_results,
+        get_fingerprint(fn_results),
+        variable,
+        curtail_res_first,
+        method,
+        unit_cost,
+        total_demand,
+    )
+
+
+@st.cache_data(max_entries=64)
+def _get_surrogate_error(
+    fn_results: str,
+    fingerprint: str,
+    variable: str,
+    curtail_res_first: bool,
+    method: str,
+    unit_cost: dict[str, float],
+    total_demand: float | None = None,
+) -> np.ndarray:
+    """Get hold-out error of the surrogate cached by fingerprint of the results
+    file, see get_surrogate_error
+    """
+    # imported here as scipy is only needed by the surrogate
+    from .surrogate import get_holdout_error
+
+    cube = get_results_cube(fn_results)
+    if total_demand is not None:
+        cube = cube.rescale(total_demand)
+    return get_holdout_error(cube, variable, curtail_res_first, method, **unit_cost)
+
+
 @st.cache_data
 def get_profiles(df: pd.DataFrame) -> dict[str, pd.DataFrame]:
     """Get profile by hour and month
@@ -146,7 +557,7 @@ def get_profiles(df: pd.DataFrame) -> dict[str, pd.DataFrame]:
     return res
 
 
-@st.cache_data
+@st.cache_data(persist="disk", max_entries=512)
 def normalize_generation(
     df: pd.DataFrame,
     shares: dict[str, float],
@@ -178,11 +589,12 @@ def normalize_generation(
     return df_[list(shares.keys())]
 
 
-@st.cache_data
 def get_generation(
     fn_gen: str, fn_cap: str, country: str, year: int
 ) -> tuple[pd.DataFrame, pd.DataFrame]:
-    """Get renewable generation and demand together with capacity by country and year
+    """Get renewable generation and demand together with capacity by country and year.
+    Data are served from the precomputed catalog, see build_catalog. Only if the
+    country and year are not part of the catalog, the files are scanned.
 
     Args:
         fn_gen: name of parquet file with generation ata
@@ -193,7 +605,12 @@ def get_generation(
     Returns:
         Hourly renewable generation, annual aggregate
     """
-    df = (
+    catalog = load_catalog(fn_gen, fn_cap)
+    if (country, year) in catalog:
+        df, df_cap = catalog[(country, year)]
+        return df.copy(), df_cap.copy()
+
+    df = prepare_generation(
         pd.read_parquet(
             fn_gen,
             filters=[
@@ -205,47 +622,16 @@ def get_generation(
         .set_index("dateTime")
         .drop("country", axis=1)
     )
-    df.columns = [c[:1].capitalize() + c[1:] for c in df.columns]
-    df["Wind"] = df["WindOffshore"].fillna(0) + df["WindOnshore"].fillna(0)
 
     # get capacity
     df_cap = pd.read_parquet(
         fn_cap,
         filters=[("country", "==", country), ("year", "==", year)],
     ).drop(["country", "year"], axis=1)
-    print("!!!!!!!!!!!!!!\n\n\n", df_cap)
-    # if not data provide an empty frame
-    if len(df_cap) == 0 or df_cap is None:
-        return df, pd.DataFrame(
-            columns=[
-                "Wind",
-                "Solar",
-                "AnnualGeneration",
-                "Demand",
-                "DemandShare",
-                "Fullload Hours",
-            ],
-            index=[
-                "Capacity",
-            ],
-        )
-    df_cap = (
-        df_cap.rename(columns={c: c[:1].capitalize() + c[1:] for c in df_cap.columns})
-        .assign(
-            Wind=lambda df: df["WindOffshore"].fillna(0) + df["WindOnshore"].fillna(0)
-        )
-        .set_axis(["Capacity"])
-    )
-    df_cap = pd.concat([df_cap, df.sum().to_frame("AnnualGeneration").T]).T.assign(
-        **{"Fullload Hours": lambda df: df["AnnualGeneration"] / df["Capacity"]}
-    )
-    df_cap["DemandShare"] = (
-        100 * df_cap["AnnualGeneration"] / df_cap.loc["Demand", "AnnualGeneration"]
-    )
-    return df, df_cap
+    return df, get_annual_statistics(df, df_cap)
 
 
-@st.cache_data
+@st.cache_data(persist="disk", max_entries=512)
 def get_storage_stats(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
     """Get curtailment and energy overshoot given the frame of generation
 
@@ -0,0 +1,133 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from .cube import ResultsCube
+from .data import get_scenario_table
+
+# hourly results shown in the drill-down
+DRILLDOWN_COLUMNS = (
+    "date",
+    "nuclear",
+    "renewable",
+    "netStorage",
+    "demand",
+    "energyNotServed",
+    "storageLevel",
+    "curtailNuclear",
+    "curtailRenewable",
+)
+
+# single background worker loading neighbouring scenarios into the cache of
+# get_scenario_table
+_prefetch_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+
+
+def load_scenario(
+    fn_results: str,
+    share_generation: float,
+    share_storage: float,
+    share_renewable: float,
+    curtail_res_first: bool = True,
+    columns: tuple[str, ...] = DRILLDOWN_COLUMNS,
+) -> pa.Table:
+    """Get hourly results of a scenario through the cache of get_scenario_table.
+    The cache keys on how the arguments are passed, hence the panel and the
+    prefetch both load scenarios with this function.
+
+    Args:
+        fn_results: name of file with hourly results
+        share_generation: total generation as multiple of demand
+        share_storage: storage size as share of total demand
+        share_renewable: share of renewable in total generation
+        curtail_res_first: indicator whether renewable are curtailed first
+        columns: columns to read, see get_scenario_table
+    """
+    return get_scenario_table(
+        fn_results,
+        float(share_generation),
+        float(share_storage),
+        float(share_renewable),
+        bool(curtail_res_first),
+        tuple(columns),
+    )
+
+
+def get_window(tbl: pa.Table, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+    """Get hours of a scenario within a time window. Only the window is
+    converted to pandas.
+
+    Args:
+        tbl: hourly results sorted by date, see get_scenario_table
+        start: first hour of the window
+        end: last hour of the window
+
+    Returns:
+        hourly results indexed by date
+    """
+    dates = tbl["date"].to_numpy()
+    first = np.searchsorted(dates, np.datetime64(start), side="left")
+    last = np.searchsorted(dates, np.datetime64(end), side="right")
+    return tbl.slice(first, last - first).to_pandas().set_index("date")
+
+
+def get_neighbours(
+    cube: ResultsCube, share_storage: float, share_renewable: float
+) -> list[tuple[float, float]]:
+    """Get scenarios one storage or renewable step away in the cube
+
+    Args:
+        cube: annual results, see build_results_cube
+        share_storage: storage size as share of total demand
+        share_renewable: share of renewable in total generation
+
+    Returns:
+        list with storage and renewable share of the neighbours
+    """
+    pos_sto = np.abs(cube.share_storage - share_storage).argmin()
+    pos_ren = np.abs(cube.share_renewable - share_renewable).argmin()
+    neighbours = []
+    for step in [-1, 1]:
+        if 0 <= pos_sto + step < len(cube.share_storage):
+            neighbours.append((cube.share_storage[pos_sto + step], share_renewable))
+        if 0 <= pos_ren + step < len(cube.share_renewable):
+            neighbours.append((share_storage, cube.share_renewable[pos_ren + step]))
+    return neighbours
+
+
+def prefetch_neighbours(
+    fn_results: str,
+    cube: ResultsCube,
+    share_generation: float,
+    share_storage: float,
+    share_renewable: float,
+    curtail_res_first: bool = True,
+    columns: tuple[str, ...] = DRILLDOWN_COLUMNS,
+) -> list[Future]:
+    """Load the neighbouring scenarios in a background thread such that
+    selecting them is served from the cache
+
+    Args:
+        fn_results: name of file with hourly results
+        cube: annual results, see build_results_cube
+        share_generation: total generation as multiple of demand
+        share_storage: storage size as share of total demand
+        share_renewable: share of renewable in total generation
+        curtail_res_first: indicator whether renewable are curtailed first
+        columns: columns to read, see get_scenario_table
+
+    Returns:
+        futures of the loaded tables
+    """
+    return [
+        _prefetch_pool.submit(
+            load_scenario,
+            fn_results,
+            share_generation,
+            sto,
+            ren,
+            curtail_res_first,
+            columns,
+        )
+        for sto, ren in get_neighbours(cube, share_storage, share_renewable)
+    ]
@@ -0,0 +1,301 @@
+from concurrent.futures import ProcessPoolExecutor
+import gzip
+import json
+import os
+import re
+from typing import Any
+import plotly.graph_objects as go
+from .cube import ResultsCube
+from .components import get_countries
+from .dashboard import COLORS, PROFILES, TECH_ORDER
+from .dashboard_model_results import HEATMAP_VARIABLES
+from .data import get_generation, get_profiles, get_results_cube, normalize_generation
+from .graphs import plot_daily_generation, plot_heatmap, plot_profile
+from .warmup import SHARE_PRESETS, YEARS
+
+# unit costs of the exported heatmaps, the default set are the sidebar defaults
+COST_SETS = {
+    "default": {"cost_res": 2.0, "cost_nuc": 1.0, "cost_sto": 10.0, "cost_ens": 10.0}
+}
+
+# results cube of a worker process, see _init_worker
+_cube: ResultsCube | None = None
+
+
+def get_key(*values: Any) -> str:
+    """Get file name of a figure from the values of the controls. Characters
+    not allowed in file names or urls are dropped.
+
+    Args:
+        values: values of the controls
+    """
+    return "_".join(
+        f"{v:.6g}" if isinstance(v, float) else re.sub(r"[^\w.-]", "", str(v))
+        for v in values
+    )
+
+
+def write_figure(fig: go.Figure, fn: str):
+    """Write figure as gzip compressed plotly json
+
+    Args:
+        fig: figure to write
+        fn: name of the output file
+    """
+    with gzip.open(fn, "wt", encoding="utf-8") as f:
+        f.write(fig.to_json())
+
+
+def _init_worker(fn_results: str | None):
+    """Load the results cube once per worker process
+
+    Args:
+        fn_results: name of file with hourly results
+    """
+    global _cube
+    if fn_results is not None:
+        _cube = get_results_cube(fn_results)
+
+
+def _render_heatmap(task: tuple) -> str:
+    """Render heatmap of one combination of the model dashboard controls
+
+    Args:
+        task: generation share, variable, curtailment order, unit costs, and
+            name of the output file
+    """
+    share_generation, variable, curtail_res_first, unit_cost, fn = task
+    df_plot = _cube.get_surface(
+        variable, share_generation, curtail_res_first, **unit_cost
+    )
+    write_figure(plot_heatmap(df_plot, variable=variable), fn)
+    return fn
+
+
+def _render_profiles(task: tuple) -> list[str]:
+    """Render daily generation and profiles of one combination of the profile
+    dashboard controls
+
+    Args:
+        task: files with generation and capacity, country, year, demand shares,
+            total demand, and output files by figure
+    """
+    fn_gen, fn_cap, country, year, shares, total_demand, files = task
+    df_gen, _ = get_generation(fn_gen, fn_cap, country=country, year=year)
+    if len(df_gen) == 0:
+        return []
+    df_norm = normalize_generation(
+        df_gen, shares=dict(shares), total_demand=total_demand
+    )
+    figures = {
+        "Daily": plot_daily_generation(df_norm, colors=COLORS, tech_order=TECH_ORDER)
+    }
+    profiles = get_profiles(df_norm)
+    for p in PROFILES:
+        figures[p] = plot_profile(
+            profiles[p].copy(), colors=COLORS, title=p, tech_order=TECH_ORDER
+        )
+    for name, fig in figures.items():
+        write_figure(fig, files[name])
+    return list(files.values())
+
+
+def write_index(dir_out: str, manifest: dict[str, Any]):
+    """Write the index page and the manifest listing the exported figures. The
+    page loads the figures in the browser, i.e., no server-side computation is
+    needed beyond serving static files.
+
+    Args:
+        dir_out: output directory
+        manifest: controls and their values by dashboard
+    """
+    with open(os.path.join(dir_out, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    with open(os.path.join(dir_out, "index.html"), "w") as f:
+        f.write(INDEX_HTML)
+
+
+def export_dashboards(
+    dir_out: str,
+    fn_results: str | None = None,
+    fn_gen: str | None = None,
+    fn_cap: str | None = None,
+    cost_sets: dict[str, dict[str, float]] | None = None,
+    countries: list[str] | None = None,
+    years: list[int] | None = None,
+    share_presets: list[dict[str, float]] | None = None,
+    total_demand: float = 0,
+    max_workers: int | None = None,
+) -> int:
+    """Pre-render the figures of the dashboards for every combination of their
+    discrete controls as gzip compressed plotly json. For the model dashboard,
+    heatmaps are rendered for each generation share, variable, curtailment
+    order, and cost set. For the profile dashboard, daily generation and
+    profiles are rendered for each country, year, and share preset. Figures are
+    rendered in parallel processes. An index page showing the figures is
+    written to the output directory.
+
+    Args:
+        dir_out: output directory
+        fn_results: name of file with hourly results. If empty, no heatmaps
+        fn_gen: name of parquet file with generation data. If empty, no profiles
+        fn_cap: name of parquet file with capacity
+        cost_sets: unit costs by name, see ResultsCube.get_cost. If empty,
+            COST_SETS is used
+        countries: countries to include. If empty, all countries of the
+            capacity file
+        years: years to include. If empty, the years of the sidebar
+        share_presets: demand shares by technology. If empty, the sidebar
+            defaults
+        total_demand: Total demand to normalize demand, 0 for no scaling
+        max_workers: number of parallel processes. If empty, number of cores
+
+    Returns:
+        number of written figures
+    """
+    cost_sets = COST_SETS if cost_sets is None else cost_sets
+    manifest = {}
+    n_figures = 0
+    with ProcessPoolExecutor(
+        max_workers=max_workers, initializer=_init_worker, initargs=(fn_results,)
+    ) as pool:
+        if fn_results is not None:
+            os.makedirs(os.path.join(dir_out, "heatmap"), exist_ok=True)
+            cube = get_results_cube(fn_results)
+            tasks = [
+                (
+                    share_generation,
+                    variable,
+                    bool(curtail_res_first),
+                    unit_cost,
+                    os.path.join(
+                        dir_out,
+                        "heatmap",
+                        get_key(
+                            float(share_generation),
+                            variable,
+                            bool(curtail_res_first),
+                            cost_name,
+                        )
+                        + ".json.gz",
+                    ),
+                )
+                for share_generation in cube.share_generation
+                for variable in HEATMAP_VARIABLES
+                for curtail_res_first in cube.curtail_res_first
+                for cost_name, unit_cost in cost_sets.items()
+            ]
+            n_figures += len(list(pool.map(_render_heatmap, tasks, chunksize=16)))
+            manifest["heatmap"] = {
+                "share_generation": [get_key(float(v)) for v in cube.share_generation],
+                "variable": HEATMAP_VARIABLES,
+                "curtail_res_first": [str(bool(v)) for v in cube.curtail_res_first],
+                "cost_set": list(cost_sets),
+            }
+
+        if fn_gen is not None and fn_cap is not None:
+            os.makedirs(os.path.join(dir_out, "profile"), exist_ok=True)
+            countries = get_countries(fn_cap) if countries is None else countries
+            years = YEARS if years is None else years
+            share_presets = SHARE_PRESETS if share_presets is None else share_presets
+            presets = {get_key(*s.values()): s for s in share_presets}
+            figures = ["Daily"] + PROFILES
+            tasks = [
+                (
+                    fn_gen,
+                    fn_cap,
+                    country,
+                    year,
+                    shares,
+                    total_demand,
+                    {
+                        name: os.path.join(
+                            dir_out,
+                            "profile",
+                            get_key(country, year, preset, name) + ".json.gz",
+                        )
+                        for name in figures
+                    },
+                )
+                for country in countries
+                for year in years
+                for preset, shares in presets.items()
+            ]
+            n_figures += sum(len(f) for f in pool.map(_render_profiles, tasks))
+            manifest["profile"] = {
+                "country": list(countries),
+                "year": [str(y) for y in years],
+                "preset": list(presets),
+                "figure": [get_key(f) for f in figures],
+            }
+    write_index(dir_out, manifest)
+    return n_figures
+
+
+# static page selecting the figures by the controls in the manifest. Figures
+# are decompressed in the browser
+INDEX_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Baseload Paper</title>
+<script src="https://cdn.plot.ly/plotly-2.27.0.min.js"></script>
+<style>
+body { font-family: sans-serif; margin: 1em; }
+label { margin-right: 1em; }
+.figure { width: 100%; height: 600px; }
+</style>
+</head>
+<body>
+<h1>Baseload Paper</h1>
+<div id="dashboards"></div>
+<script>
+async function loadFigure(url, div) {
+  const response = await fetch(url);
+  if (!response.ok) {
+    div.textContent = "No figure for this selection.";
+    return;
+  }
+  const stream = response.body.pipeThrough(new DecompressionStream("gzip"));
+  const fig = JSON.parse(await new Response(stream).text());
+  div.textContent = "";
+  Plotly.react(div, fig.data, fig.layout, {responsive: true});
+}
+
+function addDashboard(name, controls) {
+  const section = document.createElement("section");
+  section.innerHTML = "<h2>" + name + "</h2>";
+  const selects = [];
+  for (const [control, values] of Object.entries(controls)) {
+    const label = document.createElement("label");
+    label.textContent = control + " ";
+    const select = document.createElement("select");
+    for (const v of values) {
+      select.add(new Option(v, v));
+    }
+    label.appendChild(select);
+    section.appendChild(label);
+    selects.push(select);
+  }
+  const div = document.createElement("div");
+  div.className = "figure";
+  section.appendChild(div);
+  document.getElementById("dashboards").appendChild(section);
+  const update = () => loadFigure(
+    name + "/" + selects.map((s) => s.value).join("_") + ".json.gz", div
+  );
+  selects.forEach((s) => s.addEventListener("change", update));
+  update();
+}
+
+fetch("manifest.json")
+  .then((response) => response.json())
+  .then((manifest) => {
+    for (const [name, controls] of Object.entries(manifest)) {
+      addDashboard(name, controls);
+    }
+  });
+</script>
+</body>
+</html>
+"""
@@ -1,10 +1,12 @@
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
+from plotly.subplots import make_subplots
+from .cube import ResultsCube
 
 
 def get_plot_variable(
-    df_annual: pd.DataFrame,
+    cube: ResultsCube,
     cost_res: float,
     cost_nuc: float,
     cost_sto: float,
@@ -14,7 +16,7 @@ def get_plot_variable(
 ) -> pd.DataFrame:
     """Get data for plotting depending and calculate cost
     Args:
-        df_annual: results aggregated over the whole time horizon
+        cube: results aggregated over the whole time horizon indexed as cube
         cost_res: cost to install renewable generation [Euro/MWh]
         cost_nuc: cost to install nuclear generation [Euro/MWh]
         cost_res: cost to install storage facility [Euro/MWh]
@@ -22,36 +24,47 @@ def get_plot_variable(
         share_generation: total generation as multiple of demand
         curtail_res_first: indicator whether renewable are curtailed first
     """
-    df = (
-        df_annual.query(f"share_generation == {share_generation}")
-        .query(f"curtailRenewableFirst == {curtail_res_first}")
-        .assign(
-            cost=lambda df: (
-                (df["nuclear"] + df["curtailNuclear"]) * cost_nuc
-                + (df["renewable"] + df["curtailRenewable"]) * cost_res
-                + df["energyNotServed"] * cost_ens
-                + df["demand"] * df["share_storage"] * cost_sto
-            )
-        )
-        .drop(["curtailRenewableFirst", "share_generation"], axis=1)
-        .set_index(["share_storage", "share_renewable"])
-        .reset_index()
+    pos_gen, pos_cur = cube.get_position(share_generation, curtail_res_first)
+    sto, ren = np.meshgrid(cube.share_storage, cube.share_renewable, indexing="ij")
+    df = pd.DataFrame(
+        {
+            "share_storage": sto.ravel(),
+            "share_renewable": ren.ravel(),
+            **{
+                m: values[:, :, pos_gen, pos_cur].ravel()
+                for m, values in cube.measures.items()
+            },
+            "cost": cube.get_surface(
+                "cost",
+                share_generation,
+                curtail_res_first,
+                cost_res=cost_res,
+                cost_nuc=cost_nuc,
+                cost_sto=cost_sto,
+                cost_ens=cost_ens,
+            ).values.ravel(),
+        }
     )
-    return df
+    # drop scenarios that are not part of the results
+    return df[df["demand"].notna()].reset_index(drop=True)
 
 
-def plot_heatmap(df_plot: pd.DataFrame, variable: str = "cost") -> go.Figure:
+def plot_heatmap(
+    df_plot: pd.DataFrame, variable: str = "cost", grid_ticks: bool = True
+) -> go.Figure:
     """Plot heat map for a given variable
 
     Args:
-        df_plot: basic data for plotting already filtered for generation share
+        df_plot: values of the variable with storage sizes as index and
+            renewable shares as columns, see ResultsCube.get_surface
         variable: variable to plot
+        grid_ticks: if true, every row and column gets a tick. Use false for
+            fine grids, e.g., from get_surrogate_surface
     """
-    df = df_plot.pivot_table(
-        variable,
-        "share_storage",
-        "share_renewable",
-    )
+    # plotly express is slow to import and only needed here
+    import plotly.express as px
+
+    df = df_plot
     fig = px.imshow(
         df.values,
         x=[i * 100 for i in df.columns],
@@ -63,10 +76,11 @@ def plot_heatmap(df_plot: pd.DataFrame, variable: str = "cost") -> go.Figure:
         ),
         aspect="auto",
     )
-    fig.update_layout(
-        xaxis=dict(tickmode="array", tickvals=[i * 100 for i in df.columns]),
-        yaxis=dict(tickmode="array", tickvals=[i * 100 for i in df.index]),
-    )
+    if grid_ticks:
+        fig.update_layout(
+            xaxis=dict(tickmode="array", tickvals=[i * 100 for i in df.columns]),
+            yaxis=dict(tickmode="array", tickvals=[i * 100 for i in df.index]),
+        )
     return fig
 
 
@@ -185,3 +199,114 @@ def plot_daily_generation(
         ),
     )
     return fig
+
+
+def plot_weather_years(df: pd.DataFrame, title: str = "", ytitle: str = "Energy [MWh]"):
+    """Plot one line per weather year to compare them side by side
+
+    Args:
+        df: dataframe with one column by country and year and x-axis as index
+        title: title for the plot
+        ytitle: title of the y-axis
+    """
+    fig = go.Figure()
+    for c in df.columns:
+        fig.add_trace(
+            go.Scatter(
+                x=df.index,
+                y=df[c],
+                mode="lines",
+                line=dict(width=1),
+                name=c,
+            )
+        )
+    fig.update_layout(
+        yaxis=dict(title=ytitle, rangemode="tozero"),
+        xaxis=dict(title=df.index.name),
+        title=dict(text=title, xanchor="center", yanchor="top", x=0.45),
+    )
+    return fig
+
+
+def decimate(s: pd.Series, max_points: int = 2000) -> pd.Series:
+    """Reduce a series to at most max_points points keeping the minimum and
+    maximum of each block of consecutive values such that peaks stay visible
+
+    Args:
+        s: series to reduce
+        max_points: maximum number of points
+    """
+    if len(s) <= max_points:
+        return s
+    size = int(np.ceil(len(s) / (max_points // 2)))
+    values = s.to_numpy(dtype=float)
+    blocks = np.pad(
+        values, (0, -len(values) % size), constant_values=np.nan
+    ).reshape(-1, size)
+    offset = np.arange(len(blocks)) * size
+    pos = np.union1d(
+        offset + np.nanargmin(blocks, axis=1), offset + np.nanargmax(blocks, axis=1)
+    )
+    return s.iloc[pos]
+
+
+def plot_hourly_results(
+    df: pd.DataFrame, max_points: int = 2000, colors: dict[str, str] | None = None
+) -> go.Figure:
+    """Plot dispatch, storage level, and curtailment of a scenario. Traces are
+    decimated to keep the figure responsive for long time windows.
+
+    Args:
+        df: hourly results of one scenario indexed by date
+        max_points: maximum number of points per trace, see decimate
+        colors: colors of the variables
+    """
+    colors = (
+        {
+            "nuclear": "Black",
+            "renewable": "Green",
+            "netStorage": "Blue",
+            "energyNotServed": "Purple",
+            "demand": "Red",
+            "storageLevel": "Blue",
+            "curtailNuclear": "Black",
+            "curtailRenewable": "Green",
+        }
+        if colors is None
+        else colors
+    )
+    rows = {
+        1: ["nuclear", "renewable", "netStorage", "energyNotServed", "demand"],
+        2: ["storageLevel"],
+        3: ["curtailNuclear", "curtailRenewable"],
+    }
+    fig = make_subplots(
+        rows=3,
+        cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.05,
+        subplot_titles=["Dispatch", "Storage level", "Curtailment"],
+    )
+    for row, variables in rows.items():
+        for c in variables:
+            if c not in df.columns:
+                continue
+            s = decimate(df[c], max_points=max_points)
+            fig.add_trace(
+                go.Scattergl(
+                    x=s.index,
+                    y=s,
+                    mode="lines",
+                    name=c,
+                    line=dict(width=1, color=colors.get(c)),
+                ),
+                row=row,
+                col=1,
+            )
+    fig.update_yaxes(title="Energy [MWh]")
+    fig.update_layout(
+        height=700,
+        legend=dict(yanchor="bottom", y=-0.2, xanchor="left", x=0.2, orientation="h"),
+        margin=go.layout.Margin(l=0, r=0, b=0, t=30),
+    )
+    return fig
@@ -0,0 +1,171 @@
+import numpy as np
+import pandas as pd
+from .cube import ResultsCube, COST_ORDER
+
+
+def _get_scenario_frame(
+    cube: ResultsCube, pos_scenario: np.ndarray, pos_slice: np.ndarray
+) -> pd.DataFrame:
+    """Get scenario specification for positions in the flattened cube
+
+    Args:
+        cube: annual results indexed as cube
+        pos_scenario: position in the flattened (storage, renewable) dimension
+        pos_slice: position in the flattened (generation, curtailment order)
+            dimension
+    """
+    pos_sto, pos_ren = np.unravel_index(
+        pos_scenario, (len(cube.share_storage), len(cube.share_renewable))
+    )
+    pos_gen, pos_cur = np.unravel_index(
+        pos_slice, (len(cube.share_generation), len(cube.curtail_res_first))
+    )
+    return pd.DataFrame(
+        {
+            "share_generation": cube.share_generation[pos_gen],
+            "curtailRenewableFirst": cube.curtail_res_first[pos_cur],
+            "share_storage": cube.share_storage[pos_sto],
+            "share_renewable": cube.share_renewable[pos_ren],
+        }
+    )
+
+
+def _flatten(values: np.ndarray) -> np.ndarray:
+    """Reshape cube values to (storage x renewable, generation x curtailment order)
+
+    Args:
+        values: array with dimension (storage, renewable, generation, curtailment
+            order) or with an additional leading dimension
+    """
+    shape = values.shape
+    return values.reshape(
+        shape[:-4] + (shape[-4] * shape[-3], shape[-2] * shape[-1])
+    )
+
+
+def get_cost_optimum(
+    cube: ResultsCube,
+    cost_res: float,
+    cost_nuc: float,
+    cost_sto: float,
+    cost_ens: float,
+) -> pd.DataFrame:
+    """Get cost minimizing storage size and renewable share for every
+    generation share and curtailment order
+
+    Args:
+        cube: annual results indexed as cube
+        cost_res: cost to install renewable generation [Euro/MWh]
+        cost_nuc: cost to install nuclear generation [Euro/MWh]
+        cost_sto: cost to install storage facility [Euro/MWh]
+        cost_ens: cost of energy not served [Euro/MWh]
+    """
+    return sweep_cost(
+        cube,
+        pd.DataFrame(
+            [[cost_res, cost_nuc, cost_sto, cost_ens]], columns=COST_ORDER
+        ),
+    ).drop("costScenario", axis=1)
+
+
+def get_pareto_frontier(
+    cube: ResultsCube,
+    cost_res: float,
+    cost_nuc: float,
+    cost_sto: float,
+    cost_ens: float,
+) -> pd.DataFrame:
+    """Get scenarios on the Pareto frontier of cost and energy-not-served for
+    every generation share and curtailment order. A scenario is on the frontier
+    if no other scenario has lower or equal cost and less energy-not-served.
+
+    Args:
+        cube: annual results indexed as cube
+        cost_res: cost to install renewable generation [Euro/MWh]
+        cost_nuc: cost to install nuclear generation [Euro/MWh]
+        cost_sto: cost to install storage facility [Euro/MWh]
+        cost_ens: cost of energy not served [Euro/MWh]
+    """
+    # dimension (generation x curtailment order, storage x renewable)
+    cost = _flatten(cube.get_cost(cost_res, cost_nuc, cost_sto, cost_ens)).T
+    ens = _flatten(cube.measures["energyNotServed"]).T
+    cost = np.where(np.isnan(cost), np.inf, cost)
+
+    # sort by cost and energy-not-served and keep scenarios improving on
+    # energy-not-served of all cheaper scenarios
+    order = np.lexsort((ens, cost), axis=-1)
+    cost_sorted = np.take_along_axis(cost, order, axis=-1)
+    ens_sorted = np.take_along_axis(ens, order, axis=-1)
+    ens_prev = np.concatenate(
+        [
+            np.full((ens_sorted.shape[0], 1), np.inf),
+            np.minimum.accumulate(ens_sorted, axis=-1)[:, :-1],
+        ],
+        axis=-1,
+    )
+    on_frontier = (ens_sorted < ens_prev) & np.isfinite(cost_sorted)
+    pos_slice, pos_sorted = np.nonzero(on_frontier)
+    return _get_scenario_frame(
+        cube, order[pos_slice, pos_sorted], pos_slice
+    ).assign(
+        cost=cost_sorted[pos_slice, pos_sorted],
+        energyNotServed=ens_sorted[pos_slice, pos_sorted],
+    )
+
+
+def sweep_cost(
+    cube: ResultsCube, unit_cost: pd.DataFrame, max_memory: float = 2**28
+) -> pd.DataFrame:
+    """Get cost minimizing storage size and renewable share for many unit cost
+    assumptions at once. Cost vectors are processed in chunks to limit memory.
+
+    Args:
+        cube: annual results indexed as cube
+        unit_cost: frame with one row per cost assumption and columns
+            cost_res, cost_nuc, cost_sto, cost_ens
+        max_memory: maximum size of intermediate cost arrays [bytes]
+
+    Returns:
+        frame with optimal scenario per cost assumption (costScenario refers to
+        the row of unit_cost), generation share, and curtailment order
+    """
+    weights = unit_cost[COST_ORDER].to_numpy(dtype=float)
+    components = _flatten(cube.cost_components)
+    ens = _flatten(cube.measures["energyNotServed"])
+    # scenarios not contained in the results are never optimal
+    missing = np.isnan(components).any(axis=0)
+    components = np.nan_to_num(components)
+    n_scenario, n_slice = components.shape[1:]
+    chunk_size = max(1, int(max_memory // (n_scenario * n_slice * 8)))
+
+    lst_pos, lst_cost = [], []
+    for start in range(0, len(weights), chunk_size):
+        cost = np.einsum(
+            "kb,bnm->knm", weights[start : start + chunk_size], components
+        )
+        cost[:, missing] = np.inf
+        pos = np.argmin(cost, axis=1)
+        lst_pos.append(pos)
+        lst_cost.append(np.take_along_axis(cost, pos[:, np.newaxis, :], axis=1)[:, 0])
+    pos = np.concatenate(lst_pos)
+    cost = np.concatenate(lst_cost)
+
+    pos_slice = np.tile(np.arange(n_slice), len(weights))
+    pos_scenario = pos.ravel()
+    df = _get_scenario_frame(cube, pos_scenario, pos_slice).assign(
+        costScenario=np.repeat(unit_cost.index.to_numpy(), n_slice),
+        cost=cost.ravel(),
+        energyNotServed=ens[pos_scenario, pos_slice],
+    )
+    # drop generation shares and curtailment orders without results
+    return df[np.isfinite(df["cost"])].reset_index(drop=True)[
+        [
+            "costScenario",
+            "share_generation",
+            "curtailRenewableFirst",
+            "share_storage",
+            "share_renewable",
+            "cost",
+            "energyNotServed",
+        ]
+    ]
@@ -0,0 +1,115 @@
+import duckdb
+import pandas as pd
+from .data import RESULT_KEYS, RESULT_MEASURES
+
+# columns identifying a scenario in the views
+VIEW_KEYS = RESULT_KEYS + ["curtailRenewableFirst"]
+
+
+def get_view_definitions(fn_results: str) -> dict[str, str]:
+    """Get sql definitions of the views over the results file. Views are
+    evaluated lazily, i.e., only the columns and row groups needed by a query
+    are read from the file.
+
+    Args:
+        fn_results: name of file with hourly results
+
+    Returns:
+        dictionary mapping name of the view to its select statement:
+            results: hourly results with indicator curtailRenewableFirst
+            annual_totals: results aggregated over all periods as in
+                aggregate_results
+            curtailment: annual totals with curtailment in percent of
+                generation as in get_total_results
+    """
+    path = fn_results.replace("'", "''")
+    keys = ", ".join(VIEW_KEYS)
+    return {
+        "results": f"""
+            SELECT *, costCurtailRenewable <= costCurtailNuclear AS curtailRenewableFirst
+            FROM read_parquet('{path}')
+        """,
+        "annual_totals": f"""
+            SELECT {keys}, {", ".join(f"sum({c}) AS {c}" for c in RESULT_MEASURES)}
+            FROM results
+            GROUP BY {keys}
+            ORDER BY {keys}
+        """,
+        "curtailment": """
+            SELECT *,
+                coalesce(
+                    curtailNuclear / nullif(nuclear + curtailNuclear, 0) * 100, 0
+                ) AS curtailNuclearPercent,
+                coalesce(
+                    curtailRenewable / nullif(renewable + curtailRenewable, 0) * 100, 0
+                ) AS curtailRenewablePercent
+            FROM annual_totals
+        """,
+    }
+
+
+def connect(
+    fn_results: str,
+    threads: int | None = None,
+    memory_limit: str | None = None,
+    temp_directory: str | None = None,
+) -> duckdb.DuckDBPyConnection:
+    """Open an in-memory database with views over the results file. Queries run
+    multi-threaded and spill to the temporary directory if they exceed the
+    memory limit. Besides the views of get_view_definitions, the table macro
+    scenario_cost(cost_res, cost_nuc, cost_sto, cost_ens) gives the curtailment
+    view with the cost under the given unit costs as in ResultsCube.get_cost.
+
+    Args:
+        fn_results: name of file with hourly results
+        threads: number of threads. If empty, all cores are used
+        memory_limit: memory limit of the database, e.g., "4GB". If empty, the
+            default of duckdb is used
+        temp_directory: directory for data spilled to disk. If empty, the
+            default of duckdb is used
+
+    Returns:
+        connection to the database
+    """
+    config = {
+        k: v
+        for k, v in {
+            "threads": threads,
+            "memory_limit": memory_limit,
+            "temp_directory": temp_directory,
+        }.items()
+        if v is not None
+    }
+    con = duckdb.connect(config=config)
+    for name, sql in get_view_definitions(fn_results).items():
+        con.execute(f"CREATE VIEW {name} AS {sql}")
+    con.execute(
+        """
+        CREATE MACRO scenario_cost(cost_res, cost_nuc, cost_sto, cost_ens) AS TABLE
+        SELECT *,
+            cost_res * (renewable + curtailRenewable)
+            + cost_nuc * (nuclear + curtailNuclear)
+            + cost_sto * demand * share_storage
+            + cost_ens * energyNotServed AS cost
+        FROM curtailment
+        """
+    )
+    return con
+
+
+def query(
+    fn_results: str, sql: str, params: list | dict | None = None, **config
+) -> pd.DataFrame:
+    """Run a single query against the views over the results file
+
+    Args:
+        fn_results: name of file with hourly results
+        sql: query using the views and macros of connect
+        params: parameters of a prepared statement
+        config: settings of the database, see connect
+
+    Returns:
+        query result
+    """
+    with connect(fn_results, **config) as con:
+        return con.execute(sql, params).df()
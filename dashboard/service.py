@@ -0,0 +1,332 @@
+import asyncio
+import functools
+import os
+import urllib.parse
+import urllib.request
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from .catalog import get_fingerprint, write_atomic
+from .cube import COST_ORDER
+from .data import (
+    SHARE_TOLERANCE,
+    get_results_cube,
+    get_results_dataset,
+    get_scenario_table,
+    load_annual_results,
+)
+
+# media type of the responses, tables are sent in the arrow ipc stream format
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+# endpoints of the service and their query parameters
+ENDPOINTS = {
+    "/annual": ["share_generation", "curtail_res_first"],
+    "/scenario": [
+        "share_generation",
+        "share_storage",
+        "share_renewable",
+        "curtail_res_first",
+        "columns",
+    ],
+    "/cost": ["share_generation", "curtail_res_first"] + COST_ORDER,
+}
+# maximum size of the request line and headers [bytes]
+MAX_HEADER = 2**16
+
+
+def get_store_file(fn_results: str) -> str:
+    """Get name of the arrow ipc file backing the service
+
+    Args:
+        fn_results: name of file with hourly results
+    """
+    return f"{os.path.splitext(fn_results)[0]}.arrow"
+
+
+def build_store(fn_results: str) -> str:
+    """Write the results as uncompressed arrow ipc file such that the service
+    can memory map it, see get_results_dataset. The file stores the fingerprint
+    of the results file and is only rewritten if the results file changed.
+
+    Args:
+        fn_results: name of file with hourly results
+
+    Returns:
+        name of the arrow ipc file
+    """
+    fn_store = get_store_file(fn_results)
+    fingerprint = get_fingerprint(fn_results).encode()
+    if os.path.isfile(fn_store):
+        metadata = get_results_dataset(fn_store).schema.metadata or {}
+        if metadata.get(b"fingerprint") == fingerprint:
+            return fn_store
+    dataset = get_results_dataset(fn_results)
+    schema = dataset.schema.with_metadata({b"fingerprint": fingerprint})
+
+    def write(fn: str):
+        # streamed batch by batch such that the results are never held in memory
+        with pa.OSFile(fn, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+            for batch in dataset.to_batches():
+                writer.write_batch(batch)
+
+    write_atomic(fn_store, write)
+    return fn_store
+
+
+def to_ipc(tbl: pa.Table) -> bytes:
+    """Serialize table in the arrow ipc stream format
+
+    Args:
+        tbl: table to serialize
+    """
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, tbl.schema) as writer:
+        writer.write_table(tbl)
+    return sink.getvalue().to_pybytes()
+
+
+def _get_bool(value: str) -> bool:
+    """Parse boolean query parameter
+
+    Args:
+        value: value of the parameter, e.g., "true" or "0"
+    """
+    if value.lower() in ("1", "true", "yes"):
+        return True
+    if value.lower() in ("0", "false", "no"):
+        return False
+    raise ValueError(f"Invalid boolean {value}")
+
+
+class ResultsService:
+    """Read-only service answering queries on a results file with arrow tables.
+    Hourly results are served from a memory-mapped arrow ipc copy of the
+    results file, annual results and cost surfaces from the aggregates of the
+    dashboard. Serialized responses are kept in a least-recently-used cache.
+
+    Attributes:
+        fn_results: name of file with hourly results
+        fn_store: name of the memory-mapped arrow ipc file, see build_store
+        annual: results aggregated over all periods, see load_annual_results
+        cube: annual results indexed as dense cube, see get_results_cube
+        get_response: cached version of respond
+    """
+
+    def __init__(self, fn_results: str, cache_size: int = 128):
+        """
+        Args:
+            fn_results: name of file with hourly results
+            cache_size: number of responses kept in the cache
+        """
+        self.fn_results = fn_results
+        self.fn_store = build_store(fn_results)
+        self.annual = load_annual_results(fn_results)
+        self.cube = get_results_cube(fn_results)
+        self.get_response = functools.lru_cache(maxsize=cache_size)(self.respond)
+
+    def get_annual(
+        self,
+        share_generation: float | None = None,
+        curtail_res_first: bool | None = None,
+    ) -> pa.Table:
+        """Get results aggregated over all periods
+
+        Args:
+            share_generation: total generation as multiple of demand. If empty,
+                all generation shares
+            curtail_res_first: indicator whether renewable are curtailed first.
+                If empty, both orders
+        """
+        tbl = self.annual
+        if share_generation is not None:
+            deviation = pc.abs(pc.subtract(tbl["share_generation"], share_generation))
+            tbl = tbl.filter(pc.less_equal(deviation, SHARE_TOLERANCE))
+        if curtail_res_first is not None:
+            tbl = tbl.filter(pc.equal(tbl["curtailRenewableFirst"], curtail_res_first))
+        return tbl
+
+    def get_scenario(
+        self,
+        share_generation: float,
+        share_storage: float,
+        share_renewable: float,
+        curtail_res_first: bool = True,
+        columns: tuple[str, ...] | None = None,
+    ) -> pa.Table:
+        """Get hourly results of a single scenario, see get_scenario_table
+
+        Args:
+            share_generation: total generation as multiple of demand
+            share_storage: storage size as share of total demand
+            share_renewable: share of renewable in total generation
+            curtail_res_first: indicator whether renewable are curtailed first
+            columns: columns to read. If empty, all columns are read
+        """
+        return get_scenario_table(
+            self.fn_store,
+            share_generation,
+            share_storage,
+            share_renewable,
+            curtail_res_first,
+            columns,
+        )
+
+    def get_cost(
+        self,
+        cost_res: float,
+        cost_nuc: float,
+        cost_sto: float,
+        cost_ens: float,
+        share_generation: float | None = None,
+        curtail_res_first: bool | None = None,
+    ) -> pa.Table:
+        """Get cost of the scenarios for the given unit costs, see
+        ResultsCube.get_cost. Scenarios missing in the results are dropped.
+
+        Args:
+            cost_res: cost to install renewable generation [Euro/MWh]
+            cost_nuc: cost to install nuclear generation [Euro/MWh]
+            cost_sto: cost to install storage facility [Euro/MWh]
+            cost_ens: cost of energy not served [Euro/MWh]
+            share_generation: total generation as multiple of demand. If empty,
+                all generation shares
+            curtail_res_first: indicator whether renewable are curtailed first.
+                If empty, both orders
+
+        Returns:
+            table with scenario keys and cost
+        """
+        cube = self.cube
+        cost = cube.get_cost(cost_res, cost_nuc, cost_sto, cost_ens)
+        axes = [
+            cube.share_storage,
+            cube.share_renewable,
+            cube.share_generation,
+            cube.curtail_res_first,
+        ]
+        selected = [np.ones(len(a), dtype=bool) for a in axes]
+        if share_generation is not None:
+            selected[2] = np.isclose(cube.share_generation, share_generation)
+        if curtail_res_first is not None:
+            selected[3] = cube.curtail_res_first == curtail_res_first
+        cost = cost[np.ix_(*selected)]
+        grid = np.meshgrid(*[a[s] for a, s in zip(axes, selected)], indexing="ij")
+        keep = ~np.isnan(cost).ravel()
+        names = [
+            "share_storage",
+            "share_renewable",
+            "share_generation",
+            "curtailRenewableFirst",
+        ]
+        return pa.table(
+            {
+                **{n: g.ravel()[keep] for n, g in zip(names, grid)},
+                "cost": cost.ravel()[keep],
+            }
+        )
+
+    def respond(self, path: str, query: tuple[tuple[str, str], ...]) -> bytes:
+        """Answer a request with the serialized table
+
+        Args:
+            path: endpoint, one of ENDPOINTS
+            query: query parameters as pairs of name and value
+
+        Returns:
+            table in the arrow ipc stream format
+        """
+        if path not in ENDPOINTS:
+            raise KeyError(f"Unknown endpoint {path}. Use one of {list(ENDPOINTS)}")
+        params = dict(query)
+        unknown = set(params) - set(ENDPOINTS[path])
+        if unknown:
+            raise ValueError(f"Unknown parameters {sorted(unknown)} for {path}")
+        kwargs = {}
+        for k, v in params.items():
+            if k == "curtail_res_first":
+                kwargs[k] = _get_bool(v)
+            elif k == "columns":
+                kwargs[k] = tuple(v.split(","))
+            else:
+                kwargs[k] = float(v)
+        if path == "/annual":
+            tbl = self.get_annual(**kwargs)
+        elif path == "/scenario":
+            tbl = self.get_scenario(**kwargs)
+        else:
+            tbl = self.get_cost(**kwargs)
+        return to_ipc(tbl)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Handle a http connection. Only GET requests are supported and the
+        connection is closed after the response. Tables are built in a worker
+        thread such that requests are served concurrently.
+
+        Args:
+            reader: stream of the request
+            writer: stream of the response
+        """
+        try:
+            header = await reader.readuntil(b"\r\n\r\n")
+            method, target, _ = header.decode("latin-1").split("\r\n")[0].split(" ")
+            if method != "GET":
+                status, body, media = 405, b"Only GET is supported", "text/plain"
+            else:
+                url = urllib.parse.urlsplit(target)
+                query = tuple(sorted(urllib.parse.parse_qsl(url.query)))
+                try:
+                    body = await asyncio.to_thread(self.get_response, url.path, query)
+                    status, media = 200, ARROW_STREAM
+                except KeyError as e:
+                    status, body, media = 404, str(e).encode(), "text/plain"
+                except (ValueError, TypeError) as e:
+                    status, body, media = 400, str(e).encode(), "text/plain"
+                except Exception as e:
+                    status, body, media = 500, repr(e).encode(), "text/plain"
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            status, body, media = 400, b"Malformed request", "text/plain"
+        reason = {
+            200: "OK",
+            400: "Bad Request",
+            404: "Not Found",
+            405: "Method Not Allowed",
+            500: "Internal Server Error",
+        }[status]
+        writer.write(
+            (
+                f"HTTP/1.1 {status} {reason}\r\n"
+                f"Content-Type: {media}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n"
+            ).encode("latin-1")
+            + body
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8510):
+        """Serve requests until cancelled
+
+        Args:
+            host: address to listen on. The default only accepts local requests
+            port: port to listen on
+        """
+        server = await asyncio.start_server(
+            self.handle, host=host, port=port, limit=MAX_HEADER
+        )
+        async with server:
+            await server.serve_forever()
+
+
+def fetch_table(url: str, timeout: float = 60) -> pa.Table:
+    """Get a table from the service
+
+    Args:
+        url: url of the request, e.g.,
+            "http://127.0.0.1:8510/cost?cost_res=2&cost_nuc=1&cost_sto=10&cost_ens=10"
+        timeout: timeout of the request [s]
+    """
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return pa.ipc.open_stream(response.read()).read_all()
@@ -0,0 +1,262 @@
+from typing import Iterator
+import pandas as pd
+import pyarrow.dataset as ds
+import streamlit as st
+from .catalog import prepare_generation
+
+# columns of the generation file read for the aggregation
+GENERATION_COLUMNS = ["demand", "solar", "windOnshore", "windOffshore"]
+# months by season as used for the hourly profiles
+SEASONS = {
+    "Winter": [1, 2, 12],
+    "Spring": [3, 4, 5],
+    "Summer": [6, 7, 8],
+    "Autumn": [9, 10, 11],
+}
+# statistics of imbalances, see get_storage_stats
+IMBALANCE_COLUMNS = ["ExcessSupply", "ExcessDemand"]
+
+
+def scan_generation(
+    fn_gen: str, countries: list[str], years: list[int], batch_size: int = 2**16
+) -> Iterator[pd.DataFrame]:
+    """Stream hourly generation and demand of several countries and years in
+    batches. Only one batch is held in memory at a time.
+
+    Args:
+        fn_gen: name of parquet file with generation data
+        countries: 2-letter country codes
+        years: years to include
+        batch_size: maximum number of rows per batch
+
+    Returns:
+        iterator over frames indexed by country and dateTime, see prepare_generation
+    """
+    dataset = ds.dataset(fn_gen, format="parquet")
+    filter = (
+        ds.field("country").isin(list(countries))
+        & (ds.field("dateTime") >= pd.Timestamp(f"{min(years)}/01/01 00:00"))
+        & (ds.field("dateTime") < pd.Timestamp(f"{max(years) + 1}/01/01 00:00"))
+    )
+    for batch in dataset.to_batches(
+        columns=["country", "dateTime"] + GENERATION_COLUMNS,
+        filter=filter,
+        batch_size=batch_size,
+    ):
+        df = batch.to_pandas()
+        df = df[df["dateTime"].dt.year.isin(years)]
+        if len(df) > 0:
+            yield prepare_generation(df.set_index(["country", "dateTime"]))
+
+
+def get_annual_totals(
+    fn_gen: str, countries: list[str], years: list[int], batch_size: int = 2**16
+) -> pd.DataFrame:
+    """Get annual sums and number of hours by country and year
+
+    Args:
+        fn_gen: name of parquet file with generation data
+        countries: 2-letter country codes
+        years: years to include
+        batch_size: maximum number of rows per batch
+    """
+    totals = None
+    for df in scan_generation(fn_gen, countries, years, batch_size=batch_size):
+        part = (
+            df.assign(Hours=1)
+            .groupby(
+                [
+                    df.index.get_level_values("country"),
+                    df.index.get_level_values("dateTime").year.rename("year"),
+                ]
+            )
+            .sum()
+        )
+        totals = part if totals is None else totals.add(part, fill_value=0)
+    return totals
+
+
+def get_scaling_factors(
+    totals: pd.DataFrame, shares: dict[str, float], total_demand: float = 0
+) -> pd.DataFrame:
+    """Get factors normalizing hourly values by country and year as in
+    normalize_generation. Baseload is a technology with constant profile.
+
+    Args:
+        totals: annual sums and number of hours, see get_annual_totals
+        shares: shares of each technology in annual demand
+        total_demand: Total demand of each year to normalize demand
+            If zero, no demand scaling
+    """
+    demand = totals["Demand"] if total_demand == 0 else total_demand
+    factors = pd.DataFrame(
+        {
+            tech: demand
+            * share
+            / (totals["Hours"] if tech == "Baseload" else totals[tech])
+            for tech, share in shares.items()
+        }
+    )
+    factors["Demand"] = demand / totals["Demand"]
+    return factors.fillna(0)
+
+
+def stream_aggregates(
+    fn_gen: str,
+    countries: list[str],
+    years: list[int],
+    shares: dict[str, float],
+    total_demand: float = 0,
+    batch_size: int = 2**16,
+) -> dict[str, pd.DataFrame]:
+    """Aggregate normalized generation of several countries and weather years.
+    Data are streamed in two passes, the first one for the annual totals used in
+    the normalization and the second one for the aggregates. Daily sums,
+    profiles, and imbalance statistics are updated batch by batch such that
+    memory is bounded by the size of the aggregates.
+
+    Args:
+        fn_gen: name of parquet file with generation data
+        countries: 2-letter country codes
+        years: years to include
+        shares: shares of each technology in annual demand, see normalize_generation
+        total_demand: Total demand of each year to normalize demand
+            If zero, no demand scaling
+        batch_size: maximum number of rows per batch
+
+    Returns:
+        dictionary with the following keys:
+            daily: daily sums indexed by country, year, and date
+            profiles: mean profiles indexed by country, year, profile, and period
+                with the profiles of get_profiles
+            stats: imbalance statistics indexed by country, year, and variable
+                as in get_storage_stats
+    """
+    totals = get_annual_totals(fn_gen, countries, years, batch_size=batch_size)
+    if totals is None:
+        return {"daily": None, "profiles": None, "stats": None}
+    factors = get_scaling_factors(totals, shares, total_demand=total_demand)
+    techs = list(shares.keys())
+
+    daily, profile_sum, profile_count, stats = None, None, None, None
+    for df in scan_generation(fn_gen, countries, years, batch_size=batch_size):
+        dt = df.index.get_level_values("dateTime")
+        keys = [df.index.get_level_values("country"), dt.year.rename("year")]
+        df_norm = (
+            df.assign(Baseload=1)[techs + ["Demand"]]
+            .fillna(0)
+            .mul(factors.reindex(pd.MultiIndex.from_arrays(keys)).set_axis(df.index))
+            .assign(
+                ExcessSupply=lambda df: (df[techs].sum(1) - df["Demand"]).clip(lower=0),
+                ExcessDemand=lambda df: (df["Demand"] - df[techs].sum(1)).clip(lower=0),
+            )
+        )
+        part = df_norm.groupby(keys + [dt.normalize().rename("date")]).sum()
+        daily = part if daily is None else daily.add(part, fill_value=0)
+
+        grouped = df_norm.groupby(
+            keys + [dt.month.rename("month"), dt.hour.rename("hour")]
+        )
+        part_sum, part_count = grouped.sum(), grouped.size()
+        profile_sum = (
+            part_sum if profile_sum is None else profile_sum.add(part_sum, fill_value=0)
+        )
+        profile_count = (
+            part_count
+            if profile_count is None
+            else profile_count.add(part_count, fill_value=0)
+        )
+
+        imbalance = df_norm[IMBALANCE_COLUMNS]
+        part = pd.concat(
+            {
+                "Total": imbalance.groupby(keys).sum().stack(),
+                "Max": imbalance.groupby(keys).max().stack(),
+                "Hours": (imbalance > 9).groupby(keys).sum().stack(),
+            },
+            axis=1,
+        )
+        stats = (
+            part
+            if stats is None
+            else pd.concat([stats, part])
+            .groupby(level=[0, 1, 2])
+            .agg({"Total": "sum", "Max": "max", "Hours": "sum"})
+        )
+    return {
+        "daily": daily,
+        "profiles": get_stream_profiles(profile_sum, profile_count),
+        "stats": finalize_imbalance_stats(stats, totals["Demand"] * factors["Demand"]),
+    }
+
+
+def get_stream_profiles(
+    profile_sum: pd.DataFrame, profile_count: pd.Series
+) -> pd.DataFrame:
+    """Get mean profiles from sums and counts by country, year, month, and hour
+
+    Args:
+        profile_sum: sums by country, year, month, and hour
+        profile_count: number of hours by country, year, month, and hour
+    """
+    keys = ["country", "year"]
+    profiles = {
+        "Hourly: Year": (profile_sum, profile_count, "hour"),
+        "Monthly": (profile_sum, profile_count, "month"),
+    }
+    for season, months in SEASONS.items():
+        mask = profile_sum.index.get_level_values("month").isin(months)
+        profiles[f"Hourly: {season}"] = (
+            profile_sum[mask],
+            profile_count[mask],
+            "hour",
+        )
+    return pd.concat(
+        {
+            name: (
+                s.groupby(keys + [period])
+                .sum()
+                .div(c.groupby(keys + [period]).sum(), axis=0)
+            ).rename_axis(index={period: "period"})
+            for name, (s, c, period) in profiles.items()
+        },
+        names=["profile"],
+    ).reorder_levels(keys + ["profile", "period"])
+
+
+def finalize_imbalance_stats(stats: pd.DataFrame, demand: pd.Series) -> pd.DataFrame:
+    """Get imbalance statistics in the format of get_storage_stats
+
+    Args:
+        stats: sums, maxima, and hours of imbalances by country, year, and variable
+        demand: normalized annual demand by country and year
+    """
+    stats = stats.rename_axis(["country", "year", "variable"])
+    demand = demand.reindex(stats.index.droplevel("variable")).to_numpy()
+    return stats.assign(
+        TotalPercentOfDemand=(stats["Total"] / demand * 100).where(demand != 0, 0)
+    )[["Total", "TotalPercentOfDemand", "Max", "Hours"]].round(1)
+
+
+@st.cache_data(max_entries=16, show_spinner="Aggregating weather years ...")
+def get_weather_years(
+    fn_gen: str,
+    countries: list[str],
+    years: list[int],
+    shares: dict[str, float],
+    total_demand: float = 0,
+) -> dict[str, pd.DataFrame]:
+    """Get aggregates of several countries and weather years for comparison.
+    Only the aggregates are cached, not the hourly data.
+
+    Args:
+        fn_gen: name of parquet file with generation data
+        countries: 2-letter country codes
+        years: years to include
+        shares: shares of each technology in annual demand, see normalize_generation
+        total_demand: Total demand of each year to normalize demand
+            If zero, no demand scaling
+    """
+    return stream_aggregates(
+        fn_gen, countries, years, shares=shares, total_demand=total_demand
+    )
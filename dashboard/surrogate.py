@@ -0,0 +1,273 @@
+import numpy as np
+import pandas as pd
+from scipy.interpolate import PchipInterpolator, make_interp_spline
+from .cube import ResultsCube
+
+# interpolation methods of the surrogate and the minimum number of grid points
+# per axis they need. Both are monotone between grid points. Only linear is
+# linear in the data, for pchip the slopes depend on the data. Hence cost is
+# interpolated from its values on the grid, see get_values, and may differ from
+# the cost of the interpolated components
+SURROGATE_METHODS = {"linear": 2, "pchip": 4}
+# order of the axes of the surrogate
+SURROGATE_AXES = ["share_generation", "share_renewable", "share_storage"]
+
+
+def get_axes(cube: ResultsCube) -> list[np.ndarray]:
+    """Get grid points of the surrogate in the order of SURROGATE_AXES
+
+    Args:
+        cube: annual results, see build_results_cube
+    """
+    return [cube.share_generation, cube.share_renewable, cube.share_storage]
+
+
+def get_values(
+    cube: ResultsCube,
+    variable: str,
+    curtail_res_first: bool = True,
+    **unit_cost: float,
+) -> np.ndarray:
+    """Get values of a variable on the grid with dimension (generation,
+    renewable, storage)
+
+    Args:
+        cube: annual results, see build_results_cube
+        variable: measure of the cube or "cost"
+        curtail_res_first: indicator whether renewable are curtailed first
+        unit_cost: unit costs used if variable is "cost", see ResultsCube.get_cost
+    """
+    pos_cur = np.flatnonzero(cube.curtail_res_first == curtail_res_first)
+    if len(pos_cur) == 0:
+        raise KeyError(f"No results for curtailment order {curtail_res_first}")
+    if variable == "cost":
+        values = cube.get_cost(**unit_cost)
+    else:
+        values = cube.measures[variable]
+    # (storage, renewable, generation) to (generation, renewable, storage)
+    return values[:, :, :, pos_cur[0]].transpose(2, 1, 0)
+
+
+def interpolate(
+    axes: list[np.ndarray],
+    values: np.ndarray,
+    targets: list[np.ndarray],
+    method: str = "linear",
+) -> np.ndarray:
+    """Interpolate values given on a regular grid onto another regular grid.
+    Axes are interpolated one after the other, which equals multilinear
+    interpolation for method linear and the tensor product of monotone cubic
+    splines for method pchip. Axes with a single grid point are taken as
+    constant. If an axis has too few points for the method or values are
+    missing, it is interpolated linearly. Targets outside the grid and targets
+    next to grid points without results are NaN.
+
+    Args:
+        axes: grid points of each axis
+        values: values on the grid
+        targets: points of each axis to interpolate at
+        method: one of SURROGATE_METHODS
+
+    Returns:
+        interpolated values with one dimension per axis of targets
+    """
+    if method not in SURROGATE_METHODS:
+        raise ValueError(
+            f"Unknown method {method}. Use one of {list(SURROGATE_METHODS)}"
+        )
+    for k, (axis, target) in enumerate(zip(axes, targets)):
+        target = np.asarray(target, dtype=float)
+        if len(axis) == 1:
+            values = np.repeat(np.take(values, [0], axis=k), len(target), axis=k)
+            continue
+        if (
+            method == "pchip"
+            and len(axis) >= SURROGATE_METHODS["pchip"]
+            and np.isfinite(values).all()
+        ):
+            spline = PchipInterpolator(axis, values, axis=k, extrapolate=False)
+        else:
+            spline = make_interp_spline(
+                axis, values, k=1, axis=k, check_finite=False
+            )
+        values = spline(np.clip(target, axis[0], axis[-1]))
+        outside = (target < axis[0]) | (target > axis[-1])
+        if outside.any():
+            values = values.copy()
+            index = [slice(None)] * values.ndim
+            index[k] = outside
+            values[tuple(index)] = np.nan
+    return values
+
+
+def get_surrogate_values(
+    cube: ResultsCube,
+    variables: list[str],
+    share_generation: float,
+    share_renewable: float,
+    share_storage: float,
+    curtail_res_first: bool = True,
+    method: str = "linear",
+    **unit_cost: float,
+) -> pd.Series:
+    """Get interpolated values of variables for a scenario between grid points
+
+    Args:
+        cube: annual results, see build_results_cube
+        variables: measures of the cube or "cost"
+        share_generation: total generation as multiple of demand
+        share_renewable: share of renewable in total generation
+        share_storage: storage size as share of total demand
+        curtail_res_first: indicator whether renewable are curtailed first
+        method: one of SURROGATE_METHODS
+        unit_cost: unit costs used for "cost", see ResultsCube.get_cost
+    """
+    targets = [[share_generation], [share_renewable], [share_storage]]
+    return pd.Series(
+        {
+            v: interpolate(
+                get_axes(cube),
+                get_values(cube, v, curtail_res_first, **unit_cost),
+                targets,
+                method=method,
+            ).item()
+            for v in variables
+        }
+    )
+
+
+def get_surrogate_surface(
+    cube: ResultsCube,
+    variable: str,
+    share_generation: float,
+    curtail_res_first: bool = True,
+    resolution: int = 50,
+    method: str = "linear",
+    **unit_cost: float,
+) -> pd.DataFrame:
+    """Get interpolated values of a variable on a fine grid of storage sizes and
+    renewable shares. The generation share need not be a grid point.
+
+    Args:
+        cube: annual results, see build_results_cube
+        variable: measure of the cube or "cost"
+        share_generation: total generation as multiple of demand
+        curtail_res_first: indicator whether renewable are curtailed first
+        resolution: number of points along the storage and renewable axis
+        method: one of SURROGATE_METHODS
+        unit_cost: unit costs used if variable is "cost", see ResultsCube.get_cost
+
+    Returns:
+        values with storage sizes as index and renewable shares as columns as
+        ResultsCube.get_surface
+    """
+    share_storage = np.linspace(
+        cube.share_storage[0], cube.share_storage[-1], resolution
+    )
+    share_renewable = np.linspace(
+        cube.share_renewable[0], cube.share_renewable[-1], resolution
+    )
+    values = interpolate(
+        get_axes(cube),
+        get_values(cube, variable, curtail_res_first, **unit_cost),
+        [[share_generation], share_renewable, share_storage],
+        method=method,
+    )
+    # (generation, renewable, storage) to (storage, renewable)
+    return pd.DataFrame(
+        values[0].T,
+        index=pd.Index(share_storage, name="share_storage"),
+        columns=pd.Index(share_renewable, name="share_renewable"),
+    )
+
+
+def get_holdout_error(
+    cube: ResultsCube,
+    variable: str,
+    curtail_res_first: bool = True,
+    method: str = "linear",
+    **unit_cost: float,
+) -> np.ndarray:
+    """Estimate the interpolation error by holding out grid points. Along each
+    axis, every interior grid slice is removed in turn and interpolated from the
+    remaining grid. The error of a grid point is the largest absolute deviation
+    over the axes. As held out points are twice as far from their neighbours as
+    points between grid points, the estimate is conservative.
+
+    Args:
+        cube: annual results, see build_results_cube
+        variable: measure of the cube or "cost"
+        curtail_res_first: indicator whether renewable are curtailed first
+        method: one of SURROGATE_METHODS
+        unit_cost: unit costs used if variable is "cost", see ResultsCube.get_cost
+
+    Returns:
+        error with dimension (generation, renewable, storage), NaN for grid
+        points on the boundary of all axes
+    """
+    axes = get_axes(cube)
+    values = get_values(cube, variable, curtail_res_first, **unit_cost)
+    error = np.full(values.shape, np.nan)
+    for k, axis in enumerate(axes):
+        for pos in range(1, len(axis) - 1):
+            keep = np.arange(len(axis)) != pos
+            predicted = interpolate(
+                [a[keep] if j == k else a for j, a in enumerate(axes)],
+                np.compress(keep, values, axis=k),
+                [[a[pos]] if j == k else a for j, a in enumerate(axes)],
+                method=method,
+            )
+            index = [slice(None)] * len(axes)
+            index[k] = slice(pos, pos + 1)
+            deviation = np.abs(predicted - values[tuple(index)])
+            error[tuple(index)] = np.fmax(error[tuple(index)], deviation)
+    return error
+
+
+def get_refinement_candidates(
+    cube: ResultsCube,
+    variable: str,
+    tolerance: float,
+    curtail_res_first: bool = True,
+    method: str = "linear",
+    error: np.ndarray | None = None,
+    **unit_cost: float,
+) -> pd.DataFrame:
+    """Get scenarios that should be solved to refine the surrogate. For every
+    grid point whose hold-out error exceeds the tolerance, the midpoints to its
+    neighbours along each axis are proposed, see get_holdout_error.
+
+    Args:
+        cube: annual results, see build_results_cube
+        variable: measure of the cube or "cost"
+        tolerance: largest acceptable absolute interpolation error
+        curtail_res_first: indicator whether renewable are curtailed first
+        method: one of SURROGATE_METHODS
+        error: hold-out error of the variable, see get_holdout_error. If empty,
+            it is computed
+        unit_cost: unit costs used if variable is "cost", see ResultsCube.get_cost
+
+    Returns:
+        frame with the scenario keys of SURROGATE_AXES and the error of the
+        neighbouring grid point, sorted by decreasing error
+    """
+    axes = get_axes(cube)
+    if error is None:
+        error = get_holdout_error(
+            cube, variable, curtail_res_first, method, **unit_cost
+        )
+    positions = np.argwhere(error > tolerance)
+    records = []
+    for pos in positions:
+        for k, axis in enumerate(axes):
+            for step in [-1, 1]:
+                if 0 <= pos[k] + step < len(axis):
+                    point = [a[p] for a, p in zip(axes, pos)]
+                    point[k] = (axis[pos[k]] + axis[pos[k] + step]) / 2
+                    records.append(point + [error[tuple(pos)]])
+    df = pd.DataFrame(records, columns=SURROGATE_AXES + ["error"])
+    return (
+        df.sort_values("error", ascending=False)
+        .drop_duplicates(SURROGATE_AXES)
+        .reset_index(drop=True)
+    )
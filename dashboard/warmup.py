@@ -0,0 +1,136 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import streamlit as st
+from .catalog import build_catalog, get_catalog_dir, get_fingerprint, read_fingerprint
+from .components import get_countries
+from .data import (
+    get_generation,
+    normalize_generation,
+    get_storage_stats,
+    get_total_results,
+    get_results_cube,
+    load_annual_results,
+)
+from .service import build_store
+
+# demand shares preset in the sidebar of the profile dashboard
+SHARE_PRESETS = [{"Wind": 0.5, "Solar": 0.3, "Baseload": 0.2}]
+# years available in the sidebar of the profile dashboard
+YEARS = list(range(2015, 2024))
+
+
+def build_artifacts(
+    fn_gen: str | None = None,
+    fn_cap: str | None = None,
+    fn_results: str | None = None,
+):
+    """Build the files precomputed for the dashboards if the source files
+    changed, i.e., the generation catalog, the annual results, and the arrow
+    ipc copy of the results read by the results service. All are built in
+    parallel. Use before starting the server such that the first requests are
+    served from these files.
+
+    Args:
+        fn_gen: name of parquet file with generation data
+        fn_cap: name of parquet file with capacity
+        fn_results: name of file with hourly results
+    """
+    tasks = []
+    if fn_gen is not None and fn_cap is not None:
+        dir_catalog = get_catalog_dir(fn_gen)
+        if read_fingerprint(dir_catalog) != get_fingerprint(fn_gen, fn_cap):
+            tasks.append(lambda: build_catalog(fn_gen, fn_cap, dir_catalog))
+    if fn_results is not None:
+        tasks.append(lambda: load_annual_results(fn_results))
+        tasks.append(lambda: build_store(fn_results))
+    with ThreadPoolExecutor() as pool:
+        for future in [pool.submit(task) for task in tasks]:
+            future.result()
+
+
+def warm_profiles(
+    fn_gen: str,
+    fn_cap: str,
+    countries: list[str] | None = None,
+    years: list[int] | None = None,
+    share_presets: list[dict[str, float]] | None = None,
+    total_demand: float = 0,
+    max_workers: int = 4,
+) -> int:
+    """Fill the caches of the profile dashboard for all countries, years, and
+    share presets. The number of parallel workers bounds the number of data sets
+    held in memory at the same time.
+
+    Args:
+        fn_gen: name of parquet file with generation data
+        fn_cap: name of parquet file with capacity
+        countries: countries to include. If empty, all countries of the
+            capacity file
+        years: years to include. If empty, the years of the sidebar
+        share_presets: demand shares by technology. If empty, the sidebar
+            defaults
+        total_demand: Total demand to normalize demand, 0 for no scaling
+        max_workers: number of parallel workers
+
+    Returns:
+        number of warmed combinations
+    """
+    countries = get_countries(fn_cap) if countries is None else countries
+    years = YEARS if years is None else years
+    share_presets = SHARE_PRESETS if share_presets is None else share_presets
+
+    def warm(country: str, year: int) -> int:
+        df_gen, _ = get_generation(fn_gen, fn_cap, country=country, year=year)
+        for shares in share_presets:
+            df_norm = normalize_generation(
+                df_gen, shares=dict(shares), total_demand=total_demand
+            )
+            get_storage_stats(df_norm)
+        return len(share_presets)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(warm, c, y) for c in countries for y in years]
+        return sum(f.result() for f in futures)
+
+
+def warm_results(fn_results: str) -> int:
+    """Fill the caches of the model dashboard
+
+    Args:
+        fn_results: name of file with hourly results
+
+    Returns:
+        number of generation shares in the results
+    """
+    df_annual = get_total_results(fn_results)
+    get_results_cube(fn_results)
+    return df_annual["share_generation"].nunique()
+
+
+@st.cache_resource(show_spinner=False)
+def start_warmup(
+    fn_gen: str | None = None,
+    fn_cap: str | None = None,
+    fn_results: str | None = None,
+    max_workers: int = 2,
+) -> threading.Thread:
+    """Warm the caches of the dashboards in a background thread. Runs once per
+    server process, i.e., the first session triggers the warm up for all
+    following ones.
+
+    Args:
+        fn_gen: name of parquet file with generation data
+        fn_cap: name of parquet file with capacity
+        fn_results: name of file with hourly results
+        max_workers: number of parallel workers
+    """
+
+    def warm():
+        if fn_results is not None:
+            warm_results(fn_results)
+        if fn_gen is not None and fn_cap is not None:
+            warm_profiles(fn_gen, fn_cap, max_workers=max_workers)
+
+    thread = threading.Thread(target=warm, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,27 @@
+from model import simulate_ensemble, get_ensemble_statistics
+import time
+import numpy as np
+
+if __name__ == "__main__":
+    start = time.time()
+    df = simulate_ensemble(
+        share_generation=np.arange(1, 1.25, 0.05),
+        share_renewable=np.arange(0, 1.1, 0.1),
+        share_storage=np.arange(0, 0.00011, 0.00001),
+        cost_curtailment=[
+            {"nuclear": 1, "renewable": 0},
+            {"nuclear": 0, "renewable": 1},
+        ],
+        total_demand=100,
+        fn_out="./data/results_ensemble.parquet",
+        country="DE",
+        start="2015/01/01 00:00",
+        end="2023/12/31 23:00",
+        n_samples=200,
+    )
+    get_ensemble_statistics(df).reset_index().to_parquet(
+        "./data/results_ensemble_statistics.parquet", index=False
+    )
+    end = time.time()
+    print(f"Time taken: {end - start}")
+    print("Finished!")
@@ -0,0 +1,20 @@
+from dashboard.export import export_dashboards
+import os
+import time
+
+
+if __name__ == "__main__":
+    start = time.time()
+    fn_gen = "./data/renewables_with_load.parquet"
+    fn_cap = "./data/renewables_capacity.parquet"
+    fn_results = "./data/results.parquet"
+    dir_out = "./data/export"
+    n_figures = export_dashboards(
+        dir_out,
+        fn_results=fn_results if os.path.isfile(fn_results) else None,
+        fn_gen=fn_gen if os.path.isfile(fn_gen) else None,
+        fn_cap=fn_cap,
+    )
+    end = time.time()
+    print(f"{n_figures} figures written to {dir_out}")
+    print(f"Time taken: {end - start}")
@@ -1,2 +1,35 @@
-from .gams_model import GamsModel
-from .simulation import get_entsoe_data, create_inputs, simulate
+from importlib import import_module
+
+# public objects and the module defining them. Modules are imported on first
+# access such that the gams api is only loaded if a model is built or solved
+_LAZY_IMPORTS = {
+    "GamsModel": "gams_model",
+    "get_entsoe_data": "simulation",
+    "create_inputs": "simulation",
+    "simulate": "simulation",
+    "aggregate_time": "aggregation",
+    "get_aggregation_error": "aggregation",
+    "SOLVER_PROFILES": "solver",
+    "autotune": "solver",
+    "load_tuned_profile": "solver",
+    "simulate_ensemble": "ensemble",
+    "get_ensemble_statistics": "ensemble",
+    "plan_sweep": "planner",
+    "export_bundle": "replay",
+    "replay_bundle": "replay",
+    "rescale_results": "scaling",
+    "get_scaling_error": "scaling",
+}
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{_LAZY_IMPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+# result columns holding energy over a period, all other columns are states or
+# scenario specifications
+ENERGY_COLUMNS = [
+    "nuclear",
+    "renewable",
+    "netStorage",
+    "demand",
+    "energyNotServed",
+    "curtailNuclear",
+    "curtailRenewable",
+]
+# columns identifying a scenario in the results
+SCENARIO_COLUMNS = [
+    "share_generation",
+    "share_renewable",
+    "share_storage",
+    "costCurtailNuclear",
+    "costCurtailRenewable",
+]
+
+
+def aggregate_time(data: pd.DataFrame, hours: int = 1) -> pd.DataFrame:
+    """Down-sample ENTSOE data to a coarser resolution. Consecutive hours are
+    summed to periods of the given length such that the chronological order and
+    thus the storage balance between periods is kept. The number of hours per
+    period is stored in column "hours".
+
+    Args:
+        data: A dataframe with the following columns:
+            "demand", "renewable", "dateTime"
+        hours: number of hours aggregated to one period
+    """
+    block = np.arange(len(data)) // hours
+    numeric = data.select_dtypes("number").columns
+    df = data.groupby(block)[list(numeric)].sum()
+    df["hours"] = np.bincount(block)
+    # non-numeric columns like the date are taken from the first hour
+    others = [c for c in data.columns if c not in numeric]
+    df[others] = data[others].iloc[::hours].to_numpy()
+    return df[list(data.columns) + ["hours"]].reset_index(drop=True)
+
+
+def expand_solution(
+    df: pd.DataFrame, periods: pd.DatetimeIndex, hours: int = 1
+) -> pd.DataFrame:
+    """Expand results of an aggregated model to hourly resolution. Energy is
+    distributed uniformly over the hours of a period, states and scenario
+    specification are kept constant.
+
+    Args:
+        df: results of one scenario with one row per aggregated period
+        periods: hourly periods of the original data
+        hours: number of hours aggregated to one period, see aggregate_time
+    """
+    block = np.arange(len(periods)) // hours
+    hours_per_block = np.bincount(block)[block]
+    df_hourly = df.iloc[block].set_axis(periods)
+    cols = [c for c in ENERGY_COLUMNS if c in df_hourly.columns]
+    df_hourly[cols] = df_hourly[cols].div(hours_per_block, axis=0)
+    return df_hourly
+
+
+def get_aggregation_error(df_full: pd.DataFrame, df_agg: pd.DataFrame) -> pd.DataFrame:
+    """Compare totals of simulations with aggregated time resolution to the
+    full model. Errors are reported in absolute terms and as percent of
+    total demand.
+
+    Args:
+        df_full: results of simulate using the full time resolution
+        df_agg: results of simulate using an aggregated time resolution
+
+    Returns:
+        frame with errors by scenario
+    """
+    # round scenario specification to avoid mismatches due to precision
+    total_full, total_agg = [
+        df.round({c: 8 for c in SCENARIO_COLUMNS})
+        .groupby(SCENARIO_COLUMNS)[ENERGY_COLUMNS]
+        .sum()
+        for df in [df_full, df_agg]
+    ]
+    error = total_agg - total_full
+    error_percent = error.div(total_full["demand"], axis=0) * 100
+    return error.join(error_percent, rsuffix="Percent").reset_index()
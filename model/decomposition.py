@@ -0,0 +1,186 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+import numpy as np
+import pandas as pd
+import gams.transfer as gt
+from .simulation import extract_solution, get_scenario, solve_model, _get_levels
+
+
+def find_segments(gdx: gt.Container, min_length: int = 168) -> list[np.ndarray]:
+    """Split the horizon into segments that start with an empty storage. A
+    greedy pass charges the storage with all potential generation exceeding
+    demand and discharges it whenever demand exceeds potential generation.
+    Periods in which the greedy storage level is zero separate the horizon.
+    The pass runs twice over the horizon to account for the storage wrapping
+    around from the last to the first period.
+
+    Args:
+        gdx: gdx container with data for model
+        min_length: minimum number of periods of a segment. Shorter segments
+            are merged with the following one
+
+    Returns:
+        list with the positions of the periods in each segment in chronological
+        order. The last segment may wrap around to the beginning of the horizon.
+        If the storage never runs empty, the list is empty.
+    """
+    periods = pd.Index(gdx["t"].records.iloc[:, 0].astype(str))
+    demand = _get_levels(gdx["dem"].records, periods, value="value")
+    agen = gdx["agen"].records.set_index("i")["value"]
+    potential = sum(
+        _get_levels(gdx["alpha"].records, periods, value="value", domain="i", element=i)
+        * v
+        for i, v in agen.items()
+    )
+    max_sto = gdx["max_sto"].records
+    max_sto = 0 if max_sto is None else max_sto["value"].sum()
+
+    # greedy storage levels
+    surplus = potential - demand
+    level = np.zeros(len(periods))
+    current = 0.0
+    for _ in range(2):
+        for pos, val in enumerate(surplus):
+            current = min(max(current + val, 0), max_sto)
+            level[pos] = current
+    empty = np.flatnonzero(level <= 0)
+    if len(empty) == 0:
+        return []
+
+    # segments end in a period with empty storage
+    ends = [empty[0]]
+    for pos in empty[1:]:
+        if pos - ends[-1] >= min_length:
+            ends.append(pos)
+    if len(ends) > 1 and len(periods) - ends[-1] + ends[0] < min_length:
+        ends.pop()
+    ends = np.array(ends)
+    starts = np.roll(ends, 1) + 1
+    all_pos = np.arange(len(periods))
+    return [
+        np.roll(all_pos, -start)[: (end - start) % len(periods) + 1]
+        for start, end in zip(starts, ends)
+    ]
+
+
+def get_segment_inputs(gdx: gt.Container, positions: np.ndarray) -> gt.Container:
+    """Restrict model inputs to a subset of the periods
+
+    Args:
+        gdx: gdx container with data for model
+        positions: positions of the periods in the segment in chronological order
+    """
+    elements = gdx["t"].records.iloc[:, 0].astype(str).to_numpy()[positions]
+    segment = gt.Container()
+    i = gt.Set(segment, "i", records=gdx["i"].records, description="Technologies")
+    s = gt.Set(segment, "s", records=gdx["s"].records, description="storage")
+    t = gt.Set(segment, "t", records=list(elements), description="periods")
+    domains = {"i": i, "s": s, "t": t}
+    for name in ["dem", "alpha", "agen", "max_sto", "cost_curtailment"]:
+        symbol = gdx[name]
+        records = symbol.records
+        if "t" in symbol.domain_names:
+            records = records.assign(t=records["t"].astype(str))
+            records = records[records["t"].isin(elements)]
+        gt.Parameter(
+            segment,
+            name,
+            domain=[domains[d] for d in symbol.domain_names],
+            records=records,
+        )
+    return segment
+
+
+def get_reduced_cost(sol: list[gt.Container]) -> np.ndarray:
+    """Get reduced cost of the storage level at the end of each segment in the
+    full model. The fixed empty storage at the end of a segment is linked to the
+    storage balance in the first period of the following segment. If all reduced
+    costs are non-negative, the stitched solution is optimal for the full model.
+
+    Args:
+        sol: solutions of the segments in chronological order
+    """
+    reduced_cost = []
+    for sol_seg, sol_next in zip(sol, sol[1:] + sol[:1]):
+        sto = sol_seg["STO"].records
+        sto_marginal = sto[sto["t"] == sol_seg["t"].records.iloc[-1, 0]]["marginal"]
+        lom = sol_next["lom_STO"].records
+        lom_marginal = lom[lom["t"] == sol_next["t"].records.iloc[0, 0]]["marginal"]
+        reduced_cost.append(sto_marginal.sum() - lom_marginal.sum())
+    return np.array(reduced_cost)
+
+
+def solve_decomposed(
+    gdx: gt.Container,
+    index: pd.Index | None = None,
+    min_length: int = 168,
+    max_workers: int | None = None,
+    verify: bool = False,
+    tolerance: float = 1e-6,
+    profile: str | dict[str, Any] | None = None,
+) -> pd.DataFrame:
+    """Solve the model by splitting the horizon at periods where the storage
+    runs empty. The segments are solved in parallel without wrap around of the
+    storage and stitched together. Optimality of the stitched solution is
+    checked using the reduced cost of the storage levels at the segment
+    boundaries. If the storage never runs empty, the full model is solved.
+
+    Args:
+        gdx: gdx container with data for model
+        index: index attached to the results, see extract_solution
+        min_length: minimum number of periods of a segment
+        max_workers: maximum number of parallel solves
+        verify: if true, the full model is solved and the objective compared to
+            the stitched solution
+        tolerance: tolerance for the optimality checks
+        profile: solver profile, see get_solver_profile
+
+    Returns:
+        hourly results in the same format as extract_solution
+    """
+    periods = pd.Index(gdx["t"].records.iloc[:, 0].astype(str))
+    if index is None:
+        index = periods.rename("t")
+    segments = find_segments(gdx, min_length=min_length)
+    if len(segments) <= 1:
+        return extract_solution(solve_model(gdx, profile=profile), index=index)
+
+    # solve the segments in parallel
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        sol = list(
+            pool.map(
+                lambda pos: solve_model(
+                    get_segment_inputs(gdx, pos),
+                    defines={"acyclic": "1"},
+                    profile=profile,
+                ),
+                segments,
+            )
+        )
+
+    # check optimality of the stitched solution
+    reduced_cost = get_reduced_cost(sol)
+    if (reduced_cost < -tolerance).any():
+        raise ValueError(
+            f"Stitched solution is not optimal, reduced cost at segment boundaries: {reduced_cost}"
+        )
+    if verify:
+        objective = sum(s["lostload"].records["value"].sum() for s in sol)
+        objective_full = solve_model(gdx, profile=profile)["lostload"].records["value"].sum()
+        if not np.isclose(objective, objective_full, rtol=tolerance, atol=tolerance):
+            raise ValueError(
+                f"Objective of stitched solution {objective} differs from full model {objective_full}"
+            )
+
+    # stitch the segments in the order of the periods
+    df = pd.concat(
+        [
+            extract_solution(s, index=index[pos]).drop(
+                list(get_scenario(gdx).keys()), axis=1
+            )
+            for s, pos in zip(sol, segments)
+        ]
+    ).iloc[np.argsort(np.concatenate(segments))]
+    for k, v in get_scenario(gdx).items():
+        df[k] = v
+    return df
@@ -0,0 +1,413 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+import numpy as np
+import pandas as pd
+from .aggregation import SCENARIO_COLUMNS
+
+# totals reported for each synthetic year
+ENSEMBLE_MEASURES = ["energyNotServed", "curtailNuclear", "curtailRenewable"]
+
+
+def get_daily_profiles(data: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """Arrange hourly demand and renewable generation by day. Days without 24
+    hours, e.g., due to missing data or daylight saving time, are dropped.
+
+    Args:
+        data: A dataframe with the following columns:
+            "demand", "renewable", "dateTime"
+
+    Returns:
+        profiles with dimension (day, hour, [demand, renewable]); day of the
+        year of each day starting at zero
+    """
+    days = data["dateTime"].dt.normalize()
+    complete = days.map(days.value_counts()) == 24
+    df = data[complete]
+    profiles = df[["demand", "renewable"]].to_numpy(dtype=float).reshape(-1, 24, 2)
+    day_of_year = df["dateTime"].dt.dayofyear.to_numpy()[::24] - 1
+    return profiles, day_of_year
+
+
+def sample_years(
+    data: pd.DataFrame,
+    n_samples: int,
+    block_days: int = 7,
+    window_days: int = 14,
+    n_days: int = 365,
+    seed: int = 0,
+) -> np.ndarray:
+    """Generate synthetic years by a seasonal block bootstrap. The synthetic
+    year is split into blocks of consecutive days. Each block is drawn from
+    the observed blocks starting at most window_days from the same day of the
+    year in any observed year. Demand and renewable generation of a block are
+    taken from the same days such that their correlation is kept.
+
+    Args:
+        data: A dataframe with the following columns:
+            "demand", "renewable", "dateTime"
+        n_samples: number of synthetic years
+        block_days: number of days per block
+        window_days: maximum shift of the day of the year of a drawn block
+        n_days: number of days of a synthetic year
+        seed: seed of the random number generator
+
+    Returns:
+        hourly profiles with dimension (sample, hour, [demand, renewable])
+    """
+    profiles, day_of_year = get_daily_profiles(data)
+    rng = np.random.default_rng(seed)
+    # observed blocks can start at any day followed by a complete block
+    starts = np.arange(len(profiles) - block_days + 1)
+    if len(starts) == 0:
+        raise ValueError(f"Data cover less than {block_days} complete days")
+    blocks = []
+    for first in range(0, n_days, block_days):
+        shift = np.abs(day_of_year[starts] - first)
+        shift = np.minimum(shift, 365 - shift)
+        candidates = starts[shift <= window_days]
+        if len(candidates) == 0:
+            candidates = starts[shift == shift.min()]
+        drawn = rng.choice(candidates, size=n_samples)
+        length = min(block_days, n_days - first)
+        blocks.append(profiles[drawn[:, np.newaxis] + np.arange(length)])
+    # (sample, day, hour, variable) to (sample, hour, variable)
+    return np.concatenate(blocks, axis=1).reshape(n_samples, -1, 2)
+
+
+def screen_scenarios(
+    samples: np.ndarray,
+    share_generation: float,
+    share_renewable: float,
+    cost_curtailment: dict[str, float],
+    total_demand: float | None = None,
+) -> dict[str, np.ndarray]:
+    """Evaluate a scenario without storage for all synthetic years at once.
+    Without storage the model decouples by hour: demand is served by the
+    potential generation and the surplus is curtailed starting with the
+    technology of lower curtailment cost. Inputs are normalized as in
+    create_inputs.
+
+    Args:
+        samples: hourly profiles with dimension (sample, hour, [demand, renewable])
+        share_generation: multiplier used to derive total generation as multiple
+            of total demand
+        share_renewable: Share of renewable in total generation
+        cost_curtailment: Cost of curtailment by technology
+        total_demand: If provided demand will be normalized to the given number
+
+    Returns:
+        dictionary with totals by sample for the keys of ENSEMBLE_MEASURES,
+        demand, and the indicator "storageMatters" whether the year has hours
+        with deficit. In model.gms the storage level enters the energy balance,
+        so any storage lowers energy-not-served in these years. Without
+        deficit, an empty storage is optimal and the totals are exact.
+    """
+    demand, renewable = samples[:, :, 0], samples[:, :, 1]
+    total = demand.sum(axis=1, keepdims=True) if total_demand is None else total_demand
+    demand = demand / demand.sum(axis=1, keepdims=True) * total
+    pot_renewable = (
+        renewable
+        / renewable.sum(axis=1, keepdims=True)
+        * share_generation
+        * total
+        * share_renewable
+    )
+    pot_nuclear = (
+        np.ones_like(demand)
+        / demand.shape[1]
+        * share_generation
+        * total
+        * (1 - share_renewable)
+    )
+    balance = pot_nuclear + pot_renewable - demand
+    surplus = np.maximum(balance, 0)
+
+    cost_nuc = cost_curtailment.get("nuclear", 0)
+    cost_ren = cost_curtailment.get("renewable", 0)
+    if cost_ren < cost_nuc:
+        curtail_renewable = np.minimum(surplus, pot_renewable)
+    elif cost_nuc < cost_ren:
+        curtail_renewable = surplus - np.minimum(surplus, pot_nuclear)
+    else:
+        # indifferent, curtail in proportion to the potential
+        pot = pot_nuclear + pot_renewable
+        curtail_renewable = surplus * np.divide(
+            pot_renewable, pot, out=np.zeros_like(pot), where=pot > 0
+        )
+    return {
+        "energyNotServed": np.maximum(-balance, 0).sum(axis=1),
+        "curtailNuclear": (surplus - curtail_renewable).sum(axis=1),
+        "curtailRenewable": curtail_renewable.sum(axis=1),
+        "demand": demand.sum(axis=1),
+        "storageMatters": (balance < 0).any(axis=1),
+    }
+
+
+def solve_sample(
+    sample: np.ndarray,
+    share_generation: float,
+    share_renewable: float,
+    share_storage: float,
+    cost_curtailment: dict[str, float],
+    total_demand: float | None = None,
+    profile: str | dict[str, Any] | None = None,
+) -> dict[str, float]:
+    """Solve the model for one synthetic year
+
+    Args:
+        sample: hourly profiles with dimension (hour, [demand, renewable])
+        share_generation: multiplier used to derive total generation as multiple
+            of total demand
+        share_renewable: Share of renewable in total generation
+        share_storage: Storage size as share of total demand
+        cost_curtailment: Cost of curtailment by technology
+        total_demand: If provided demand will be normalized to the given number
+        profile: solver profile, see get_solver_profile
+
+    Returns:
+        totals over the year for ENSEMBLE_MEASURES and demand
+    """
+    # imported here such that the closed form screen works without gams api
+    from .simulation import create_inputs, extract_solution, solve_model
+
+    # synthetic years get a calendar of a year without leap day
+    data = pd.DataFrame(
+        {
+            "dateTime": pd.date_range("2001/01/01", periods=len(sample), freq="h"),
+            "demand": sample[:, 0],
+            "renewable": sample[:, 1],
+        }
+    )
+    gdx = create_inputs(
+        data,
+        share_generation=share_generation,
+        share_renewable=share_renewable,
+        share_storage=share_storage,
+        cost_curtailment=cost_curtailment,
+        total_demand=total_demand,
+    )
+    df = extract_solution(solve_model(gdx, profile=profile))
+    return df[ENSEMBLE_MEASURES + ["demand"]].sum().to_dict()
+
+
+def _try_solve_sample(
+    sample: np.ndarray, *scenario: Any, **kwargs: Any
+) -> dict[str, float] | None:
+    """Solve the model for one synthetic year, see solve_sample. Returns None
+    if the solve fails such that the other synthetic years are kept.
+
+    Args:
+        sample: hourly profiles with dimension (hour, [demand, renewable])
+        scenario: share of generation, renewable, and storage and cost of
+            curtailment
+        kwargs: further arguments of solve_sample
+    """
+    try:
+        return solve_sample(sample, *scenario, **kwargs)
+    except Exception as e:
+        print(
+            f"Problems in solving with specification (share gen, ren, sto, cost curtailment): {scenario}: {e}"
+        )
+        return None
+
+
+def check_screen(
+    samples: np.ndarray,
+    share_generation: float,
+    share_renewable: float,
+    share_storage: float,
+    cost_curtailment: dict[str, float],
+    total_demand: float | None = None,
+    n_check: int = 3,
+    profile: str | dict[str, Any] | None = None,
+) -> pd.DataFrame:
+    """Compare the closed form results of screen_scenarios to full solves for
+    synthetic years that the screen does not send to the solver
+
+    Args:
+        samples: hourly profiles with dimension (sample, hour, [demand, renewable])
+        share_generation: multiplier used to derive total generation as multiple
+            of total demand
+        share_renewable: Share of renewable in total generation
+        share_storage: Storage size as share of total demand
+        cost_curtailment: Cost of curtailment by technology
+        total_demand: If provided demand will be normalized to the given number
+        n_check: number of screened synthetic years solved
+        profile: solver profile, see get_solver_profile
+
+    Returns:
+        frame with the absolute deviation of ENSEMBLE_MEASURES by checked sample
+    """
+    screen = screen_scenarios(
+        samples,
+        share_generation=share_generation,
+        share_renewable=share_renewable,
+        cost_curtailment=cost_curtailment,
+        total_demand=total_demand,
+    )
+    screened = np.flatnonzero(~(screen["storageMatters"] & (share_storage > 0)))
+    records = {}
+    for pos in screened[:n_check]:
+        res = solve_sample(
+            samples[pos],
+            share_generation,
+            share_renewable,
+            share_storage,
+            cost_curtailment,
+            total_demand=total_demand,
+            profile=profile,
+        )
+        records[pos] = {m: abs(res[m] - screen[m][pos]) for m in ENSEMBLE_MEASURES}
+    return pd.DataFrame.from_dict(records, orient="index").rename_axis("sample")
+
+
+def simulate_ensemble(
+    share_generation: list[float],
+    share_renewable: list[float],
+    share_storage: list[float],
+    cost_curtailment: list[dict[str, float]] = [{"nuclear": 1, "renewable": 0}],
+    total_demand: float | None = None,
+    country: str = "DE",
+    start: str = "2015/01/01 00:00",
+    end: str = "2023/12/31 23",
+    renewable: str = "windOnshore",
+    fn_entsoe: str | None = None,
+    fn_out: str | None = None,
+    n_samples: int = 100,
+    block_days: int = 7,
+    window_days: int = 14,
+    batch_size: int = 50,
+    seed: int = 0,
+    max_workers: int | None = None,
+    profile: str | dict[str, Any] | None = None,
+) -> pd.DataFrame:
+    """Perform simulations over a set of scenarios for an ensemble of synthetic
+    weather years, see sample_years. Synthetic years are evaluated in batches.
+    For each batch, all scenarios are first evaluated without storage in closed
+    form, see screen_scenarios. The model is only solved for scenarios with
+    storage and synthetic years with deficit hours. In all other cases the
+    storage stays empty and the closed form results are used. Failed solves
+    are reported with NaN totals instead of stopping the ensemble.
+
+    Args:
+        share_generation: list of multiplier used to derive total generation as multiple
+            of total demand
+        share_renewable: list of Share of renewable in total generation
+        share_storage: list of Storage size as share of total demand
+        cost_curtailment: list of Cost of curtailment by technology
+        total_demand: If provided demand will be normalized to the given number
+        country: name of the country as letter ENTSOE code
+        start: first hour of the observed data used for the sampling
+        end: last hour of the observed data used for the sampling
+        renewable: name of renewable source for profile
+        fn_entsoe: name of parquet file with input data. If empty, standard one is used.
+        fn_out: name of the output parquet file
+        n_samples: number of synthetic years
+        block_days: number of days per block of the bootstrap
+        window_days: maximum shift of the day of the year of a drawn block
+        batch_size: number of synthetic years held in memory at once
+        seed: seed of the random number generator
+        max_workers: maximum number of parallel solves
+        profile: solver profile, see get_solver_profile
+
+    Returns:
+        frame with one row per scenario and synthetic year with the totals of
+        ENSEMBLE_MEASURES and demand. Column "status" is "screened" for
+        closed form results, "solved" for full solves, and "failed" for
+        failed solves. Use get_ensemble_statistics for the distributions.
+    """
+    from .simulation import get_entsoe_data
+
+    df_entsoe = get_entsoe_data(country=country, start=start, end=end, fn=fn_entsoe)
+    df_entsoe["renewable"] = df_entsoe[renewable]
+
+    lst_df = []
+    for first in range(0, n_samples, batch_size):
+        n_batch = min(batch_size, n_samples - first)
+        print(f"---- Synthetic years {first + 1} to {first + n_batch}")
+        samples = sample_years(
+            df_entsoe,
+            n_samples=n_batch,
+            block_days=block_days,
+            window_days=window_days,
+            seed=seed + first,
+        )
+        tasks, n_cases = [], 0
+        for s_gen in share_generation:
+            for s_ren in share_renewable:
+                for c_cur in cost_curtailment:
+                    screen = screen_scenarios(
+                        samples,
+                        share_generation=s_gen,
+                        share_renewable=s_ren,
+                        cost_curtailment=c_cur,
+                        total_demand=total_demand,
+                    )
+                    for s_sto in share_storage:
+                        solved = screen["storageMatters"] & (s_sto > 0)
+                        df = pd.DataFrame(
+                            {
+                                "sample": np.arange(first, first + n_batch),
+                                "share_generation": s_gen,
+                                "share_renewable": s_ren,
+                                "share_storage": s_sto,
+                                "costCurtailNuclear": c_cur.get("nuclear", 0),
+                                "costCurtailRenewable": c_cur.get("renewable", 0),
+                                **{
+                                    m: screen[m] for m in ENSEMBLE_MEASURES + ["demand"]
+                                },
+                                "status": np.where(solved, "solved", "screened"),
+                            }
+                        )
+                        lst_df.append(df)
+                        n_cases += n_batch
+                        tasks += [
+                            (df, pos, (s_gen, s_ren, s_sto, c_cur))
+                            for pos in np.flatnonzero(solved)
+                        ]
+
+        # full solves where the storage matters
+        print(f"\t---- Solving {len(tasks)} of {n_cases} cases")
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = pool.map(
+                lambda task: _try_solve_sample(
+                    samples[task[1]],
+                    *task[2],
+                    total_demand=total_demand,
+                    profile=profile,
+                ),
+                tasks,
+            )
+            for (df, pos, _), res in zip(tasks, results):
+                if res is None:
+                    df.loc[df.index[pos], "status"] = "failed"
+                    res = {m: np.nan for m in ENSEMBLE_MEASURES + ["demand"]}
+                for k, v in res.items():
+                    df.loc[df.index[pos], k] = v
+    df = pd.concat(lst_df).reset_index(drop=True)
+    if fn_out is not None:
+        df.to_parquet(fn_out, index=False)
+    return df
+
+
+def get_ensemble_statistics(
+    df: pd.DataFrame, quantiles: list[float] = [0.05, 0.5, 0.95]
+) -> pd.DataFrame:
+    """Get distribution of energy-not-served and curtailment by scenario
+
+    Args:
+        df: results of simulate_ensemble
+        quantiles: quantiles reported in addition to mean and standard deviation
+
+    Returns:
+        frame with scenarios as index and measures and statistics as columns
+    """
+    grouped = df.groupby(SCENARIO_COLUMNS)[ENSEMBLE_MEASURES]
+    return pd.concat(
+        [
+            grouped.mean().add_suffix("Mean"),
+            grouped.std().add_suffix("Std"),
+            *[grouped.quantile(q).add_suffix(f"Q{round(q * 100)}") for q in quantiles],
+        ],
+        axis=1,
+    )
@@ -6,6 +6,7 @@ import tempfile
 import gams.transfer as gt
 import gams
 from .utils import get_temp_dir
+from .solver import write_option_file
 
 
 class GamsModel:
@@ -31,7 +32,8 @@ class GamsModel:
         checkpoint: Optional[gams.GamsCheckpoint] = None,
         options: dict[str, Any] = {},
         files: Optional[list[str]] = None,
-        database: Optional[gams.GamsDatabase] = None
+        database: Optional[gams.GamsDatabase] = None,
+        defines: Optional[dict[str, str]] = None,
     ):
         """
         Args:
@@ -43,6 +45,8 @@ class GamsModel:
             options: a dictionary with your default gams options
             files: files used to run the gams model: If none the standard model
                 file will be used
+            defines: compile time variables set when running the model, i.e.,
+                the equivalent of --name=value on the command line
         """
         self.workspace = self.create_workspace(working_directory=working_directory)
         self.checkpoint = checkpoint
@@ -51,6 +55,8 @@ class GamsModel:
         self.options = self.workspace.add_options()
         for k, v in options.items():
             setattr(self.options, k, v)
+        for k, v in (defines or {}).items():
+            self.options.defines[k] = v
         # copy files into the workspace
         if files is None:
             files = [os.path.join(os.path.dirname(__file__), "model.gms")]
@@ -75,6 +81,20 @@ class GamsModel:
             working_directory = tempfile.mkdtemp(dir=temp_dir)
         return gams.GamsWorkspace(working_directory=working_directory)
 
+    def add_solver_options(self, solver: str, solver_options: dict[str, Any]):
+        """Use solver for LPs and write its option file into the workspace
+
+        Args:
+            solver: name of the LP solver
+            solver_options: options written to the option file of the solver.
+                If empty, no option file is used
+        """
+        self.options.lp = solver
+        if solver_options:
+            write_option_file(self.working_directory, solver, solver_options)
+            self.options.optfile = 1
+        return
+
     @property
     def working_directory(self) -> str:
         """Working directory of the model"""
@@ -0,0 +1,271 @@
+import io
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any
+import numpy as np
+import pandas as pd
+from .aggregation import aggregate_time
+from .simulation import (
+    create_inputs,
+    extract_solution,
+    get_calendar,
+    get_entsoe_data,
+    solve_model,
+)
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+def get_features(periods: np.ndarray, share_storage: np.ndarray) -> np.ndarray:
+    """Get regressors of the runtime and memory model, i.e., a constant, the
+    number of periods, and the number of periods interacted with the storage
+    size
+
+    Args:
+        periods: number of periods of the horizon
+        share_storage: storage size as share of total demand
+    """
+    periods = np.asarray(periods, dtype=float)
+    share_storage = np.asarray(share_storage, dtype=float)
+    return np.column_stack(
+        [np.ones_like(periods), periods, periods * (share_storage > 0)]
+    )
+
+
+def get_solver_memory() -> float:
+    """Get maximum resident memory of the finished solver processes [bytes].
+    Reported in bytes on macOS and in kilobytes on other unix systems. Without
+    the resource module, i.e., on Windows, the memory is unknown and 0 is
+    returned.
+    """
+    if resource is None:
+        return 0.0
+    max_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return float(max_rss if sys.platform == "darwin" else max_rss * 1024)
+
+
+def fit_linear(features: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Fit a linear model by least squares. Coefficients are restricted to be
+    non-negative by dropping negative ones and refitting.
+
+    Args:
+        features: regressors with one row per observation
+        values: observed values
+    """
+    active = np.ones(features.shape[1], dtype=bool)
+    while True:
+        coef = np.zeros(features.shape[1])
+        coef[active] = np.linalg.lstsq(features[:, active], values, rcond=None)[0]
+        if (coef >= 0).all():
+            return coef
+        active &= coef > 0
+
+
+def calibrate(
+    df_entsoe: pd.DataFrame,
+    sample: list[tuple[float, float, float, dict[str, float]]],
+    horizons: list[float] = [0.25, 0.5, 1],
+    total_demand: float | None = None,
+    profile: str | dict[str, Any] | None = None,
+) -> pd.DataFrame:
+    """Solve scenarios for parts of the horizon and record solution time, memory
+    allocated in python, and size of the results. Times include the overhead of
+    tracing memory allocations and are thus conservative.
+
+    Args:
+        df_entsoe: input data of the full horizon
+        sample: scenarios given as share of generation, renewable, and storage
+            and cost of curtailment
+        horizons: parts of the horizon solved, each starting at the first period
+        total_demand: If provided demand will be normalized to the given number
+        profile: solver profile, see get_solver_profile
+
+    Returns:
+        frame with one row per solve
+    """
+    records = []
+    for s_gen, s_ren, s_sto, c_cur in sample:
+        for horizon in horizons:
+            data = df_entsoe.iloc[: max(int(len(df_entsoe) * horizon), 1)]
+            tracemalloc.start()
+            start_time = time.perf_counter()
+            gdx = create_inputs(
+                data,
+                share_generation=s_gen,
+                share_renewable=s_ren,
+                share_storage=s_sto,
+                cost_curtailment=c_cur,
+                total_demand=total_demand,
+            )
+            df = extract_solution(solve_model(gdx, profile=profile), get_calendar(data))
+            seconds = time.perf_counter() - start_time
+            memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            buffer = io.BytesIO()
+            df.to_parquet(buffer)
+            records.append(
+                {
+                    "share_storage": s_sto,
+                    "periods": len(data),
+                    "seconds": seconds,
+                    "memory": memory,
+                    "frameBytes": df.memory_usage(deep=True).sum(),
+                    "parquetBytes": buffer.getbuffer().nbytes,
+                }
+            )
+    return pd.DataFrame(records)
+
+
+def plan_sweep(
+    share_generation: list[float],
+    share_renewable: list[float],
+    share_storage: list[float],
+    cost_curtailment: list[dict[str, float]] = [{"nuclear": 1, "renewable": 0}],
+    total_demand: float | None = None,
+    country: str = "DE",
+    start: str = "2017/01/01 00:00",
+    end: str = "2017/12/31 23",
+    renewable: str = "windOnshore",
+    fn_entsoe: str | None = None,
+    resolution: int = 1,
+    workers: int = 1,
+    n_sample: int = 3,
+    horizons: list[float] = [0.25, 0.5, 1],
+    seed: int = 0,
+    max_hours: float | None = None,
+    max_memory: float | None = None,
+    max_output: float | None = None,
+    refuse: bool = False,
+    profile: str | dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Predict runtime, memory, and output size of simulate before running it.
+    A random sample of the grid is solved for parts of the horizon and runtime,
+    memory, and result size are fitted against the number of periods and the
+    storage size, see get_features. The prediction assumes that the scenarios
+    are distributed over the given number of workers. Peak memory consists of
+    the solves running in parallel and the concatenation of all results, which
+    holds the results twice.
+
+    Args:
+        share_generation: list of multiplier used to derive total generation as multiple
+            of total demand
+        share_renewable: list of Share of renewable in total generation
+        share_storage: list of Storage size as share of total demand
+        cost_curtailment: list of Cost of curtailment by technology
+        total_demand: If provided demand will be normalized to the given number
+        country: name of the country as letter ENTSOE code
+        start: first hour to be included
+        end: last hour to be included
+        renewable: name of renewable source for profile
+        fn_entsoe: name of parquet file with input data. If empty, standard one is used.
+        resolution: number of hours aggregated to one model period, see simulate
+        workers: number of scenarios solved in parallel
+        n_sample: number of scenarios used for the calibration
+        horizons: parts of the horizon solved for the calibration
+        seed: seed used to draw the sample
+        max_hours: limit of the wall time [h]
+        max_memory: limit of the peak memory [bytes]
+        max_output: limit of the size of the output file [bytes]
+        refuse: if true, exceeding a limit raises an error instead of a warning
+        profile: solver profile, see get_solver_profile
+
+    Returns:
+        dictionary with the following keys:
+            scenarios: number of scenarios of the grid
+            periods: number of model periods
+            wallHours: predicted wall time [h]
+            peakMemory: predicted peak memory of python and solver [bytes]
+            outputBytes: predicted size of the output file [bytes]
+            exceeded: list of violated limits
+            calibration: frame with the calibration solves, see calibrate
+    """
+    df_entsoe = get_entsoe_data(country=country, start=start, end=end, fn=fn_entsoe)
+    df_entsoe["renewable"] = df_entsoe[renewable]
+    hours = len(df_entsoe)
+    if resolution > 1:
+        df_entsoe = aggregate_time(df_entsoe, hours=resolution)
+    grid = [
+        (s_gen, s_ren, s_sto, c_cur)
+        for s_ren in share_renewable
+        for s_gen in share_generation
+        for s_sto in share_storage
+        for c_cur in cost_curtailment
+    ]
+    rng = random.Random(seed)
+    sample = rng.sample(grid, min(n_sample, len(grid)))
+    # the fit needs solves with and without storage if the grid contains both
+    groups = [[g for g in grid if g[2] > 0], [g for g in grid if g[2] <= 0]]
+    for group in groups:
+        if len(group) > 0 and not any(g in group for g in sample):
+            # all of a larger sample belong to the other group, such that one
+            # can be replaced. A single scenario is kept and one is added
+            if len(sample) > 1:
+                sample[-1] = rng.choice(group)
+            else:
+                sample.append(rng.choice(group))
+    df_cal = calibrate(
+        df_entsoe,
+        sample,
+        horizons=horizons,
+        total_demand=total_demand,
+        profile=profile,
+    )
+    solver_memory = get_solver_memory()
+    if resource is None:
+        print("Warning: memory of the solver processes is not included")
+
+    # predict for all scenarios of the grid
+    features_cal = get_features(df_cal["periods"], df_cal["share_storage"])
+    features = get_features(
+        np.full(len(grid), len(df_entsoe)), np.array([g[2] for g in grid])
+    )
+    seconds = features @ fit_linear(features_cal, df_cal["seconds"].to_numpy())
+    memory = features @ fit_linear(features_cal, df_cal["memory"].to_numpy())
+    # results are expanded to hourly values
+    rows_per_period = hours / len(df_entsoe)
+    frame_bytes = (
+        df_cal["frameBytes"] / df_cal["periods"] * len(df_entsoe) * rows_per_period
+    ).max()
+    output_bytes = (
+        df_cal["parquetBytes"] / df_cal["periods"] * len(df_entsoe) * rows_per_period
+    ).max() * len(grid)
+    scale = len(df_entsoe) / df_cal["periods"].max()
+    peak_memory = workers * (
+        memory.max() + solver_memory * scale
+    ) + 2 * frame_bytes * len(grid)
+    plan = {
+        "scenarios": len(grid),
+        "periods": len(df_entsoe),
+        "wallHours": seconds.sum() / workers / 3600,
+        "peakMemory": peak_memory,
+        "outputBytes": output_bytes,
+    }
+
+    # check limits
+    exceeded = [
+        f"{name} {plan[key]:.4g} exceeds limit {limit:.4g}"
+        for name, key, limit in [
+            ("Wall time [h]", "wallHours", max_hours),
+            ("Peak memory [bytes]", "peakMemory", max_memory),
+            ("Output size [bytes]", "outputBytes", max_output),
+        ]
+        if limit is not None and plan[key] > limit
+    ]
+    print(
+        f"Plan for {plan['scenarios']} scenarios with {plan['periods']} periods "
+        f"on {workers} workers:\n"
+        f"\tWall time: {plan['wallHours']:.2f} h\n"
+        f"\tPeak memory: {plan['peakMemory'] / 2**30:.2f} GiB\n"
+        f"\tOutput size: {plan['outputBytes'] / 2**30:.2f} GiB"
+    )
+    if len(exceeded) > 0:
+        if refuse:
+            raise ValueError(f"Sweep exceeds limits: {'; '.join(exceeded)}")
+        for e in exceeded:
+            print(f"Warning: {e}")
+    return {**plan, "exceeded": exceeded, "calibration": df_cal}
@@ -0,0 +1,287 @@
+from collections import Counter
+import cProfile
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Any
+import gams.transfer as gt
+from .gams_model import GamsModel
+from .simulation import _check_solution, get_reoptimization_source, get_scenario
+from .solver import get_solver_profile, write_option_file
+
+# profilers supported by replay_bundle
+PROFILERS = [None, "cprofile", "sampling", "memory"]
+# solution paths of simulate recorded in a bundle. Bundles of the decompose
+# path are replayed as solve of the full model
+MODES = ["full", "reoptimize", "decompose"]
+
+
+def get_bundle_name(scenario: dict[str, float]) -> str:
+    """Get name of the bundle directory of a scenario
+
+    Args:
+        scenario: scenario specification, see get_scenario
+    """
+    return "_".join(f"{k}{v:.6g}" for k, v in scenario.items())
+
+
+def export_bundle(
+    gdx: gt.Container,
+    dir_bundle: str,
+    profile: str | dict[str, Any] | None = None,
+    defines: dict[str, str] | None = None,
+    mode: str = "full",
+    cost_reoptimize: list[dict[str, float]] | None = None,
+    log: str | None = None,
+) -> str:
+    """Export model inputs and solver settings of a scenario as self-contained
+    bundle that can be solved again with replay_bundle. The bundle holds the files
+    inputs.gdx, settings.json, the model file model.gms, the option file of
+    the solver if the profile sets solver options, and the solver log of the
+    original run as run.log if provided.
+
+    Args:
+        gdx: gdx container with data for model, see create_inputs
+        dir_bundle: directory of the bundle
+        profile: solver profile, see get_solver_profile
+        defines: compile time variables passed to the model, see solve_model
+        mode: solution path used by simulate, one of MODES
+        cost_reoptimize: further costs of curtailment re-solved with mode
+            reoptimize, see solve_lexicographic
+        log: solver log of the original run
+
+    Returns:
+        directory of the bundle
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode {mode}. Use one of {MODES}")
+    os.makedirs(dir_bundle, exist_ok=True)
+    gdx.write(os.path.join(dir_bundle, "inputs.gdx"))
+    if log is not None:
+        with open(os.path.join(dir_bundle, "run.log"), "w") as f:
+            f.write(log)
+    shutil.copy(os.path.join(os.path.dirname(__file__), "model.gms"), dir_bundle)
+    settings = get_solver_profile(profile)
+    fn_opt = None
+    if settings["solver"] is not None and settings["solver_options"]:
+        fn_opt = write_option_file(
+            dir_bundle, settings["solver"], settings["solver_options"]
+        )
+    with open(os.path.join(dir_bundle, "settings.json"), "w") as f:
+        json.dump(
+            {
+                "scenario": get_scenario(gdx),
+                "profile": settings,
+                "defines": defines or {},
+                "files": ["model.gms"],
+                "option_file": None if fn_opt is None else os.path.basename(fn_opt),
+                "mode": mode,
+                "cost_reoptimize": cost_reoptimize or [],
+            },
+            f,
+            indent=2,
+        )
+    return dir_bundle
+
+
+def load_bundle(dir_bundle: str) -> tuple[gt.Container, dict[str, Any]]:
+    """Load a bundle written by export_bundle
+
+    Args:
+        dir_bundle: directory of the bundle
+
+    Returns:
+        gdx container with data for model; settings with the keys scenario,
+        profile, defines, files, option_file, mode, and cost_reoptimize
+    """
+    gdx = gt.Container(load_from=os.path.join(dir_bundle, "inputs.gdx"))
+    with open(os.path.join(dir_bundle, "settings.json")) as f:
+        settings = json.load(f)
+    return gdx, settings
+
+
+def _solve_bundle(
+    dir_bundle: str,
+    gdx: gt.Container,
+    settings: dict[str, Any],
+    output: Any | None = None,
+) -> gt.Container:
+    """Solve the scenario of a bundle with the model and option file of the
+    bundle, see solve_model. Bundles of mode reoptimize are re-solved for the
+    further costs of curtailment from the same build, see solve_lexicographic.
+    Bundles without model file are solved with the current model.
+
+    Args:
+        dir_bundle: directory of the bundle, see export_bundle
+        gdx: gdx container with data for model, see load_bundle
+        settings: settings of the bundle, see load_bundle
+        output: destination of the gams log, e.g., an open file. If empty,
+            the log is discarded
+
+    Returns:
+        gdx container with solution values of the last solve
+    """
+    profile = settings["profile"]
+    files = [os.path.join(dir_bundle, fn) for fn in settings.get("files", [])]
+    model = GamsModel(
+        options=profile["options"], files=files or None, defines=settings["defines"]
+    )
+    if profile["solver"] is not None:
+        model.options.lp = profile["solver"]
+        if settings.get("option_file"):
+            shutil.copy(
+                os.path.join(dir_bundle, settings["option_file"]),
+                model.working_directory,
+            )
+            model.options.optfile = 1
+        elif "option_file" not in settings:
+            # bundles written before the option file was part of the bundle
+            model.add_solver_options(profile["solver"], profile["solver_options"])
+    model.add_database(container=gdx, in_model_name="data")
+    sol = model.run(output=output)
+    _check_solution(sol)
+    if settings.get("mode") == "reoptimize":
+        for pos, c_cur in enumerate(settings["cost_reoptimize"]):
+            model.run_file(
+                gams_source=get_reoptimization_source(c_cur, declare=pos == 0),
+                output=output,
+            )
+            sol = gt.Container(load_from=model.database)
+            _check_solution(sol)
+    return sol
+
+
+def _get_frame_name(code) -> str:
+    """Get name of a code object as used in the collapsed stacks
+
+    Args:
+        code: code object of a frame
+    """
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+def _sample_stacks(
+    thread_id: int, interval: float, stop: threading.Event, counts: Counter
+):
+    """Record the stack of a thread in regular intervals until stopped
+
+    Args:
+        thread_id: identifier of the sampled thread
+        interval: time between two samples [s]
+        stop: event ending the sampling
+        counts: number of samples by stack in collapsed format
+    """
+    while not stop.wait(interval):
+        frame = sys._current_frames().get(thread_id)
+        stack = []
+        while frame is not None:
+            stack.append(_get_frame_name(frame.f_code))
+            frame = frame.f_back
+        if stack:
+            counts[";".join(reversed(stack))] += 1
+
+
+def write_collapsed(fn: str, counts: dict[str, float]):
+    """Write stacks in the collapsed format used by flamegraph.pl and speedscope,
+    i.e., one line with the frames separated by semicolons and the count
+
+    Args:
+        fn: name of the output file
+        counts: count by stack
+    """
+    with open(fn, "w") as f:
+        for stack, count in sorted(counts.items()):
+            f.write(f"{stack} {int(count)}\n")
+
+
+def replay_bundle(
+    dir_bundle: str,
+    profiler: str | None = None,
+    interval: float = 0.001,
+    dir_out: str | None = None,
+) -> dict[str, Any]:
+    """Solve the scenario of a bundle again with the model and option file of
+    the bundle, optionally under a profiler. The solver log is written to
+    solver.log in the output directory. Depending on the profiler, the
+    following files are written:
+
+    - cprofile: replay.prof with the statistics of cProfile, e.g., for
+      snakeviz or flameprof
+    - sampling: replay.collapsed with the stacks sampled in the given interval
+    - memory: replay.collapsed with the bytes allocated by stack that are still
+      alive after the solve, the peak is reported in the result
+
+    Args:
+        dir_bundle: directory of the bundle, see export_bundle
+        profiler: one of PROFILERS. If empty, the scenario is solved without
+            profiler
+        interval: time between two samples of the sampling profiler [s]
+        dir_out: directory of the output files. If empty, the bundle directory
+            is used
+
+    Returns:
+        dictionary with the keys seconds, the status of the solution, the
+        written files, and for the memory profiler the peak of traced memory
+        [bytes]
+    """
+    if profiler not in PROFILERS:
+        raise ValueError(f"Unknown profiler {profiler}. Use one of {PROFILERS}")
+    dir_out = dir_bundle if dir_out is None else dir_out
+    os.makedirs(dir_out, exist_ok=True)
+    gdx, settings = load_bundle(dir_bundle)
+    fn_log = os.path.join(dir_out, "solver.log")
+    res = {"files": [fn_log]}
+
+    counts = Counter()
+    if profiler == "cprofile":
+        prof = cProfile.Profile()
+        prof.enable()
+    elif profiler == "sampling":
+        stop = threading.Event()
+        sampler = threading.Thread(
+            target=_sample_stacks,
+            args=(threading.get_ident(), interval, stop, counts),
+            daemon=True,
+        )
+        sampler.start()
+    elif profiler == "memory":
+        tracemalloc.start(64)
+
+    start_time = time.perf_counter()
+    try:
+        with open(fn_log, "w") as log:
+            sol = _solve_bundle(dir_bundle, gdx, settings, output=log)
+        res["status"] = sol["stats"].records.set_index("uni")["value"].to_dict()
+    except Exception as e:
+        res["status"] = {"error": repr(e)}
+    res["seconds"] = time.perf_counter() - start_time
+
+    if profiler == "cprofile":
+        prof.disable()
+        fn = os.path.join(dir_out, "replay.prof")
+        prof.dump_stats(fn)
+        res["files"].append(fn)
+    elif profiler == "sampling":
+        stop.set()
+        sampler.join()
+    elif profiler == "memory":
+        snapshot = tracemalloc.take_snapshot()
+        res["peakMemory"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        for stat in snapshot.statistics("traceback"):
+            stack = ";".join(
+                f"{os.path.basename(frame.filename)}:{frame.lineno}"
+                for frame in stat.traceback
+            )
+            counts[stack] += stat.size
+    if counts:
+        fn = os.path.join(dir_out, "replay.collapsed")
+        write_collapsed(fn, counts)
+        res["files"].append(fn)
+    return res
@@ -0,0 +1,160 @@
+from typing import Any
+import pandas as pd
+from .aggregation import ENERGY_COLUMNS, SCENARIO_COLUMNS, get_aggregation_error
+
+# result columns proportional to total demand, all other columns are shares,
+# costs, or dates and do not change with the demand level
+EXTENSIVE_COLUMNS = ENERGY_COLUMNS + ["storageLevel"]
+
+
+def get_normalized_demand(hours: int) -> float:
+    """Get total demand of the normalized model, i.e., demand of one per hour
+    on average. This keeps the values of the model around one regardless of
+    the length of the horizon.
+
+    Args:
+        hours: number of hours of the horizon
+    """
+    return float(hours)
+
+
+def rescale_results(df: pd.DataFrame, total_demand: float) -> pd.DataFrame:
+    """Rescale results to another demand level. The model is linear and
+    homogeneous in demand, generation, and storage size, which create_inputs
+    all derive from total demand. Hence, results of any demand level are the
+    results of another level multiplied by the ratio of the levels.
+
+    Args:
+        df: results of simulate
+        total_demand: total demand of each scenario after rescaling
+
+    Returns:
+        results with EXTENSIVE_COLUMNS rescaled such that demand of each
+        scenario sums to total_demand
+    """
+    factor = total_demand / df.groupby(SCENARIO_COLUMNS)["demand"].transform("sum")
+    cols = [c for c in EXTENSIVE_COLUMNS if c in df.columns]
+    return df.assign(**{c: df[c] * factor for c in cols})
+
+
+def get_scaling_error(
+    total_demand: list[float],
+    share_generation: list[float] = [1.1],
+    share_renewable: list[float] = [0.5],
+    share_storage: list[float] = [0, 0.00005],
+    cost_curtailment: list[dict[str, float]] = [{"nuclear": 1, "renewable": 0}],
+    country: str = "DE",
+    start: str = "2017/01/01 00:00",
+    end: str = "2017/01/31 23",
+    renewable: str = "windOnshore",
+    fn_entsoe: str | None = None,
+    profile: str | dict[str, Any] | None = None,
+) -> pd.DataFrame:
+    """Compare the results of simulate solved in normalized units and rescaled,
+    see solve_normalized, to direct solves at the given demand levels. Use to check that
+    the rescaling is exact up to the tolerances of the solver.
+
+    Args:
+        total_demand: demand levels to compare
+        share_generation: list of multiplier used to derive total generation as multiple
+            of total demand
+        share_renewable: list of Share of renewable in total generation
+        share_storage: list of Storage size as share of total demand
+        cost_curtailment: list of Cost of curtailment by technology
+        country: name of the country as letter ENTSOE code
+        start: first hour to be included
+        end: last hour to be included
+        renewable: name of renewable source for profile
+        fn_entsoe: name of parquet file with input data. If empty, standard one is used.
+        profile: solver profile, see get_solver_profile
+
+    Returns:
+        frame with errors by demand level and scenario, see get_aggregation_error,
+        and the largest absolute hourly deviation of EXTENSIVE_COLUMNS
+    """
+    # imported here as simulation builds on this module
+    from .simulation import (
+        create_inputs,
+        extract_solution,
+        get_calendar,
+        get_entsoe_data,
+        simulate,
+        solve_model,
+    )
+
+    scenarios = [
+        (s_gen, s_ren, s_sto, c_cur)
+        for s_ren in share_renewable
+        for s_gen in share_generation
+        for s_sto in share_storage
+        for c_cur in cost_curtailment
+    ]
+    data = get_entsoe_data(country=country, start=start, end=end, fn=fn_entsoe)
+    data["renewable"] = data[renewable]
+    # solved once in normalized units
+    df_norm = simulate(
+        share_generation=share_generation,
+        share_renewable=share_renewable,
+        share_storage=share_storage,
+        cost_curtailment=cost_curtailment,
+        country=country,
+        start=start,
+        end=end,
+        renewable=renewable,
+        fn_entsoe=fn_entsoe,
+        profile=profile,
+        normalized=True,
+    )
+
+    lst_df = []
+    for demand in total_demand:
+        df_direct = pd.concat(
+            [
+                extract_solution(
+                    solve_model(
+                        create_inputs(
+                            data,
+                            share_generation=s_gen,
+                            share_renewable=s_ren,
+                            share_storage=s_sto,
+                            cost_curtailment=c_cur,
+                            total_demand=demand,
+                        ),
+                        profile=profile,
+                    ),
+                    index=get_calendar(data),
+                )
+                for s_gen, s_ren, s_sto, c_cur in scenarios
+            ]
+        )
+        df_direct = df_direct.assign(date=df_direct.index).reset_index(drop=True)
+        df_scaled = rescale_results(df_norm, demand)
+        error = get_aggregation_error(df_full=df_direct, df_agg=df_scaled)
+        # hours are matched by scenario and date, rounding the scenario
+        # specification to avoid mismatches due to precision. Hours missing in
+        # one of the frames count as infinite deviation
+        keys = SCENARIO_COLUMNS + ["date"]
+        cols = [c for c in EXTENSIVE_COLUMNS if c in df_direct.columns]
+        df_both = df_direct.round({c: 8 for c in SCENARIO_COLUMNS}).merge(
+            df_scaled.round({c: 8 for c in SCENARIO_COLUMNS})[keys + cols],
+            on=keys,
+            how="outer",
+            suffixes=("", "Scaled"),
+            validate="one_to_one",
+        )
+        max_deviation = (
+            (df_both[[f"{c}Scaled" for c in cols]].to_numpy() - df_both[cols])
+            .abs()
+            .max(axis=1, skipna=False)
+            .fillna(float("inf"))
+            .groupby([df_both[c] for c in SCENARIO_COLUMNS])
+            .max()
+            .rename("maxHourlyError")
+            .reset_index()
+        )
+        lst_df.append(
+            error.merge(max_deviation, on=SCENARIO_COLUMNS).assign(
+                totalDemand=demand
+            )
+        )
+    return pd.concat(lst_df).reset_index(drop=True)
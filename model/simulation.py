@@ -1,7 +1,14 @@
+import io
+import os
+import numpy as np
 import pandas as pd
 import gams.transfer as gt
 from .utils import get_standard_entsoe_input
+from typing import Any
 from .gams_model import GamsModel
+from .solver import get_solver_profile
+from .aggregation import aggregate_time, expand_solution
+from .scaling import get_normalized_demand, rescale_results
 
 
 def get_entsoe_data(
@@ -28,6 +35,25 @@ def get_entsoe_data(
     return df
 
 
+def get_period_labels(n: int) -> list[str]:
+    """Get labels of the elements of the time set, i.e., t1..tN
+
+    Args:
+        n: number of periods
+    """
+    return [f"t{k}" for k in range(1, n + 1)]
+
+
+def get_calendar(data: pd.DataFrame) -> pd.DatetimeIndex:
+    """Get dates of the periods in the order of the time set used by
+    create_inputs. Results are attached to the dates using this lookup.
+
+    Args:
+        data: A dataframe with column "dateTime"
+    """
+    return pd.DatetimeIndex(data["dateTime"], name="t")
+
+
 def create_inputs(
     data: pd.DataFrame,
     share_generation: float = 1,
@@ -46,6 +72,7 @@ def create_inputs(
     - For renewable generation the profile is inferred based in the input data
     - Maximum storage size is determined as share of total demand
     - Total demand can be normalized to given number
+    - For aggregated data, column "hours" gives the number of hours per period
 
     Args:
         data: A dataframe with the following columns:
@@ -76,29 +103,33 @@ def create_inputs(
     ]
     max_storage = total_demand * share_storage
 
-    # derive profiles and demand
-    df_profiles = data[["dateTime", "demand", "renewable"]].set_index("dateTime")
-    df_profiles = df_profiles / df_profiles.sum()
-    df_profiles["nuclear"] = 1 / len(df_profiles)
-    df_profiles = df_profiles.reset_index()
-    df_demand = df_profiles[["dateTime", "demand"]].assign(
-        demand=lambda df: df["demand"] * total_demand
+    # derive profiles and demand, periods are labeled t1..tN in the order of
+    # the data, see get_calendar for the corresponding dates
+    df_profiles = (
+        data[["demand", "renewable"]]
+        .set_axis(get_period_labels(len(data)))
+        .rename_axis("t")
     )
+    df_profiles = df_profiles / df_profiles.sum()
+    # constant nuclear profile, periods of aggregated data have several hours
+    if "hours" in data.columns:
+        df_profiles["nuclear"] = (data["hours"] / data["hours"].sum()).to_numpy()
+    else:
+        df_profiles["nuclear"] = 1 / len(df_profiles)
+    df_demand = (df_profiles["demand"] * total_demand).reset_index()
 
     # create sets
     i = gt.Set(gdx, "i", records=["nuclear", "renewable"], description="Technologies")
     s = gt.Set(gdx, "s", records=["storage"], description="storage")
-    t = gt.Set(gdx, "t", description="periods", records=list(data["dateTime"].unique()))
+    t = gt.Set(gdx, "t", description="periods", records=list(df_profiles.index))
 
     # parameters
-    gt.Parameter(gdx, "dem", domain=[t], records=data[["dateTime", "demand"]])
     gt.Parameter(gdx, "agen", domain=[i], records=total_generation)
     gt.Parameter(
         gdx,
         "alpha",
         domain=[i, t],
-        records=df_profiles[["dateTime", "nuclear", "renewable"]]
-        .set_index("dateTime")
+        records=df_profiles[["nuclear", "renewable"]]
         .stack()
         .swaplevel()
         .reset_index(),
@@ -119,63 +150,256 @@ def create_inputs(
     return gdx
 
 
-def extract_solution(gdx: gt.Container) -> pd.DataFrame:
-    """Extract solutions
+def _get_positions(column: pd.Series, index: pd.Index) -> np.ndarray:
+    """Get the position of each record in the given set order. For categorical
+    columns only the categories are looked up and the codes are mapped onto
+    the result, i.e., no string comparison on the record level.
 
     Args:
-        gdx: gdx container with solution values
+        column: column of a gams record frame with set elements
+        index: elements of the set in the order used for the result
     """
-    # collect results in a single dataframe
-    df = (
-        gdx["GEN"]
-        .records.pivot_table("level", "t", "i")
-        .join(
-            gdx["REL"]
-            .records.pivot_table("level", "t", "s")
-            .join(
-                gdx["INJ"].records.pivot_table("level", "t", "s") * (-1),
-                rsuffix="in",
-                lsuffix="out",
-            )
-            .assign(netStorage=lambda df: df.sum(1))
-            .iloc[:, [-1]]
-        )
-        .join(gdx["dem"].records.set_index("t")["value"].to_frame("demand"))
-        .join(gdx["ENS"].records.set_index("t")["level"].to_frame("energyNotServed"))
-        .join(
-            gdx["STO"]
-            .records.pivot_table("level", "t", "s")
-            .rename(columns={"storage": "storageLevel"})
-        )
-        .join(
-            gdx["curtailment"]
-            .records.pivot_table("value", "t", "i")
-            .fillna(0)
-            .rename(
-                columns={"nuclear": "curtailNuclear", "renewable": "curtailRenewable"}
-            )
-        )
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        positions = index.get_indexer(column.cat.categories.astype(str))
+        return positions[column.cat.codes.to_numpy()]
+    return index.get_indexer(column.astype(str))
+
+
+def _get_levels(
+    records: pd.DataFrame | None,
+    index: pd.Index,
+    value: str = "level",
+    domain: str | None = None,
+    element: str | None = None,
+) -> np.ndarray:
+    """Read values of a symbol defined over the time set into a numpy array
+    ordered as the time set. Values over other domains are summed up unless
+    an element is specified. Missing records are zero.
+
+    Args:
+        records: records of the gams symbol
+        index: elements of the time set in model order
+        value: name of the value column, i.e., "level" or "value"
+        domain: name of additional domain used to select the element
+        element: element of the domain to be extracted
+    """
+    if records is None or len(records) == 0:
+        return np.zeros(len(index))
+    if domain is not None:
+        records = records[records[domain] == element]
+    return np.bincount(
+        _get_positions(records["t"], index),
+        weights=records[value].to_numpy(dtype=float),
+        minlength=len(index),
     )
-    # ensure that all columns are in the frame even if values are zero
-    cols = ["curtailNuclear", "curtailRenewable"]
-    for c in cols:
-        if c not in df.columns:
-            df[c] = 0.0
-    # get scenario specification
+
+
+def get_scenario(gdx: gt.Container) -> dict[str, float]:
+    """Get scenario specification from model inputs
+
+    Args:
+        gdx: gdx container with model inputs
+
+    Returns:
+        dictionary with the following keys:
+            share_generation, share_renewable, share_storage,
+            costCurtailNuclear, costCurtailRenewable
+    """
+    total_demand = gdx["dem"].records["value"].sum()
     agen = gdx["agen"].records.assign(share=lambda df: df["value"] / df["value"].sum())
-    df["share_generation"] = agen["value"].sum() / df["demand"].sum()
+    scenario = {"share_generation": agen["value"].sum() / total_demand}
     if "renewable" in agen["i"].unique():
-        df["share_renewable"] = agen.query("i == 'renewable'")["share"].iloc[0]
+        scenario["share_renewable"] = agen.query("i == 'renewable'")["share"].iloc[0]
     else:
-        df["share_renewable"] = 0.0
+        scenario["share_renewable"] = 0.0
     max_sto = gdx["max_sto"].records
     if max_sto is None:
-        df["share_storage"] = 0.0
+        scenario["share_storage"] = 0.0
     else:
-        df["share_storage"] = max_sto["value"].iloc[0] / df["demand"].sum()
+        scenario["share_storage"] = max_sto["value"].iloc[0] / total_demand
     cost_curtail = gdx["cost_curtailment"].records.set_index("i")["value"].to_dict()
-    df["costCurtailNuclear"] = cost_curtail.get("nuclear", 0)
-    df["costCurtailRenewable"] = cost_curtail.get("renewable", 0)
+    scenario["costCurtailNuclear"] = cost_curtail.get("nuclear", 0)
+    scenario["costCurtailRenewable"] = cost_curtail.get("renewable", 0)
+    return scenario
+
+
+def solve_model(
+    gdx: gt.Container,
+    defines: dict[str, str] | None = None,
+    profile: str | dict[str, Any] | None = None,
+    output: Any | None = None,
+) -> gt.Container:
+    """Solve the model for the given inputs and check the solution status
+
+    Args:
+        gdx: gdx container with data for model
+        defines: compile time variables passed to the model, e.g.,
+            {"acyclic": "1"} for a horizon without storage wrap around
+        profile: solver profile, see get_solver_profile
+        output: destination of the gams log, e.g., an open file. If empty,
+            the log is discarded
+
+    Returns:
+        gdx container with solution values
+    """
+    settings = get_solver_profile(profile)
+    model = GamsModel(options=settings["options"], defines=defines)
+    if settings["solver"] is not None:
+        model.add_solver_options(settings["solver"], settings["solver_options"])
+    model.add_database(container=gdx, in_model_name="data")
+    sol = model.run(output=output)
+    _check_solution(sol)
+    return sol
+
+
+def _check_solution(sol: gt.Container):
+    """Check the solution statistics written by the model
+
+    Args:
+        sol: gdx container with solution values
+    """
+    stats = sol["stats"].records.set_index("uni")["value"].to_dict()
+    assert stats["modelstat"] <= 2, f"Model did not solve correctly: {stats}"
+    assert stats["solvestat"] == 1, f"Model did not solve correctly: {stats}"
+
+
+def get_reoptimization_source(
+    cost_curtailment: dict[str, float], declare: bool = True, tolerance: float = 1e-6
+) -> str:
+    """Get gams code re-solving the model of a checkpoint with another cost of
+    curtailment while energy-not-served is capped at the value of the solution
+    in the checkpoint
+
+    Args:
+        cost_curtailment: Cost of curtailment by technology
+        declare: if true, the cap on energy-not-served and the model including
+            it are declared, i.e., for the first re-optimization from the
+            checkpoint of model.gms
+        tolerance: relative slack of the cap on energy-not-served
+    """
+    source = ""
+    if declare:
+        source += f"""
+Scalar ens_opt energy not served of the first solve [MWh];
+ens_opt = sum(t, ENS.L(t));
+
+Equation ens_cap energy not served capped at the first solve [MWh];
+ens_cap..
+    sum(t, ENS(t))          =L= ens_opt * (1 + {tolerance:g}) + {tolerance:g}
+;
+
+model baseload_lex /baseload, ens_cap/;
+"""
+    source += "".join(
+        f"cost_curtailment('{k}') = {v:g};\n" for k, v in cost_curtailment.items()
+    )
+    source += """
+solve baseload_lex using LP minimizing COST;
+
+curtailment(i,t) = alpha(i,t)*agen(i) - GEN.L(i,t);
+lostload = COST.L;
+stats["modelstat"] = baseload_lex.modelstat;
+stats["solvestat"] = baseload_lex.solvestat;
+"""
+    return source
+
+
+def solve_lexicographic(
+    gdx: gt.Container,
+    cost_curtailment: list[dict[str, float]],
+    defines: dict[str, str] | None = None,
+    profile: str | dict[str, Any] | None = None,
+    tolerance: float = 1e-6,
+    output: Any | None = None,
+) -> list[gt.Container]:
+    """Solve the model for several costs of curtailment from one model build.
+    The model is first solved with the cost of curtailment of the inputs. For
+    each further cost of curtailment, energy-not-served is capped at the value
+    of the first solve and the model is re-solved from the checkpoint, i.e.,
+    only the curtailment order is optimized and the solver starts from the
+    previous basis. The cost of curtailment only breaks ties between solutions
+    with the same energy-not-served, so the results equal separate solves up
+    to the tolerance of the cap.
+
+    Args:
+        gdx: gdx container with data for model, see create_inputs
+        cost_curtailment: further costs of curtailment by technology
+        defines: compile time variables passed to the model, see solve_model
+        profile: solver profile, see get_solver_profile
+        tolerance: relative slack of the cap on energy-not-served
+        output: destination of the gams log, see solve_model
+
+    Returns:
+        gdx containers with solution values, first for the cost of curtailment
+        of the inputs followed by the given ones
+    """
+    settings = get_solver_profile(profile)
+    model = GamsModel(options=settings["options"], defines=defines)
+    if settings["solver"] is not None:
+        model.add_solver_options(settings["solver"], settings["solver_options"])
+    model.add_database(container=gdx, in_model_name="data")
+    solutions = [model.run(output=output)]
+    _check_solution(solutions[0])
+    for pos, c_cur in enumerate(cost_curtailment):
+        model.run_file(
+            gams_source=get_reoptimization_source(
+                c_cur, declare=pos == 0, tolerance=tolerance
+            ),
+            output=output,
+        )
+        sol = gt.Container(load_from=model.database)
+        _check_solution(sol)
+        solutions.append(sol)
+    return solutions
+
+
+def extract_solution(gdx: gt.Container, index: pd.Index | None = None) -> pd.DataFrame:
+    """Extract solutions. Levels are read directly into numpy arrays ordered as
+    the time set of the model.
+
+    Args:
+        gdx: gdx container with solution values
+        index: index attached to the results, e.g., the datetime values of the
+            periods, see get_calendar. Has to be ordered as the time set. If
+            empty, the elements of the time set are used.
+    """
+    periods = pd.Index(gdx["t"].records.iloc[:, 0].astype(str))
+    technologies = list(gdx["i"].records.iloc[:, 0].astype(str))
+    if index is None:
+        index = periods.rename("t")
+
+    # collect results in a single dataframe
+    res = {
+        tech: _get_levels(gdx["GEN"].records, periods, domain="i", element=tech)
+        for tech in technologies
+    }
+    res["netStorage"] = _get_levels(gdx["REL"].records, periods) - _get_levels(
+        gdx["INJ"].records, periods
+    )
+    res["demand"] = _get_levels(gdx["dem"].records, periods, value="value")
+    res["energyNotServed"] = _get_levels(gdx["ENS"].records, periods)
+    res["storageLevel"] = _get_levels(
+        gdx["STO"].records, periods, domain="s", element="storage"
+    )
+    res["curtailNuclear"] = _get_levels(
+        gdx["curtailment"].records,
+        periods,
+        value="value",
+        domain="i",
+        element="nuclear",
+    )
+    res["curtailRenewable"] = _get_levels(
+        gdx["curtailment"].records,
+        periods,
+        value="value",
+        domain="i",
+        element="renewable",
+    )
+    df = pd.DataFrame(res, index=index)
+
+    # get scenario specification
+    for k, v in get_scenario(gdx).items():
+        df[k] = v
     return df
 
 
@@ -191,6 +415,15 @@ def simulate(
     renewable: str = "windOnshore",
     fn_entsoe: str | None = None,
     fn_out: str | None = None,
+    resolution: int = 1,
+    decompose: bool = False,
+    max_workers: int | None = None,
+    profile: str | dict[str, Any] | None = None,
+    dir_replay: str | None = None,
+    replay_scenarios: str | list[tuple[float, float, float]] | None = None,
+    reoptimize: bool = False,
+    solve_normalized: bool = False,
+    normalized: bool = False,
 ):
     """Perform simulations over a set of scenarios.
 
@@ -202,6 +435,9 @@ def simulate(
     - For renewable generation the profile is inferred based in the input data
     - Maximum storage size is determined as share of total demand
     - Total demand can be normalized to given number
+    - Optionally, the model is solved in normalized units, see
+      get_normalized_demand, and results are rescaled to the total demand, see
+      rescale_results
 
     Args:
         share_generation: list of multiplier used to derive total generation as multiple
@@ -218,10 +454,60 @@ def simulate(
         renewable: name of renewable source for profile
         fn_entsoe: name of parquet file with input data. If empty, standard one is used.
         fn_out: name of the output parquet file
+        resolution: number of hours aggregated to one model period. Results are
+            expanded back to hourly values. Use get_aggregation_error to compare
+            with the full resolution
+        decompose: if true, the horizon is split where the storage runs empty
+            and the segments are solved in parallel, see solve_decomposed. If
+            the stitched solution is not optimal, the full model is solved
+        max_workers: maximum number of parallel segment solves
+        profile: solver profile, e.g., "barrier". See SOLVER_PROFILES and
+            autotune to find the fastest profile
+        dir_replay: directory to which the inputs and the solver log of failing
+            scenarios are exported as bundles, see export_bundle and
+            replay_bundle. The bundle records the solution path, i.e., whether
+            the scenario was decomposed or re-optimized. The solver logs of the
+            segments of decompose are not recorded
+        replay_scenarios: further scenarios exported to dir_replay, "all" for
+            every scenario or a list of generation, renewable, and storage
+            shares. Bundles are exported for all costs of curtailment of the
+            selected shares
+        reoptimize: if true, the model is built once per scenario and solved
+            for the first cost of curtailment. The other costs of curtailment
+            are re-solved from its checkpoint with energy-not-served fixed,
+            see solve_lexicographic. Not available with decompose
+        solve_normalized: if true, the model is solved in normalized units and
+            results are rescaled to the total demand. Use get_scaling_error to
+            compare with direct solves
+        normalized: if true, the model is solved in normalized units and
+            results are returned and stored in normalized units instead of
+            being rescaled to the total demand. Use rescale_results or the
+            total demand of the dashboard to rescale them to any demand level
     """
+    if reoptimize and decompose:
+        raise ValueError("Re-optimization is not available with decomposition")
+    if isinstance(replay_scenarios, str) and replay_scenarios != "all":
+        raise ValueError(f"Unknown replay scenarios {replay_scenarios}")
+    # solution path recorded in replay bundles
+    mode = "decompose" if decompose else "reoptimize" if reoptimize else "full"
     # get input data
     df_entsoe = get_entsoe_data(country=country, start=start, end=end, fn=fn_entsoe)
     df_entsoe["renewable"] = df_entsoe[renewable]
+    # datetime index of the periods in the order of the time set
+    periods = get_calendar(df_entsoe)
+    model_periods = periods
+    # the model is homogeneous in demand, generation, and storage size. It can
+    # be solved in normalized units and results are rescaled
+    solve_normalized = solve_normalized or normalized
+    if solve_normalized:
+        if total_demand is None:
+            total_demand = df_entsoe["demand"].sum()
+        model_demand = get_normalized_demand(len(periods))
+    else:
+        model_demand = total_demand
+    if resolution > 1:
+        df_entsoe = aggregate_time(df_entsoe, hours=resolution)
+        model_periods = get_calendar(df_entsoe)
 
     # perform simulations
     lst_df = []
@@ -232,39 +518,99 @@ def simulate(
             print(f"\t---- Simulations for generation share: {s_gen}")
             for s_sto in share_storage:
                 print(f"\t---- Simulations for storage share: {s_sto}")
-                for c_cur in cost_curtailment:
+                # with re-optimization all costs of curtailment share one build
+                if reoptimize:
+                    cost_groups = [cost_curtailment]
+                else:
+                    cost_groups = [[c_cur] for c_cur in cost_curtailment]
+                for c_cur, *c_reopt in cost_groups:
                     gdx = create_inputs(
                         df_entsoe,
                         share_generation=s_gen,
                         share_renewable=s_ren,
                         share_storage=s_sto,
                         cost_curtailment=c_cur,
-                        total_demand=total_demand,
+                        total_demand=model_demand,
                     )
-                    model = GamsModel()
-                    model.add_database(container=gdx, in_model_name="data")
+                    # solver log kept for the replay bundles
+                    log = io.StringIO() if dir_replay is not None else None
+                    failed = False
                     try:
-                        sol = model.run(output=None)
-                        # check solution statistics
-                        stats = sol["stats"].records.set_index("uni")["value"].to_dict()
-                        assert (
-                            stats["modelstat"] <= 2
-                        ), f"Model did not solve correctly: {stats}"
-                        assert (
-                            stats["solvestat"] == 1
-                        ), f"Model did not solve correctly: {stats}"
-                    except:
+                        if decompose:
+                            # imported here as decomposition builds on this module
+                            from .decomposition import solve_decomposed
+
+                            try:
+                                df_sol = solve_decomposed(
+                                    gdx,
+                                    index=model_periods,
+                                    max_workers=max_workers,
+                                    profile=profile,
+                                )
+                            except ValueError as e:
+                                # stitched solution failed the optimality check
+                                print(f"Solving full model instead: {e}")
+                                df_sol = extract_solution(
+                                    solve_model(gdx, profile=profile, output=log),
+                                    index=model_periods,
+                                )
+                            lst_sol = [df_sol]
+                        elif reoptimize:
+                            lst_sol = [
+                                extract_solution(sol, index=model_periods)
+                                for sol in solve_lexicographic(
+                                    gdx, c_reopt, profile=profile, output=log
+                                )
+                            ]
+                        else:
+                            lst_sol = [
+                                extract_solution(
+                                    solve_model(gdx, profile=profile, output=log),
+                                    index=model_periods,
+                                )
+                            ]
+                    except Exception as e:
                         print(
-                            f"Problems in solving with specification (share gen, ren, sto, cost curtailment): {s_gen}, {s_ren}, {s_sto}, {c_cur}"
+                            f"Problems in solving with specification (share gen, ren, sto, cost curtailment): {s_gen}, {s_ren}, {s_sto}, {[c_cur] + c_reopt}: {e}"
                         )
+                        failed = True
+                    if dir_replay is not None and (
+                        failed
+                        or replay_scenarios == "all"
+                        or (
+                            replay_scenarios is not None
+                            and any(
+                                np.allclose((s_gen, s_ren, s_sto), shares)
+                                for shares in replay_scenarios
+                            )
+                        )
+                    ):
+                        # imported here as replay builds on this module
+                        from .replay import export_bundle, get_bundle_name
+
+                        dir_bundle = export_bundle(
+                            gdx,
+                            os.path.join(
+                                dir_replay, get_bundle_name(get_scenario(gdx))
+                            ),
+                            profile=profile,
+                            mode=mode,
+                            cost_reoptimize=c_reopt,
+                            log=log.getvalue(),
+                        )
+                        print(f"Inputs exported to {dir_bundle}")
+                    if failed:
                         continue
-                    lst_df.append(extract_solution(sol))
-    df = (
-        pd.concat(lst_df)
-        .reset_index()
-        .assign(date=lambda df: pd.to_datetime(df["t"]))
-        .drop("t", axis=1)
-    )
+                    for df_sol in lst_sol:
+                        if resolution > 1:
+                            df_sol = expand_solution(
+                                df_sol, periods=periods, hours=resolution
+                            )
+                        if solve_normalized and not normalized:
+                            df_sol = rescale_results(df_sol, total_demand)
+                        lst_df.append(df_sol)
+    df = pd.concat(lst_df)
+    df = df.assign(date=df.index).reset_index(drop=True)
     if fn_out is not None:
         df.to_parquet(fn_out, index=False)
     return df
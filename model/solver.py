@@ -0,0 +1,191 @@
+import json
+import os
+import random
+import time
+from typing import Any
+import pandas as pd
+
+# named solver settings. "options" are gams options, "solver_options" are
+# written to the option file of the solver in the workspace
+SOLVER_PROFILES: dict[str, dict[str, Any]] = {
+    "default": {"solver": None, "options": {}, "solver_options": {}},
+    "dual": {
+        "solver": "cplex",
+        "options": {"threads": 1},
+        "solver_options": {"lpmethod": 2},
+    },
+    "barrier": {
+        "solver": "cplex",
+        "options": {"threads": 0},
+        "solver_options": {"lpmethod": 4, "barcrossalg": -1, "baralg": 0},
+    },
+    "barrier_crossover": {
+        "solver": "cplex",
+        "options": {"threads": 0},
+        "solver_options": {"lpmethod": 4},
+    },
+    "concurrent": {
+        "solver": "cplex",
+        "options": {"threads": 0},
+        "solver_options": {"lpmethod": 6},
+    },
+    "network": {
+        "solver": "cplex",
+        "options": {"threads": 1},
+        "solver_options": {"lpmethod": 3},
+    },
+    "dual_loose": {
+        "solver": "cplex",
+        "options": {"threads": 1},
+        "solver_options": {"lpmethod": 2, "epopt": 1e-5, "eprhs": 1e-5},
+    },
+}
+
+
+def get_solver_profile(profile: str | dict[str, Any] | None) -> dict[str, Any]:
+    """Get solver settings of a profile
+
+    Args:
+        profile: name of the profile in SOLVER_PROFILES, or dictionary with the
+            keys solver, options, and solver_options. If empty, the default
+            profile is used
+
+    Returns:
+        dictionary with the keys solver, options, and solver_options. If solver
+        is None, the default LP solver of gams is used
+    """
+    if profile is None:
+        profile = "default"
+    if isinstance(profile, str):
+        if profile not in SOLVER_PROFILES:
+            raise KeyError(
+                f"Unknown solver profile {profile}. Use one of {list(SOLVER_PROFILES)}"
+            )
+        profile = SOLVER_PROFILES[profile]
+    return {
+        "solver": profile.get("solver"),
+        "options": dict(profile.get("options", {})),
+        "solver_options": dict(profile.get("solver_options", {})),
+    }
+
+
+def write_option_file(
+    working_directory: str, solver: str, solver_options: dict[str, Any]
+) -> str:
+    """Write solver option file into the workspace
+
+    Args:
+        working_directory: working directory of the gams workspace
+        solver: name of the solver, determines the name of the file
+        solver_options: options written to the file
+
+    Returns:
+        name of the option file
+    """
+    fn = os.path.join(working_directory, f"{solver.lower()}.opt")
+    with open(fn, "w") as f:
+        for k, v in solver_options.items():
+            f.write(f"{k} {v}\n")
+    return fn
+
+
+def load_tuned_profile(fn: str) -> str:
+    """Get name of the fastest profile recorded by autotune
+
+    Args:
+        fn: name of the json file written by autotune
+    """
+    with open(fn) as f:
+        return json.load(f)["profile"]
+
+
+def autotune(
+    share_generation: list[float],
+    share_renewable: list[float],
+    share_storage: list[float],
+    cost_curtailment: list[dict[str, float]] = [{"nuclear": 1, "renewable": 0}],
+    total_demand: float | None = None,
+    country: str = "DE",
+    start: str = "2017/01/01 00:00",
+    end: str = "2017/12/31 23",
+    renewable: str = "windOnshore",
+    fn_entsoe: str | None = None,
+    profiles: list[str] | None = None,
+    n_sample: int = 5,
+    seed: int = 0,
+    fn_out: str | None = None,
+) -> pd.DataFrame:
+    """Time solver profiles on a random sample of the scenario grid and record
+    the fastest one. Scenarios failing for a profile count with infinite time.
+
+    Args:
+        share_generation: list of multiplier used to derive total generation as multiple
+            of total demand
+        share_renewable: list of Share of renewable in total generation
+        share_storage: list of Storage size as share of total demand
+        cost_curtailment: list of Cost of curtailment by technology
+        total_demand: If provided demand will be normalized to the given number
+        country: name of the country as letter ENTSOE code
+        start: first hour to be included
+        end: last hour to be included
+        renewable: name of renewable source for profile
+        fn_entsoe: name of parquet file with input data. If empty, standard one is used.
+        profiles: names of profiles to compare. If empty, all profiles are used
+        n_sample: number of scenarios solved for each profile
+        seed: seed used to draw the sample
+        fn_out: name of json file to record the fastest profile and timings
+
+    Returns:
+        frame with solution time by scenario and profile
+    """
+    from .simulation import create_inputs, get_entsoe_data, solve_model
+
+    df_entsoe = get_entsoe_data(country=country, start=start, end=end, fn=fn_entsoe)
+    df_entsoe["renewable"] = df_entsoe[renewable]
+    grid = [
+        (s_gen, s_ren, s_sto, c_cur)
+        for s_gen in share_generation
+        for s_ren in share_renewable
+        for s_sto in share_storage
+        for c_cur in cost_curtailment
+    ]
+    sample = random.Random(seed).sample(grid, min(n_sample, len(grid)))
+
+    timings = []
+    for s_gen, s_ren, s_sto, c_cur in sample:
+        gdx = create_inputs(
+            df_entsoe,
+            share_generation=s_gen,
+            share_renewable=s_ren,
+            share_storage=s_sto,
+            cost_curtailment=c_cur,
+            total_demand=total_demand,
+        )
+        for profile in profiles or list(SOLVER_PROFILES):
+            start_time = time.perf_counter()
+            try:
+                solve_model(gdx, profile=profile)
+                seconds = time.perf_counter() - start_time
+            except Exception as e:
+                print(f"Profile {profile} failed: {e}")
+                seconds = float("inf")
+            timings.append(
+                {
+                    "profile": profile,
+                    "share_generation": s_gen,
+                    "share_renewable": s_ren,
+                    "share_storage": s_sto,
+                    "costCurtailNuclear": c_cur.get("nuclear", 0),
+                    "costCurtailRenewable": c_cur.get("renewable", 0),
+                    "seconds": seconds,
+                }
+            )
+    df = pd.DataFrame(timings)
+    total = df.groupby("profile")["seconds"].sum().sort_values()
+    print(f"Solution time by profile [s]:\n{total}")
+    if fn_out is not None:
+        with open(fn_out, "w") as f:
+            json.dump(
+                {"profile": total.index[0], "seconds": total.to_dict()}, f, indent=2
+            )
+    return df
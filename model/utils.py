@@ -4,8 +4,7 @@ import os
 def get_temp_dir() -> str:
     """Get path to tempory directory. If not exists will be created"""
     temp_dir = os.path.join(os.getcwd(), "_temp")
-    if not os.path.exists(temp_dir):
-        os.makedirs(temp_dir)
+    os.makedirs(temp_dir, exist_ok=True)
     return temp_dir
 
 
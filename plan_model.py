@@ -0,0 +1,23 @@
+from model import plan_sweep
+import numpy as np
+
+if __name__ == "__main__":
+    plan = plan_sweep(
+        share_generation=np.arange(1, 1.25, 0.05),
+        share_renewable=np.arange(0, 1.1, 0.1),
+        share_storage=np.arange(0, 0.00011, 0.00001),
+        cost_curtailment=[
+            {"nuclear": 1, "renewable": 0},
+            {"nuclear": 0, "renewable": 1},
+        ],
+        total_demand=100,
+        country="DE",
+        start="2017/06/01 00:00",
+        end="2018/05/31 23:00",
+        workers=1,
+        max_hours=12,
+        max_memory=16 * 2**30,
+        max_output=10 * 2**30,
+        refuse=True,
+    )
+    print("Finished!")
@@ -0,0 +1,28 @@
+from model import replay_bundle
+import argparse
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Solve a scenario exported by export_bundle again"
+    )
+    parser.add_argument("bundle", help="directory of the bundle")
+    parser.add_argument(
+        "--profiler",
+        choices=["cprofile", "sampling", "memory"],
+        default=None,
+        help="profiler used for the solve",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.001,
+        help="time between two samples of the sampling profiler [s]",
+    )
+    parser.add_argument("--out", default=None, help="directory of the output files")
+    args = parser.parse_args()
+    res = replay_bundle(
+        args.bundle, profiler=args.profiler, interval=args.interval, dir_out=args.out
+    )
+    print(f"Time taken: {res['seconds']}")
+    print(f"Status: {res['status']}")
+    print(f"Files: {res['files']}")
@@ -0,0 +1,11 @@
+from dashboard.service import ResultsService
+import asyncio
+
+
+if __name__ == "__main__":
+    fn_results = "./data/results.parquet"
+    host = "127.0.0.1"
+    port = 8510
+    service = ResultsService(fn_results)
+    print(f"Serving {fn_results} on http://{host}:{port}")
+    asyncio.run(service.serve(host=host, port=port))
@@ -0,0 +1,61 @@
+import itertools
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def make_results(hours: int = 24, seed: int = 0) -> pd.DataFrame:
+    """Get random hourly results in the layout of simulate on a small grid"""
+    rng = np.random.default_rng(seed)
+    measures = [
+        "nuclear",
+        "renewable",
+        "netStorage",
+        "demand",
+        "energyNotServed",
+        "storageLevel",
+        "curtailNuclear",
+        "curtailRenewable",
+    ]
+    lst_df = []
+    for s_gen, s_ren, s_sto, cost in itertools.product(
+        [1.0, 1.5], [0.0, 0.5, 1.0], [0.0, 0.1], [(1.0, 0.0), (0.0, 1.0)]
+    ):
+        df = pd.DataFrame(rng.random((hours, len(measures))), columns=measures)
+        lst_df.append(
+            df.assign(
+                demand=1 / hours,
+                share_generation=s_gen,
+                share_renewable=s_ren,
+                share_storage=s_sto,
+                costCurtailNuclear=cost[0],
+                costCurtailRenewable=cost[1],
+                date=pd.date_range("2017-06-01", periods=hours, freq="h"),
+            )
+        )
+    return pd.concat(lst_df).reset_index(drop=True)
+
+
+@pytest.fixture
+def fn_results(tmp_path) -> str:
+    fn = str(tmp_path / "results.parquet")
+    make_results().to_parquet(fn, index=False)
+    return fn
+
+
+@pytest.fixture
+def fn_entsoe(tmp_path) -> str:
+    """Get file with random ENTSOE input data of January 2017 for DE"""
+    rng = np.random.default_rng(0)
+    hours = pd.date_range("2017-01-01", "2017-01-31 23:00", freq="h")
+    fn = str(tmp_path / "entsoe.parquet")
+    pd.DataFrame(
+        {
+            "country": "DE",
+            "dateTime": hours,
+            "demand": 50000 + 10000 * rng.random(len(hours)),
+            "windOnshore": 20000 * rng.random(len(hours)) ** 2,
+            "solar": 0.0,
+        }
+    ).to_parquet(fn, index=False)
+    return fn
@@ -0,0 +1,74 @@
+"""Reference implementation of the LP in model/model.gms with scipy. Used to
+check closed form shortcuts and re-optimizations without the gams api."""
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.optimize import linprog
+
+
+def solve_reference(
+    demand: np.ndarray,
+    pot_nuclear: np.ndarray,
+    pot_renewable: np.ndarray,
+    max_storage: float,
+    cost_curtailment: dict[str, float],
+    max_ens: float | None = None,
+) -> dict[str, np.ndarray]:
+    """Solve the cyclic model of model.gms including the storage level in the
+    energy balance
+
+    Args:
+        demand: demand by hour
+        pot_nuclear: potential nuclear generation by hour
+        pot_renewable: potential renewable generation by hour
+        max_storage: storage size
+        cost_curtailment: cost of curtailment by technology
+        max_ens: optional cap on total energy-not-served
+
+    Returns:
+        hourly levels of energyNotServed, curtailNuclear, curtailRenewable,
+        and storageLevel
+    """
+    n = len(demand)
+    eye = sp.identity(n, format="csr")
+    # variables: nuclear, renewable, storage level, injection, release, ens
+    cost = np.concatenate(
+        [
+            -cost_curtailment.get("nuclear", 0) * np.ones(n),
+            -cost_curtailment.get("renewable", 0) * np.ones(n),
+            np.zeros(3 * n),
+            np.ones(n),
+        ]
+    )
+    zero = sp.csr_matrix((n, n))
+    # storage level of the previous period with wrap around
+    previous = sp.csr_matrix(np.roll(np.identity(n), -1, axis=1))
+    mkt = sp.hstack([eye, eye, eye, zero, zero, eye])
+    lom = sp.hstack([zero, zero, previous - eye, eye, -eye, zero])
+    a_ub, b_ub = None, None
+    if max_ens is not None:
+        a_ub = sp.hstack([sp.csr_matrix((1, 5 * n)), np.ones((1, n))])
+        b_ub = [max_ens]
+    bounds = (
+        [(0, p) for p in pot_nuclear]
+        + [(0, p) for p in pot_renewable]
+        + [(0, max_storage)] * n
+        + [(0, None)] * (3 * n)
+    )
+    res = linprog(
+        cost,
+        A_ub=a_ub,
+        b_ub=b_ub,
+        A_eq=sp.vstack([mkt, lom]),
+        b_eq=np.concatenate([demand, np.zeros(n)]),
+        bounds=bounds,
+        method="highs",
+    )
+    assert res.status == 0, res.message
+    x = res.x.reshape(6, n)
+    return {
+        "energyNotServed": x[5],
+        "curtailNuclear": pot_nuclear - x[0],
+        "curtailRenewable": pot_renewable - x[1],
+        "storageLevel": x[2],
+    }
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+from model.aggregation import (
+    ENERGY_COLUMNS,
+    SCENARIO_COLUMNS,
+    aggregate_time,
+    expand_solution,
+    get_aggregation_error,
+)
+from conftest import make_results
+
+
+@pytest.mark.parametrize("hours", [1, 4, 5])
+def test_aggregate_time(hours):
+    data = pd.DataFrame(
+        {
+            "dateTime": pd.date_range("2017-01-01", periods=24, freq="h"),
+            "demand": np.arange(24.0),
+            "renewable": np.ones(24),
+        }
+    )
+    df = aggregate_time(data, hours=hours)
+    assert len(df) == -(-24 // hours)
+    assert df["hours"].sum() == 24
+    cols = ["demand", "renewable"]
+    assert np.allclose(df[cols].sum(), data[cols].sum())
+    # each period starts at its first hour
+    assert (df["dateTime"] == data["dateTime"].iloc[::hours].to_numpy()).all()
+
+
+@pytest.mark.parametrize("hours", [1, 4, 5])
+def test_expand_solution(hours):
+    df_hourly = make_results().query(
+        "share_generation == 1 and share_renewable == 0.5 and share_storage == 0.1"
+        " and costCurtailNuclear == 1"
+    )
+    periods = pd.DatetimeIndex(df_hourly["date"])
+    # aggregate energy as the model does, states are taken from the first hour
+    df_agg = aggregate_time(df_hourly.drop("date", axis=1), hours=hours).drop(
+        "hours", axis=1
+    )
+    df_agg[SCENARIO_COLUMNS + ["storageLevel"]] = (
+        df_hourly[SCENARIO_COLUMNS + ["storageLevel"]].iloc[::hours].to_numpy()
+    )
+    df = expand_solution(df_agg, periods, hours=hours)
+    assert (df.index == periods).all()
+    assert np.allclose(df[ENERGY_COLUMNS].sum(), df_hourly[ENERGY_COLUMNS].sum())
+    # energy is distributed uniformly within each period
+    block = np.arange(len(periods)) // hours
+    assert np.allclose(df.groupby(block)["nuclear"].std(ddof=0), 0)
+    assert (df[SCENARIO_COLUMNS] == df_hourly[SCENARIO_COLUMNS].iloc[0]).all().all()
+    if hours == 1:
+        assert np.allclose(df[ENERGY_COLUMNS], df_hourly[ENERGY_COLUMNS])
+
+
+def test_aggregation_error():
+    df_full = make_results()
+    assert np.allclose(get_aggregation_error(df_full, df_full)[ENERGY_COLUMNS], 0)
+    # energy-not-served of one scenario is increased by 10% of demand, the
+    # specification of the aggregated results is off by rounding only
+    df_agg = df_full.copy()
+    scenario = (
+        (df_agg["share_renewable"] == 0.5)
+        & (df_agg["share_storage"] == 0.1)
+        & (df_agg["share_generation"] == 1.5)
+        & (df_agg["costCurtailNuclear"] == 1)
+    )
+    df_agg.loc[scenario, "energyNotServed"] += df_agg.loc[scenario, "demand"] * 0.1
+    df_agg["share_renewable"] += 1e-12
+    error = get_aggregation_error(df_full, df_agg)
+    assert len(error) == df_full.groupby(SCENARIO_COLUMNS).ngroups
+    is_scenario = (
+        (error["share_renewable"] == 0.5)
+        & (error["share_storage"] == 0.1)
+        & (error["share_generation"] == 1.5)
+        & (error["costCurtailNuclear"] == 1)
+    )
+    assert np.allclose(error.loc[is_scenario, "energyNotServedPercent"], 10)
+    assert np.allclose(error.loc[is_scenario, "energyNotServed"], 0.1)
+    assert np.allclose(error.loc[~is_scenario, ENERGY_COLUMNS], 0)
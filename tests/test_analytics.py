@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+from dashboard.analytics import (
+    get_duration_curve,
+    get_physical_storage_size,
+    get_residual_load,
+    get_residual_statistics,
+    get_window_deficit,
+)
+from dashboard.data import normalize_generation
+
+HOURS = 48
+
+
+@pytest.fixture
+def df_generation() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "Demand": 1 + rng.random(HOURS),
+            "Wind": rng.random(HOURS),
+            "Solar": np.maximum(np.sin(np.arange(HOURS) / 24 * 2 * np.pi), 0),
+        },
+        index=pd.date_range("2017-06-01", periods=HOURS, freq="h", name="dateTime"),
+    )
+
+
+@pytest.fixture
+def shares() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Wind": [0.2, 0.5, 0.0, 0.6],
+            "Solar": [0.1, 0.3, 0.0, 0.6],
+            "Baseload": [0.5, 0.3, 0.0, 0.0],
+        }
+    )
+
+
+@pytest.mark.parametrize("total_demand", [0, 1000])
+def test_residual_load(df_generation, shares, total_demand):
+    residual = get_residual_load(df_generation, shares, total_demand=total_demand)
+    assert residual.shape == (HOURS, len(shares))
+    for k, row in shares.iterrows():
+        df = normalize_generation(df_generation, row.to_dict(), total_demand)
+        supply = df[list(shares.columns)].sum(axis=1)
+        assert np.allclose(residual[:, k], df["Demand"] - supply)
+
+
+def brute_force_window_deficit(residual, window):
+    window = min(window, len(residual))
+    starts = range(len(residual) - window + 1)
+    return max([0] + [residual[start : start + window].sum() for start in starts])
+
+
+def brute_force_storage_size(residual):
+    if residual.sum() > 0:
+        return np.inf
+    n = len(residual)
+    cyclic = np.concatenate([residual, residual])
+    return max(
+        [0]
+        + [
+            cyclic[start : start + length].sum()
+            for start in range(n)
+            for length in range(1, n + 1)
+        ]
+    )
+
+
+def test_residual_statistics(df_generation, shares):
+    residual = get_residual_load(df_generation, shares)
+    df_stats = get_residual_statistics(df_generation, shares, windows=[1, 24, 100])
+    for k in range(len(shares)):
+        assert np.isclose(df_stats.loc[k, "PeakResidual"], residual[:, k].max())
+        assert df_stats.loc[k, "HoursDeficit"] == (residual[:, k] > 0).sum()
+        assert np.isclose(
+            df_stats.loc[k, "ExcessDemand"] - df_stats.loc[k, "ExcessSupply"],
+            residual[:, k].sum(),
+        )
+        for w in [1, 24, 100]:
+            assert np.isclose(
+                df_stats.loc[k, f"MaxDeficit{w}h"],
+                brute_force_window_deficit(residual[:, k], w),
+            )
+        assert np.isclose(
+            df_stats.loc[k, "PhysicalStorageSize"],
+            brute_force_storage_size(residual[:, k]),
+        )
+    # without generation, demand is never met
+    assert np.isinf(df_stats.loc[2, "PhysicalStorageSize"])
+    assert np.isfinite(df_stats.loc[3, "PhysicalStorageSize"])
+
+
+def test_duration_curve():
+    residual = np.array([[1.0, -2.0], [3.0, 0.0], [2.0, 5.0]])
+    curve = get_duration_curve(residual)
+    assert np.array_equal(curve, [[3.0, 5.0], [2.0, 0.0], [1.0, -2.0]])
+    assert np.array_equal(get_window_deficit(-residual, 2), [0.0, 2.0])
+    assert np.isinf(get_physical_storage_size(residual)).all()
@@ -0,0 +1,46 @@
+import os
+import pandas as pd
+import pytest
+from dashboard.catalog import write_atomic
+from dashboard.data import get_annual_results_file, load_annual_results
+
+
+def test_write_atomic_keeps_file_on_error(tmp_path):
+    fn = tmp_path / "stats.parquet"
+    fn.write_text("old")
+
+    def write(fn_tmp):
+        with open(fn_tmp, "w") as f:
+            f.write("partial")
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        write_atomic(str(fn), write)
+    assert fn.read_text() == "old"
+    assert os.listdir(tmp_path) == ["stats.parquet"]
+
+
+def test_load_annual_results(tmp_path):
+    fn_results = str(tmp_path / "results.parquet")
+    pd.DataFrame(
+        {
+            "share_storage": [0.0, 0.0],
+            "share_generation": [1.1, 1.1],
+            "share_renewable": [0.5, 0.5],
+            "costCurtailNuclear": [1.0, 1.0],
+            "costCurtailRenewable": [0.0, 0.0],
+            "nuclear": [1.0, 2.0],
+            "renewable": [1.0, 1.0],
+            "netStorage": [0.0, 0.0],
+            "demand": [2.0, 3.0],
+            "energyNotServed": [0.0, 0.0],
+            "curtailNuclear": [0.0, 0.0],
+            "curtailRenewable": [0.0, 0.0],
+        }
+    ).to_parquet(fn_results)
+    tbl = load_annual_results(fn_results)
+    assert tbl["demand"].to_pylist() == [5.0]
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        ["results.parquet", os.path.basename(get_annual_results_file(fn_results))]
+    )
+    assert load_annual_results(fn_results).equals(tbl)
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+from dashboard.cube import build_results_cube
+from dashboard.data import get_total_results
+
+UNIT_COST = dict(cost_res=2.0, cost_nuc=1.0, cost_sto=10.0, cost_ens=10.0)
+
+
+def get_pivot(df_annual, variable, share_generation, curtail_res_first):
+    return (
+        df_annual[
+            (df_annual["share_generation"] == share_generation)
+            & (df_annual["curtailRenewableFirst"] == curtail_res_first)
+        ]
+        .pivot(index="share_storage", columns="share_renewable", values=variable)
+        .astype(float)
+    )
+
+
+@pytest.mark.parametrize("curtail_res_first", [True, False])
+@pytest.mark.parametrize("variable", ["nuclear", "curtailRenewablePercent"])
+def test_surface_equals_pivot(fn_results, variable, curtail_res_first):
+    df_annual = get_total_results(fn_results)
+    cube = build_results_cube(df_annual)
+    pd.testing.assert_frame_equal(
+        cube.get_surface(variable, 1.5, curtail_res_first),
+        get_pivot(df_annual, variable, 1.5, curtail_res_first),
+        check_names=False,
+    )
+
+
+def test_cost_surface_equals_pivot(fn_results):
+    df_annual = get_total_results(fn_results).assign(
+        cost=lambda df: UNIT_COST["cost_res"]
+        * (df["renewable"] + df["curtailRenewable"])
+        + UNIT_COST["cost_nuc"] * (df["nuclear"] + df["curtailNuclear"])
+        + UNIT_COST["cost_sto"] * df["demand"] * df["share_storage"]
+        + UNIT_COST["cost_ens"] * df["energyNotServed"]
+    )
+    cube = build_results_cube(df_annual)
+    pd.testing.assert_frame_equal(
+        cube.get_surface("cost", 1.0, True, **UNIT_COST),
+        get_pivot(df_annual, "cost", 1.0, True),
+        check_names=False,
+    )
+
+
+def test_missing_scenarios(fn_results):
+    df_annual = get_total_results(fn_results)
+    missing = (df_annual["share_storage"] > 0) & (df_annual["share_renewable"] == 1)
+    cube = build_results_cube(df_annual[~missing])
+    df_surface = cube.get_surface("nuclear", 1.0, True)
+    assert np.isnan(df_surface.loc[0.1, 1.0])
+    assert df_surface.drop(columns=1.0).notna().all().all()
+    with pytest.raises(KeyError):
+        cube.get_surface("nuclear", 2.0, True)
+
+
+def test_rescale(fn_results):
+    cube = build_results_cube(get_total_results(fn_results))
+    cube_scaled = cube.rescale(250.0)
+    assert np.allclose(cube_scaled.measures["demand"], 250)
+    assert np.allclose(
+        cube_scaled.get_cost(**UNIT_COST), cube.get_cost(**UNIT_COST) * 250
+    )
+    assert np.allclose(
+        cube_scaled.measures["curtailNuclearPercent"],
+        cube.measures["curtailNuclearPercent"],
+    )
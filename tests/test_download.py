@@ -0,0 +1,155 @@
+import hashlib
+import http.server
+import io
+import threading
+import numpy as np
+import pytest
+from dashboard.data import download_data, get_results_cube, get_total_results
+from conftest import make_results
+
+CONTENT = bytes(range(256)) * 64
+ETAG = '"v1"'
+
+
+class RangeHandler(http.server.BaseHTTPRequestHandler):
+    """Serve CONTENT with support for Range and If-Range"""
+
+    content = CONTENT
+    etag = ETAG
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(dict(self.headers))
+        size = len(self.content)
+        start = None
+        if "Range" in self.headers and self.headers.get("If-Range") == self.etag:
+            start = int(self.headers["Range"].removeprefix("bytes=").split("-")[0])
+        if start is not None and start >= size:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = self.content if start is None else self.content[start:]
+        if start is None:
+            self.send_response(200)
+        else:
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{size - 1}/{size}")
+        self.send_header("ETag", self.etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    RangeHandler.content, RangeHandler.etag = CONTENT, ETAG
+    RangeHandler.requests = []
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}/data.parquet"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def write_part(fn_out, content, validator=ETAG):
+    with open(f"{fn_out}.part", "wb") as f:
+        f.write(content)
+    if validator is not None:
+        with open(f"{fn_out}.part.validator", "w") as f:
+            f.write(validator)
+
+
+def read(fn):
+    with open(fn, "rb") as f:
+        return f.read()
+
+
+CHECKSUM = hashlib.sha256(CONTENT).hexdigest()
+
+
+def test_download(server, tmp_path):
+    fn_out = str(tmp_path / "results.parquet")
+    assert download_data(server, fn_out, checksum=CHECKSUM)
+    assert read(fn_out) == CONTENT
+    assert not (tmp_path / "results.parquet.part").exists()
+    assert not (tmp_path / "results.parquet.part.validator").exists()
+
+
+def test_resume(server, tmp_path):
+    fn_out = str(tmp_path / "results.parquet")
+    write_part(fn_out, CONTENT[:1000])
+    download_data(server, fn_out, checksum=CHECKSUM)
+    assert read(fn_out) == CONTENT
+    assert RangeHandler.requests[0]["Range"] == "bytes=1000-"
+    assert RangeHandler.requests[0]["If-Range"] == ETAG
+
+
+def test_resume_without_validator(server, tmp_path):
+    fn_out = str(tmp_path / "results.parquet")
+    write_part(fn_out, b"x" * 1000, validator=None)
+    download_data(server, fn_out, checksum=CHECKSUM)
+    assert read(fn_out) == CONTENT
+    assert "Range" not in RangeHandler.requests[0]
+
+
+def test_restart_on_changed_file(server, tmp_path):
+    # the partial file belongs to an older version of the file
+    fn_out = str(tmp_path / "results.parquet")
+    write_part(fn_out, b"x" * 1000, validator='"v0"')
+    download_data(server, fn_out, checksum=CHECKSUM)
+    assert read(fn_out) == CONTENT
+    assert len(RangeHandler.requests) == 1
+
+
+def test_complete_part(server, tmp_path):
+    fn_out = str(tmp_path / "results.parquet")
+    write_part(fn_out, CONTENT)
+    download_data(server, fn_out, checksum=CHECKSUM)
+    assert read(fn_out) == CONTENT
+    assert len(RangeHandler.requests) == 1
+
+
+@pytest.mark.parametrize("checksum", [None, CHECKSUM])
+def test_invalid_complete_part(server, tmp_path, checksum):
+    # a complete partial file is only used if size and checksum match
+    fn_out = str(tmp_path / "results.parquet")
+    write_part(fn_out, b"x" * len(CONTENT))
+    download_data(server, fn_out, checksum=checksum)
+    assert read(fn_out) == CONTENT
+    assert len(RangeHandler.requests) == 2
+    assert "Range" not in RangeHandler.requests[1]
+
+
+def test_checksum_mismatch(server, tmp_path):
+    fn_out = str(tmp_path / "results.parquet")
+    with pytest.raises(ValueError):
+        download_data(server, fn_out, checksum="0" * 64)
+    assert not (tmp_path / "results.parquet").exists()
+    assert not (tmp_path / "results.parquet.part").exists()
+
+
+def test_cached_results_follow_file(server, tmp_path, fn_results):
+    # results of another file are cached as well
+    fn_other = str(tmp_path / "other.parquet")
+    make_results(seed=2).to_parquet(fn_other, index=False)
+    cube_other = get_results_cube(fn_other)
+    df_old = get_total_results(fn_results)
+
+    buffer = io.BytesIO()
+    make_results(seed=1).to_parquet(buffer, index=False)
+    RangeHandler.content = buffer.getvalue()
+    download_data(server, fn_results)
+    df_new = get_total_results(fn_results)
+    assert not np.allclose(df_new["nuclear"], df_old["nuclear"])
+    assert np.isclose(
+        np.nansum(get_results_cube(fn_results).measures["nuclear"]),
+        df_new["nuclear"].sum(),
+    )
+    # cached results of the other file are kept
+    assert get_results_cube(fn_other) is cube_other
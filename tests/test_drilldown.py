@@ -0,0 +1,30 @@
+from dashboard.data import _get_scenario_table, get_results_cube
+from dashboard.drilldown import (
+    DRILLDOWN_COLUMNS,
+    get_neighbours,
+    load_scenario,
+    prefetch_neighbours,
+)
+
+
+def test_prefetch_is_served_from_cache(fn_results):
+    cube = get_results_cube(fn_results)
+    scenario = dict(
+        share_generation=cube.share_generation[0],
+        share_storage=cube.share_storage[0],
+        share_renewable=cube.share_renewable[1],
+        curtail_res_first=True,
+    )
+    _get_scenario_table.cache_clear()
+    for future in prefetch_neighbours(
+        fn_results, cube, columns=DRILLDOWN_COLUMNS, **scenario
+    ):
+        future.result()
+    share_storage, share_renewable = get_neighbours(
+        cube, scenario["share_storage"], scenario["share_renewable"]
+    )[0]
+    # selecting the neighbour in the panel as in hourly_drilldown
+    scenario.update(share_storage=share_storage, share_renewable=share_renewable)
+    tbl = load_scenario(fn_results, columns=DRILLDOWN_COLUMNS, **scenario)
+    assert tbl.num_rows == 24
+    assert _get_scenario_table.cache_info().hits == 1
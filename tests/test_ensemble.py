@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+from model.ensemble import ENSEMBLE_MEASURES, screen_scenarios
+from reference_lp import solve_reference
+
+
+def get_samples(n_samples: int = 6, hours: int = 72, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    demand = 1 + rng.random((n_samples, hours))
+    renewable = rng.random((n_samples, hours)) ** 3
+    return np.stack([demand, renewable], axis=-1)
+
+
+def solve_screened(samples, pos, s_gen, s_ren, s_sto, c_cur):
+    demand, renewable = samples[pos, :, 0], samples[pos, :, 1]
+    total = demand.sum()
+    res = solve_reference(
+        demand,
+        np.full(len(demand), s_gen * total * (1 - s_ren) / len(demand)),
+        renewable / renewable.sum() * s_gen * total * s_ren,
+        s_sto * total,
+        c_cur,
+    )
+    return {m: res[m].sum() for m in ENSEMBLE_MEASURES}
+
+
+@pytest.mark.parametrize("s_gen", [0.9, 1.1, 1.6])
+@pytest.mark.parametrize("s_sto", [0, 0.05])
+@pytest.mark.parametrize(
+    "c_cur", [{"nuclear": 1, "renewable": 0}, {"nuclear": 0, "renewable": 1}]
+)
+def test_screen_matches_model(s_gen, s_sto, c_cur):
+    samples = get_samples()
+    screen = screen_scenarios(samples, s_gen, 0.5, c_cur)
+    for pos in range(len(samples)):
+        if screen["storageMatters"][pos] and s_sto > 0:
+            continue
+        res = solve_screened(samples, pos, s_gen, 0.5, s_sto, c_cur)
+        for m in ENSEMBLE_MEASURES:
+            assert res[m] == pytest.approx(screen[m][pos], abs=1e-6)
+
+
+def test_storage_matters_with_deficit_only():
+    # generation never exceeds demand, the storage level still lowers
+    # energy-not-served as it enters the energy balance of model.gms
+    samples = get_samples(n_samples=2)
+    screen = screen_scenarios(samples, 0.5, 0.0, {"nuclear": 1, "renewable": 0})
+    assert screen["storageMatters"].all()
+    res = solve_screened(samples, 0, 0.5, 0.0, 0.05, {"nuclear": 1, "renewable": 0})
+    assert res["energyNotServed"] < screen["energyNotServed"][0] - 1e-6
+
+
+def test_failed_solves_are_kept(monkeypatch):
+    pytest.importorskip("gams")
+    import pandas as pd
+    from model import ensemble, simulation
+
+    hours = pd.date_range("2017-01-01", periods=24 * 28, freq="h")
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(
+        {
+            "dateTime": hours,
+            "demand": 1 + rng.random(len(hours)),
+            "windOnshore": rng.random(len(hours)),
+        }
+    )
+    monkeypatch.setattr(simulation, "get_entsoe_data", lambda **kwargs: data)
+    calls = []
+
+    def solve_sample(sample, *scenario, **kwargs):
+        calls.append(scenario)
+        if len(calls) == 1:
+            raise AssertionError("Model did not solve correctly")
+        return {m: 1.0 for m in ENSEMBLE_MEASURES + ["demand"]}
+
+    monkeypatch.setattr(ensemble, "solve_sample", solve_sample)
+    df = ensemble.simulate_ensemble(
+        [0.5], [0.5], [0, 0.05], n_samples=3, block_days=7, max_workers=1
+    )
+    assert (df["status"] == "failed").sum() == 1
+    assert (df["status"] == "solved").sum() == len(calls) - 1
+    assert df.loc[df["status"] == "failed", "energyNotServed"].isna().all()
+
+
+def test_check_screen():
+    pytest.importorskip("gams")
+    from model.ensemble import check_screen
+
+    df = check_screen(
+        get_samples(hours=24 * 7), 1.1, 0.5, 0.05, {"nuclear": 1, "renewable": 0}
+    )
+    assert (df.to_numpy() < 1e-6).all()
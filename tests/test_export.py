@@ -0,0 +1,110 @@
+import base64
+import gzip
+import itertools
+import json
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from dashboard.dashboard import PROFILES
+from dashboard.data import get_results_cube
+from dashboard.export import COST_SETS, export_dashboards, get_key
+
+SHARES = {"Wind": 0.5, "Solar": 0.3, "Baseload": 0.2}
+
+
+@pytest.fixture
+def fn_gen(tmp_path) -> str:
+    """Get file with random generation of a full year for DE"""
+    rng = np.random.default_rng(0)
+    hours = pd.date_range("2017-01-01", "2017-12-31 23:00", freq="h")
+    fn = str(tmp_path / "generation.parquet")
+    pd.DataFrame(
+        {
+            "country": "DE",
+            "dateTime": hours,
+            "demand": 50 + 10 * rng.random(len(hours)),
+            "solar": 20 * rng.random(len(hours)),
+            "windOnshore": 20 * rng.random(len(hours)),
+            "windOffshore": 5 * rng.random(len(hours)),
+        }
+    ).to_parquet(fn, index=False)
+    return fn
+
+
+@pytest.fixture
+def fn_cap(tmp_path) -> str:
+    fn = str(tmp_path / "capacity.parquet")
+    pd.DataFrame(
+        {
+            "country": ["DE"],
+            "year": [2017],
+            "demand": [80.0],
+            "solar": [40.0],
+            "windOnshore": [50.0],
+            "windOffshore": [8.0],
+        }
+    ).to_parquet(fn, index=False)
+    return fn
+
+
+def read_figure(fn):
+    with gzip.open(fn, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def get_array(value) -> np.ndarray:
+    """Get array of a figure property, which plotly encodes as base64 typed
+    array or as nested list"""
+    if isinstance(value, dict):
+        shape = [int(n) for n in str(value["shape"]).split(",")]
+        data = np.frombuffer(base64.b64decode(value["bdata"]), dtype=value["dtype"])
+        return data.reshape(shape)
+    return np.asarray(value, dtype=float)
+
+
+def test_get_key():
+    assert get_key(1.5, "cost", True, "a/b c") == "1.5_cost_True_abc"
+    assert get_key(0.1 + 0.2) == "0.3"
+
+
+def test_export_dashboards(tmp_path, fn_results, fn_gen, fn_cap):
+    dir_out = str(tmp_path / "export")
+    n_figures = export_dashboards(
+        dir_out,
+        fn_results=fn_results,
+        fn_gen=fn_gen,
+        fn_cap=fn_cap,
+        years=[2017, 2018],
+        share_presets=[SHARES],
+        max_workers=2,
+    )
+    with open(os.path.join(dir_out, "manifest.json")) as f:
+        manifest = json.load(f)
+    assert os.path.isfile(os.path.join(dir_out, "index.html"))
+
+    # every combination of the controls has a figure, as the index page
+    # requests it, except for the year without data
+    files = {
+        name: [
+            os.path.join(dir_out, name, "_".join(values) + ".json.gz")
+            for values in itertools.product(*controls.values())
+        ]
+        for name, controls in manifest.items()
+    }
+    assert len(files["heatmap"]) == 2 * 6 * 2 * len(COST_SETS)
+    assert all(os.path.isfile(fn) for fn in files["heatmap"])
+    figures = ["Daily"] + PROFILES
+    assert manifest["profile"]["figure"] == [get_key(p) for p in figures]
+    assert all(os.path.isfile(fn) == ("_2017_" in fn) for fn in files["profile"])
+    assert n_figures == len(files["heatmap"]) + len(files["profile"]) // 2
+
+    # heatmaps show the surface of the cube
+    cube = get_results_cube(fn_results)
+    fig = read_figure(
+        os.path.join(
+            dir_out, "heatmap", get_key(1.5, "cost", False, "default") + ".json.gz"
+        )
+    )
+    df_surface = cube.get_surface("cost", 1.5, False, **COST_SETS["default"])
+    assert np.allclose(get_array(fig["data"][0]["z"]), df_surface)
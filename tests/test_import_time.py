@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+import pytest
+
+# modules only needed to solve the model, render pages, or update data
+HEAVY_MODULES = ["gams", "plotly", "requests", "duckdb", "streamlit", "scipy"]
+# generous limit of the import time of the packages [s]
+IMPORT_BUDGET = 1.0
+
+
+def run_import(package: str) -> subprocess.CompletedProcess:
+    """Import package in a fresh interpreter with the import time report"""
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {package}\n"
+        "print(time.perf_counter() - start)\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+
+
+@pytest.mark.parametrize("package", ["model", "dashboard"])
+def test_import_is_lazy(package):
+    result = run_import(package)
+    seconds, loaded = (result.stdout.splitlines() + [""])[:2]
+    assert loaded == ""
+    # the import time report lists every imported module on stderr
+    imported = {
+        line.split("|")[-1].strip().split(".")[0]
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+    assert imported.isdisjoint(HEAVY_MODULES)
+    assert float(seconds) < IMPORT_BUDGET
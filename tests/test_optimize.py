@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+from dashboard.cube import COST_ORDER, build_results_cube
+from dashboard.data import get_total_results
+from dashboard.optimize import get_cost_optimum, get_pareto_frontier, sweep_cost
+
+SLICE_COLUMNS = ["share_generation", "curtailRenewableFirst"]
+SCENARIO_COLUMNS = SLICE_COLUMNS + ["share_storage", "share_renewable"]
+
+
+def get_annual_cost(df_annual, cost_res, cost_nuc, cost_sto, cost_ens):
+    return df_annual.assign(
+        cost=cost_res * (df_annual["renewable"] + df_annual["curtailRenewable"])
+        + cost_nuc * (df_annual["nuclear"] + df_annual["curtailNuclear"])
+        + cost_sto * df_annual["demand"] * df_annual["share_storage"]
+        + cost_ens * df_annual["energyNotServed"]
+    )
+
+
+def get_brute_force_optimum(df_annual, **unit_cost):
+    df = get_annual_cost(df_annual, **unit_cost)
+    return (
+        df.loc[df.groupby(SLICE_COLUMNS)["cost"].idxmin(), SCENARIO_COLUMNS + ["cost"]]
+        .sort_values(SLICE_COLUMNS)
+        .reset_index(drop=True)
+    )
+
+
+@pytest.mark.parametrize(
+    "unit_cost",
+    [
+        dict(cost_res=2.0, cost_nuc=1.0, cost_sto=10.0, cost_ens=10.0),
+        dict(cost_res=1.0, cost_nuc=3.0, cost_sto=0.5, cost_ens=100.0),
+    ],
+)
+def test_cost_optimum(fn_results, unit_cost):
+    df_annual = get_total_results(fn_results)
+    df_opt = get_cost_optimum(build_results_cube(df_annual), **unit_cost)
+    pd.testing.assert_frame_equal(
+        df_opt.sort_values(SLICE_COLUMNS).reset_index(drop=True)[
+            SCENARIO_COLUMNS + ["cost"]
+        ],
+        get_brute_force_optimum(df_annual, **unit_cost),
+        check_dtype=False,
+    )
+
+
+def test_cost_optimum_skips_missing(fn_results):
+    df_annual = get_total_results(fn_results)
+    unit_cost = dict(cost_res=2.0, cost_nuc=1.0, cost_sto=10.0, cost_ens=10.0)
+    df_opt = get_cost_optimum(build_results_cube(df_annual), **unit_cost)
+    # the optimal scenario of each slice is removed from the results
+    df_annual = df_annual.merge(
+        df_opt[SCENARIO_COLUMNS], how="left", indicator=True
+    ).query("_merge == 'left_only'").drop("_merge", axis=1)
+    df_opt = get_cost_optimum(build_results_cube(df_annual), **unit_cost)
+    pd.testing.assert_frame_equal(
+        df_opt.sort_values(SLICE_COLUMNS).reset_index(drop=True)[
+            SCENARIO_COLUMNS + ["cost"]
+        ],
+        get_brute_force_optimum(df_annual, **unit_cost),
+        check_dtype=False,
+    )
+
+
+def test_sweep_cost(fn_results):
+    cube = build_results_cube(get_total_results(fn_results))
+    rng = np.random.default_rng(0)
+    unit_cost = pd.DataFrame(rng.random((7, 4)) * 10, columns=COST_ORDER)
+    # a small memory limit processes the cost assumptions in several chunks
+    df_sweep = sweep_cost(cube, unit_cost, max_memory=2 * 24 * 8)
+    assert set(df_sweep["costScenario"]) == set(range(7))
+    for k, row in unit_cost.iterrows():
+        pd.testing.assert_frame_equal(
+            df_sweep[df_sweep["costScenario"] == k]
+            .drop("costScenario", axis=1)
+            .reset_index(drop=True),
+            get_cost_optimum(cube, **row),
+        )
+
+
+def test_pareto_frontier(fn_results):
+    df_annual = get_total_results(fn_results)
+    unit_cost = dict(cost_res=2.0, cost_nuc=1.0, cost_sto=10.0, cost_ens=10.0)
+    df_frontier = get_pareto_frontier(build_results_cube(df_annual), **unit_cost)
+
+    # brute force: a scenario is dominated if another one of the same slice is
+    # at least as good in both and better in one of cost and energy-not-served
+    df = get_annual_cost(df_annual, **unit_cost)
+    on_frontier = []
+    for _, row in df.iterrows():
+        others = df[
+            (df["share_generation"] == row["share_generation"])
+            & (df["curtailRenewableFirst"] == row["curtailRenewableFirst"])
+        ]
+        dominated = (
+            (others["cost"] <= row["cost"])
+            & (others["energyNotServed"] <= row["energyNotServed"])
+            & (
+                (others["cost"] < row["cost"])
+                | (others["energyNotServed"] < row["energyNotServed"])
+            )
+        ).any()
+        on_frontier.append(not dominated)
+    columns = SCENARIO_COLUMNS + ["cost", "energyNotServed"]
+    pd.testing.assert_frame_equal(
+        df_frontier[columns].sort_values(SCENARIO_COLUMNS).reset_index(drop=True),
+        df[on_frontier][columns].sort_values(SCENARIO_COLUMNS).reset_index(drop=True),
+        check_dtype=False,
+    )
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("gams")
+from model import planner
+
+# synthetic runtime [s] and memory [bytes] as constant, per period, and per
+# period with storage, see get_features
+COEF_SECONDS = np.array([2.0, 0.01, 0.03])
+COEF_MEMORY = np.array([1e6, 1e3, 5e2])
+
+
+def test_fit_linear():
+    rng = np.random.default_rng(0)
+    features = planner.get_features(
+        rng.integers(10, 1000, 20), rng.choice([0, 0.1], 20)
+    )
+    coef = planner.fit_linear(features, features @ COEF_SECONDS)
+    assert np.allclose(coef, COEF_SECONDS)
+    # negative coefficients are dropped
+    coef = planner.fit_linear(features, features @ np.array([2.0, 0.01, -0.03]))
+    assert (coef >= 0).all()
+    assert coef[2] == 0
+
+
+def test_plan_sweep(monkeypatch, fn_entsoe):
+    samples = []
+
+    def calibrate(df_entsoe, sample, horizons, total_demand, profile):
+        samples.append(sample)
+        df_cal = pd.DataFrame(
+            [
+                {
+                    "share_storage": s_sto,
+                    "periods": max(int(len(df_entsoe) * horizon), 1),
+                }
+                for _, _, s_sto, _ in sample
+                for horizon in horizons
+            ]
+        )
+        features = planner.get_features(df_cal["periods"], df_cal["share_storage"])
+        return df_cal.assign(
+            seconds=features @ COEF_SECONDS,
+            memory=features @ COEF_MEMORY,
+            frameBytes=df_cal["periods"] * 100,
+            parquetBytes=df_cal["periods"] * 10,
+        )
+
+    monkeypatch.setattr(planner, "calibrate", calibrate)
+    monkeypatch.setattr(planner, "get_solver_memory", lambda: 0.0)
+    plan = planner.plan_sweep(
+        share_generation=[1.0, 1.5],
+        share_renewable=[0.5],
+        share_storage=[0, 0.1],
+        fn_entsoe=fn_entsoe,
+        start="2017/01/01 00:00",
+        end="2017/01/31 23",
+        workers=2,
+        n_sample=1,
+    )
+    # a single sampled scenario is complemented by one of the other group
+    assert len(samples[0]) == 2
+    assert {s[2] > 0 for s in samples[0]} == {True, False}
+
+    periods = 31 * 24
+    features = planner.get_features(np.full(4, periods), np.array([0, 0.1, 0, 0.1]))
+    assert plan["scenarios"] == 4
+    assert plan["periods"] == periods
+    assert np.isclose(plan["wallHours"], (features @ COEF_SECONDS).sum() / 2 / 3600)
+    assert np.isclose(
+        plan["peakMemory"],
+        2 * (features @ COEF_MEMORY).max() + 2 * periods * 100 * 4,
+    )
+    assert np.isclose(plan["outputBytes"], periods * 10 * 4)
+    assert plan["exceeded"] == []
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+from dashboard.data import (
+    RESULT_KEYS,
+    RESULT_MEASURES,
+    aggregate_results,
+    get_total_results,
+    query_results,
+)
+from dashboard.query import VIEW_KEYS, query
+from conftest import make_results
+
+UNIT_COST = dict(cost_res=2.0, cost_nuc=1.0, cost_sto=10.0, cost_ens=10.0)
+
+
+def get_pandas_totals() -> pd.DataFrame:
+    """Get results of make_results aggregated over all periods with pandas"""
+    return (
+        make_results()
+        .assign(
+            curtailRenewableFirst=lambda df: df["costCurtailRenewable"]
+            <= df["costCurtailNuclear"]
+        )
+        .groupby(VIEW_KEYS)[RESULT_MEASURES]
+        .sum()
+        .reset_index()
+    )
+
+
+@pytest.mark.parametrize("engine", ["arrow", "duckdb"])
+def test_aggregate_results(fn_results, engine):
+    df = aggregate_results(fn_results, engine=engine).to_pandas()
+    assert list(df.columns) == VIEW_KEYS + RESULT_MEASURES
+    pd.testing.assert_frame_equal(df, get_pandas_totals(), check_dtype=False)
+
+
+def test_curtailment_view(fn_results):
+    df = query(fn_results, "FROM curtailment")
+    df_total = get_total_results(fn_results)
+    df = df.round({c: 8 for c in RESULT_KEYS}).merge(
+        df_total, on=VIEW_KEYS, suffixes=("", "Total")
+    )
+    assert len(df) == len(df_total)
+    for c in ["curtailNuclearPercent", "curtailRenewablePercent"]:
+        assert np.allclose(df[c], df[f"{c}Total"])
+
+
+def test_scenario_cost(fn_results):
+    df = query_results(
+        fn_results,
+        "SELECT * FROM scenario_cost(?, ?, ?, ?) ORDER BY cost LIMIT 3",
+        list(UNIT_COST.values()),
+    )
+    df_total = get_pandas_totals()
+    cost = (
+        UNIT_COST["cost_res"] * (df_total["renewable"] + df_total["curtailRenewable"])
+        + UNIT_COST["cost_nuc"] * (df_total["nuclear"] + df_total["curtailNuclear"])
+        + UNIT_COST["cost_sto"] * df_total["demand"] * df_total["share_storage"]
+        + UNIT_COST["cost_ens"] * df_total["energyNotServed"]
+    )
+    assert np.allclose(df["cost"], cost.nsmallest(3))
+
+
+def test_query_parameters(fn_results):
+    df = query(
+        fn_results,
+        "FROM annual_totals WHERE share_storage > $sto AND curtailRenewableFirst",
+        {"sto": 0.05},
+        threads=1,
+    )
+    df_total = get_pandas_totals()
+    df_total = df_total[
+        (df_total["share_storage"] > 0.05) & df_total["curtailRenewableFirst"]
+    ].reset_index(drop=True)
+    pd.testing.assert_frame_equal(df, df_total, check_dtype=False)
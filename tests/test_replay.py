@@ -0,0 +1,58 @@
+import json
+import os
+import pytest
+
+
+def test_bundle_round_trip(tmp_path, fn_entsoe):
+    pytest.importorskip("gams")
+    from model.replay import export_bundle, replay_bundle
+    from model.simulation import create_inputs, get_entsoe_data
+
+    data = get_entsoe_data("DE", "2017/01/01 00:00", "2017/01/07 23", fn=fn_entsoe)
+    data["renewable"] = data["windOnshore"]
+    gdx = create_inputs(
+        data,
+        share_generation=1.1,
+        share_renewable=0.5,
+        share_storage=0.005,
+        cost_curtailment={"nuclear": 1, "renewable": 0},
+    )
+    dir_bundle = export_bundle(gdx, str(tmp_path / "bundle"), profile="dual")
+    with open(os.path.join(dir_bundle, "settings.json")) as f:
+        settings = json.load(f)
+    assert os.path.isfile(os.path.join(dir_bundle, "model.gms"))
+    assert os.path.isfile(os.path.join(dir_bundle, settings["option_file"]))
+    res = replay_bundle(dir_bundle)
+    assert "error" not in res["status"]
+
+
+@pytest.mark.parametrize("reoptimize", [False, True])
+def test_export_all_scenarios(tmp_path, fn_entsoe, reoptimize):
+    pytest.importorskip("gams")
+    from model.replay import replay_bundle
+    from model.simulation import simulate
+
+    dir_replay = str(tmp_path / "replay")
+    simulate(
+        [1.1],
+        [0.5],
+        [0, 0.005],
+        cost_curtailment=[
+            {"nuclear": 1, "renewable": 0},
+            {"nuclear": 0, "renewable": 1},
+        ],
+        end="2017/01/07 23",
+        fn_entsoe=fn_entsoe,
+        dir_replay=dir_replay,
+        replay_scenarios="all",
+        reoptimize=reoptimize,
+    )
+    bundles = sorted(os.listdir(dir_replay))
+    assert len(bundles) == (2 if reoptimize else 4)
+    for name in bundles:
+        dir_bundle = os.path.join(dir_replay, name)
+        with open(os.path.join(dir_bundle, "settings.json")) as f:
+            settings = json.load(f)
+        assert settings["mode"] == ("reoptimize" if reoptimize else "full")
+        assert os.path.getsize(os.path.join(dir_bundle, "run.log")) > 0
+        assert "error" not in replay_bundle(dir_bundle)["status"]
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+from dashboard.cube import build_results_cube
+from dashboard.data import RESULT_MEASURES, get_results_cube, get_total_results
+from model.scaling import EXTENSIVE_COLUMNS, rescale_results
+from conftest import make_results
+
+
+def test_rescale_results():
+    df = make_results()
+    df_scaled = rescale_results(df, 10)
+    totals = df_scaled.groupby(
+        ["share_generation", "share_renewable", "share_storage", "costCurtailNuclear"]
+    )["demand"].sum()
+    assert np.allclose(totals, 10)
+    # demand of each scenario sums to one, i.e., all columns scale by ten
+    assert np.allclose(df_scaled[EXTENSIVE_COLUMNS], df[EXTENSIVE_COLUMNS] * 10)
+    others = df.columns.difference(EXTENSIVE_COLUMNS)
+    pd.testing.assert_frame_equal(df_scaled[others], df[others])
+
+
+def test_total_results_factor(fn_results):
+    df = get_total_results(fn_results)
+    df_scaled = get_total_results(fn_results, 250.0)
+    assert np.allclose(df_scaled["demand"], 250)
+    factor = 250 / df["demand"]
+    assert np.allclose(
+        df_scaled[RESULT_MEASURES], df[RESULT_MEASURES].mul(factor, axis=0)
+    )
+    for c in ["curtailNuclearPercent", "curtailRenewablePercent"]:
+        assert np.allclose(df_scaled[c], df[c])
+
+    # the cube is rescaled on read
+    cube = get_results_cube(fn_results).rescale(250.0)
+    expected = build_results_cube(df_scaled)
+    for m, values in expected.measures.items():
+        assert np.allclose(cube.measures[m], values, equal_nan=True)
+    assert np.allclose(cube.cost_components, expected.cost_components, equal_nan=True)
+
+
+def test_scaling_error(fn_entsoe):
+    pytest.importorskip("gams")
+    from model.scaling import get_scaling_error
+
+    df = get_scaling_error(
+        [1e3, 1e6],
+        share_storage=[0, 0.005],
+        end="2017/01/07 23",
+        fn_entsoe=fn_entsoe,
+    )
+    assert (df.filter(like="Percent").abs() < 1e-4).all().all()
@@ -0,0 +1,77 @@
+import asyncio
+import contextlib
+import os
+import socket
+import threading
+import time
+import urllib.error
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import pytest
+from dashboard.service import ResultsService, build_store, fetch_table
+
+
+def test_build_store(fn_results):
+    fn_store = build_store(fn_results)
+    tbl = pa.ipc.open_file(fn_store).read_all()
+    assert tbl.num_rows == pq.read_table(fn_results).num_rows
+    mtime = os.stat(fn_store).st_mtime_ns
+    # unchanged results are not written again
+    assert build_store(fn_results) == fn_store
+    assert os.stat(fn_store).st_mtime_ns == mtime
+
+
+@pytest.fixture
+def url(fn_results):
+    service = ResultsService(fn_results)
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(service.serve(port=port))
+
+    def run():
+        with contextlib.suppress(asyncio.CancelledError):
+            loop.run_until_complete(task)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    for _ in range(100):
+        with contextlib.suppress(OSError):
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            break
+        time.sleep(0.05)
+    yield f"http://127.0.0.1:{port}"
+    loop.call_soon_threadsafe(task.cancel)
+    thread.join(5)
+    loop.close()
+
+
+def test_round_trip(url):
+    tbl = fetch_table(f"{url}/annual?share_generation=1.5&curtail_res_first=true")
+    assert tbl.num_rows == 6
+    assert pc.all(pc.equal(tbl["share_generation"], 1.5)).as_py()
+
+    tbl = fetch_table(
+        f"{url}/scenario?share_generation=1&share_storage=0.1&share_renewable=0.5"
+        "&columns=date,demand"
+    )
+    assert tbl.num_rows == 24
+    assert set(tbl.column_names) >= {"date", "demand"}
+
+    tbl = fetch_table(
+        f"{url}/cost?share_generation=1&cost_res=2&cost_nuc=1&cost_sto=10&cost_ens=10"
+    )
+    assert tbl.num_rows == 12
+
+
+def test_errors(url):
+    with pytest.raises(urllib.error.HTTPError) as e:
+        fetch_table(f"{url}/unknown")
+    assert e.value.code == 404
+    assert "Unknown endpoint /unknown" in e.value.read().decode()
+
+    with pytest.raises(urllib.error.HTTPError) as e:
+        fetch_table(f"{url}/annual?share=1")
+    assert e.value.code == 400
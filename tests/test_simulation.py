@@ -0,0 +1,25 @@
+import pytest
+
+
+def test_decompose_falls_back_to_full_model(monkeypatch, fn_entsoe):
+    pytest.importorskip("gams")
+    from model import decomposition
+    from model.simulation import simulate
+
+    def solve_decomposed(*args, **kwargs):
+        raise ValueError("Stitched solution is not optimal")
+
+    monkeypatch.setattr(decomposition, "solve_decomposed", solve_decomposed)
+    kwargs = dict(
+        share_generation=[1.1],
+        share_renewable=[0.5],
+        share_storage=[0.005],
+        end="2017/01/07 23",
+        fn_entsoe=fn_entsoe,
+    )
+    df = simulate(decompose=True, **kwargs)
+    df_full = simulate(**kwargs)
+    assert len(df) == len(df_full) == 24 * 7
+    assert df["energyNotServed"].sum() == pytest.approx(
+        df_full["energyNotServed"].sum()
+    )
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+from dashboard.catalog import prepare_generation
+from dashboard.data import get_profiles, get_storage_stats, normalize_generation
+from dashboard.streaming import stream_aggregates
+
+COUNTRIES = ["CH", "DE"]
+YEARS = [2017, 2018]
+SHARES = {"Wind": 0.4, "Solar": 0.2, "Baseload": 0.5}
+
+
+@pytest.fixture
+def fn_gen(tmp_path) -> str:
+    """Get file with random generation of the first days of two years for
+    two countries and another country that is not selected"""
+    rng = np.random.default_rng(0)
+    lst_df = []
+    for country in COUNTRIES + ["FR"]:
+        for year in YEARS + [2019]:
+            hours = pd.date_range(f"{year}-01-01", periods=96, freq="h")
+            lst_df.append(
+                pd.DataFrame(
+                    {
+                        "country": country,
+                        "dateTime": hours,
+                        "demand": 50 + 10 * rng.random(len(hours)),
+                        "solar": 20 * rng.random(len(hours)),
+                        "windOnshore": 20 * rng.random(len(hours)) ** 2,
+                        "windOffshore": 5 * rng.random(len(hours)),
+                    }
+                )
+            )
+    fn = str(tmp_path / "generation.parquet")
+    pd.concat(lst_df).to_parquet(fn, index=False)
+    return fn
+
+
+def get_reference(fn_gen, country, year, total_demand):
+    """Get aggregates of a single country and year held in memory"""
+    df = pd.read_parquet(fn_gen, filters=[("country", "==", country)])
+    df = df[df["dateTime"].dt.year == year]
+    df = prepare_generation(df.drop("country", axis=1).set_index("dateTime"))
+    return normalize_generation(df, dict(SHARES), total_demand)
+
+
+@pytest.mark.parametrize("total_demand", [0, 1000])
+def test_stream_aggregates(fn_gen, total_demand):
+    # small batches such that countries and years span several batches
+    res = stream_aggregates(
+        fn_gen, COUNTRIES, YEARS, SHARES, total_demand=total_demand, batch_size=50
+    )
+    columns = list(SHARES) + ["Demand"]
+    assert set(res["daily"].index.droplevel("date")) == {
+        (c, y) for c in COUNTRIES for y in YEARS
+    }
+    for country in COUNTRIES:
+        for year in YEARS:
+            df_norm = get_reference(fn_gen, country, year, total_demand)
+            pd.testing.assert_frame_equal(
+                res["daily"].loc[(country, year)][columns],
+                df_norm.groupby(df_norm.index.normalize().rename("date")).sum(),
+                check_freq=False,
+            )
+            profiles = res["profiles"].sort_index().loc[(country, year)]
+            for name, df_profile in get_profiles(df_norm).items():
+                if len(df_profile) == 0:
+                    continue
+                assert np.allclose(profiles.loc[name][columns], df_profile[columns])
+            df_stats = get_storage_stats(df_norm)[1]
+            pd.testing.assert_frame_equal(
+                res["stats"].loc[(country, year)].T,
+                df_stats,
+                check_dtype=False,
+                check_names=False,
+                check_like=True,
+            )
+
+
+def test_stream_aggregates_without_data(fn_gen):
+    res = stream_aggregates(fn_gen, ["IT"], YEARS, SHARES)
+    assert res == {"daily": None, "profiles": None, "stats": None}
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+from dashboard.data import get_results_cube, get_surrogate_error
+from dashboard.surrogate import get_holdout_error, get_refinement_candidates
+
+UNIT_COST = {"cost_res": 2.0, "cost_nuc": 1.0, "cost_sto": 10.0, "cost_ens": 10.0}
+
+
+def test_cached_holdout_error(fn_results):
+    cube = get_results_cube(fn_results)
+    error = get_surrogate_error(fn_results, "cost", True, "linear", UNIT_COST)
+    expected = get_holdout_error(cube, "cost", True, "linear", **UNIT_COST)
+    assert np.allclose(error, expected, equal_nan=True)
+    pd.testing.assert_frame_equal(
+        get_refinement_candidates(cube, "cost", 0.01, error=error, **UNIT_COST),
+        get_refinement_candidates(cube, "cost", 0.01, **UNIT_COST),
+    )
+    # the error scales with the demand level
+    error_scaled = get_surrogate_error(
+        fn_results, "energyNotServed", True, "linear", UNIT_COST, total_demand=10.0
+    )
+    error = get_surrogate_error(
+        fn_results, "energyNotServed", True, "linear", UNIT_COST
+    )
+    assert np.allclose(error_scaled, error * 10, equal_nan=True)
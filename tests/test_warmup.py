@@ -0,0 +1,10 @@
+import os
+from dashboard.data import get_annual_results_file
+from dashboard.service import get_store_file
+from dashboard.warmup import build_artifacts
+
+
+def test_build_artifacts(fn_results):
+    build_artifacts(fn_results=fn_results)
+    assert os.path.isfile(get_annual_results_file(fn_results))
+    assert os.path.isfile(get_store_file(fn_results))
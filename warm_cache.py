@@ -0,0 +1,19 @@
+from dashboard.warmup import build_artifacts
+import os
+import time
+
+
+if __name__ == "__main__":
+    start = time.time()
+    fn_gen = "./data/renewables_with_load.parquet"
+    fn_cap = "./data/renewables_capacity.parquet"
+    fn_results = "./data/results.parquet"
+    # the dashboards are started with warm_cache=False and read these files
+    build_artifacts(
+        fn_gen=fn_gen if os.path.isfile(fn_gen) else None,
+        fn_cap=fn_cap,
+        fn_results=fn_results if os.path.isfile(fn_results) else None,
+    )
+    end = time.time()
+    print(f"Time taken: {end - start}")
+    print("Finished!")